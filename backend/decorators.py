@@ -6,6 +6,7 @@ import functools
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from services.auth_service import get_auth_service
+from models import async_db_manager
 from typing import Optional, Callable, Any
 import logging
 
@@ -40,7 +41,7 @@ def require_auth(admin_only: bool = False):
             auth_service = get_auth_service(config_service=config_service)
             
             # Validate session using injected auth service
-            valid, session_data, error = auth_service.validate_session(session_token)
+            valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
             
             if not valid:
                 raise HTTPException(
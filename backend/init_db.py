@@ -11,6 +11,17 @@ from datetime import datetime, timedelta
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+SUBMISSIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text_content TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        user_id INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+'''
+
 def init_database():
     """Initialize the database with schema from 03_Data_Model.md"""
     try:
@@ -25,6 +36,10 @@ def init_database():
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
+        # Let the session reaper return freed pages incrementally (only takes effect
+        # on a new database; existing ones need a one-off VACUUM to switch)
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
         # Create users table
         logger.info("Creating users table...")
         cursor.execute('''
@@ -52,17 +67,37 @@ def init_database():
             )
         ''')
         
-        # Create submissions table
+        # Create submissions table (session_id is kept as history only, without a foreign
+        # key, so the session reaper can delete expired sessions without touching submissions)
         logger.info("Creating submissions table...")
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text_content TEXT NOT NULL,
-                session_id TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-            )
-        ''')
+        cursor.execute(SUBMISSIONS_TABLE.format(name='submissions'))
+        
+        # Store the owner on submissions created before it was recorded (expired sessions can then be deleted)
+        cursor.execute('PRAGMA table_info(submissions)')
+        if 'user_id' not in [column[1] for column in cursor.fetchall()]:
+            logger.info("Adding user_id column to submissions table...")
+            cursor.execute('ALTER TABLE submissions ADD COLUMN user_id INTEGER REFERENCES users(id)')
+            cursor.execute('''
+                UPDATE submissions SET user_id = (
+                    SELECT sessions.user_id FROM sessions WHERE sessions.session_id = submissions.session_id
+                )
+            ''')
+            conn.commit()
+        
+        # Rebuild submissions tables created with ON DELETE CASCADE from sessions (SQLite cannot drop a foreign key)
+        cursor.execute('PRAGMA foreign_key_list(submissions)')
+        if any(foreign_key[2] == 'sessions' for foreign_key in cursor.fetchall()):
+            logger.info("Removing the sessions foreign key from the submissions table...")
+            # Dropping the old table must not cascade into evaluations
+            cursor.execute('PRAGMA foreign_keys = OFF')
+            cursor.execute(SUBMISSIONS_TABLE.format(name='submissions_new'))
+            cursor.execute('''
+                INSERT INTO submissions_new (id, text_content, session_id, created_at, user_id)
+                SELECT id, text_content, session_id, created_at, user_id FROM submissions
+            ''')
+            cursor.execute('DROP TABLE submissions')
+            cursor.execute('ALTER TABLE submissions_new RENAME TO submissions')
+            conn.commit()
         
         # Create evaluations table
         logger.info("Creating evaluations table...")
@@ -82,10 +117,114 @@ def init_database():
                 debug_enabled BOOLEAN DEFAULT FALSE,
                 processing_time DECIMAL(6,3),
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+                cost_usd DECIMAL(10,6) NOT NULL DEFAULT 0,
+                prompt_template_hash TEXT,
+                prompt_parts TEXT,
+                response_encoding TEXT,
                 FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
             )
         ''')
         
+        # Add token accounting and prompt template columns to evaluations tables created before them
+        cursor.execute('PRAGMA table_info(evaluations)')
+        evaluation_columns = [column[1] for column in cursor.fetchall()]
+        for column, definition in (
+            ('input_tokens', 'INTEGER NOT NULL DEFAULT 0'),
+            ('output_tokens', 'INTEGER NOT NULL DEFAULT 0'),
+            ('cache_read_tokens', 'INTEGER NOT NULL DEFAULT 0'),
+            ('cache_write_tokens', 'INTEGER NOT NULL DEFAULT 0'),
+            ('cost_usd', 'DECIMAL(10,6) NOT NULL DEFAULT 0'),
+            ('prompt_template_hash', 'TEXT'),
+            ('prompt_parts', 'TEXT'),
+            ('response_encoding', 'TEXT')
+        ):
+            if column not in evaluation_columns:
+                logger.info(f"Adding {column} column to evaluations table...")
+                cursor.execute(f'ALTER TABLE evaluations ADD COLUMN {column} {definition}')
+        
+        # Create prompt templates table (static prompt parts referenced by evaluations, one row per content hash)
+        logger.info("Creating prompt templates table...")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS prompt_templates (
+                template_hash TEXT PRIMARY KEY,
+                language TEXT NOT NULL,
+                template_version TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Create usage ledger table (token and cost rollups per user and day/month; user 0 = all users)
+        logger.info("Creating usage ledger table...")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_ledger (
+                period TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                user_id INTEGER NOT NULL DEFAULT 0,
+                evaluations INTEGER NOT NULL DEFAULT 0,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+                cost_usd DECIMAL(12,6) NOT NULL DEFAULT 0,
+                updated_at DATETIME,
+                PRIMARY KEY (period, period_start, user_id)
+            )
+        ''')
+        
+        # Create evaluation jobs table (asynchronous submissions)
+        logger.info("Creating evaluation jobs table...")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS evaluation_jobs (
+                id TEXT PRIMARY KEY,
+                submission_id INTEGER NOT NULL,
+                user_id INTEGER REFERENCES users(id),
+                status TEXT NOT NULL DEFAULT 'queued',
+                priority INTEGER NOT NULL DEFAULT 2,
+                callback_url TEXT,
+                evaluation_id INTEGER,
+                error TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                started_at DATETIME,
+                completed_at DATETIME,
+                batch_id TEXT,
+                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE,
+                FOREIGN KEY (evaluation_id) REFERENCES evaluations(id) ON DELETE SET NULL
+            )
+        ''')
+        
+        # Add batch_id to evaluation jobs tables created before batch submissions
+        cursor.execute('PRAGMA table_info(evaluation_jobs)')
+        if 'batch_id' not in [column[1] for column in cursor.fetchall()]:
+            logger.info("Adding batch_id column to evaluation jobs table...")
+            cursor.execute('ALTER TABLE evaluation_jobs ADD COLUMN batch_id TEXT')
+        
+        # Create login attempts table (failed logins for brute force detection, shared by all workers)
+        logger.info("Creating login attempts table...")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS login_attempts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                attempted_at REAL NOT NULL
+            )
+        ''')
+        
+        # Create revoked tokens table (denylist for signed session tokens, synced by every worker)
+        logger.info("Creating revoked tokens table...")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS revoked_tokens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                token_id TEXT,
+                user_id INTEGER,
+                revoked_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        
         # Create schema migrations table
         logger.info("Creating schema migrations table...")
         cursor.execute('''
@@ -104,8 +243,12 @@ def init_database():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_active ON sessions(user_id, is_active, expires_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_admin ON sessions(is_admin, is_active)')  # Index for admin sessions
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_session_date ON submissions(session_id, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_user ON submissions(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_submission ON evaluations(submission_id, created_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions(session_id, is_active, expires_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_status ON evaluation_jobs(status, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_batch ON evaluation_jobs(batch_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_login_attempts_username ON login_attempts(username, attempted_at)')
         
         # Configure WAL mode for concurrent access
         logger.info("Configuring WAL mode...")
@@ -162,6 +305,46 @@ def init_database():
             VALUES (?, ?)
         ''', ('002_auth_unified', 'Unified authentication system with admin flag'))
         
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('003_evaluation_jobs', 'Asynchronous evaluation jobs'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('004_evaluation_batches', 'Batch submissions on evaluation jobs'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('005_usage_ledger', 'Token accounting on evaluations and usage ledger rollups'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('006_prompt_templates', 'Prompt template references and compressed raw responses on evaluations'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('007_login_attempts', 'Failed login attempts shared across workers for brute force detection'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('008_revoked_tokens', 'Revocation list for signed session tokens'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('009_submission_owner', 'Owner user_id on submissions, independent of the session'))
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO schema_migrations (version, description)
+            VALUES (?, ?)
+        ''', ('010_submission_session_history', 'Drop the cascading sessions foreign key from submissions'))
+        
         conn.commit()
         conn.close()
         
@@ -180,7 +363,7 @@ def verify_database():
         cursor = conn.cursor()
         
         # Check if all tables exist
-        tables = ['users', 'sessions', 'submissions', 'evaluations', 'schema_migrations']
+        tables = ['users', 'sessions', 'submissions', 'evaluations', 'evaluation_jobs', 'usage_ledger', 'prompt_templates', 'login_attempts', 'revoked_tokens', 'schema_migrations']
         for table in tables:
             cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
             if not cursor.fetchone():
@@ -194,8 +377,12 @@ def verify_database():
             'idx_sessions_user_active',
             'idx_sessions_admin',
             'idx_submissions_session_date',
+            'idx_submissions_user',
             'idx_evaluations_submission',
-            'idx_sessions_active'
+            'idx_sessions_active',
+            'idx_evaluation_jobs_status',
+            'idx_evaluation_jobs_batch',
+            'idx_login_attempts_username'
         ]
         for idx in required_indexes:
             cursor.execute(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{idx}'")
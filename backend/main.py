@@ -5,17 +5,19 @@ FastAPI-based REST API for text evaluation
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 import os
 import logging
 import secrets
+import uuid
 import json
+import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Import database models
-from models import db_manager, Session, Submission, Evaluation
+from models import async_db_manager, Session, Submission, Evaluation, EvaluationJob, UsageRollup
 
 # Import services
 from services import (
@@ -26,8 +28,14 @@ from services import (
     write_config_file
 )
 
-# Import new enhanced LLM service
-from services.llm_service import EnhancedLLMService
+# Import shared enhanced LLM service accessor
+from services.llm_service import get_llm_service, EnhancedLLMService
+from services.llm_admission import PRIORITY_ADMIN, PRIORITY_NORMAL
+from services.evaluation_jobs import get_job_worker, store_evaluation, load_raw_prompt, describe_llm_error, CallbackURLError
+from services.evaluation_batches import get_batch_dispatcher
+from services.usage_ledger import get_usage_ledger
+from services.password_hasher import PasswordHasherBusyError
+from services.session_reaper import get_session_reaper
 
 # Import authentication decorators
 from decorators import require_auth
@@ -101,6 +109,26 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to load configurations on startup: {e}")
         raise
+    
+    # Resume asynchronous evaluation jobs left over by a previous process
+    try:
+        get_job_worker().recover()
+    except Exception as e:
+        logger.error(f"Failed to recover evaluation jobs on startup: {e}")
+    
+    # Delete expired sessions in the background (settings come from auth.yaml)
+    try:
+        get_auth_service(config_service=config_service)
+        get_session_reaper().start()
+    except Exception as e:
+        logger.error(f"Failed to start session reaper: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background evaluation workers (running jobs are requeued), the session reaper and the database threads"""
+    await get_job_worker().stop()
+    await get_session_reaper().stop()
+    async_db_manager.shutdown()
 
 # Add CORS middleware
 app.add_middleware(
@@ -163,10 +191,10 @@ async def auth_logout(request: Request):
         
         # Validate session and logout
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if valid:
-            logout_success = auth_service.logout(session_token)
+            logout_success = await async_db_manager.run(auth_service.logout, session_token)
             
             if logout_success:
                 return {
@@ -261,7 +289,7 @@ async def get_admin_logs(request: Request):
 
         # Validate session and admin rights
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         if not valid:
             return JSONResponse(
                 status_code=401,
@@ -354,7 +382,7 @@ async def create_user_endpoint(request: Request):
         
         # Validate session and check admin access
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -418,7 +446,7 @@ async def create_user_endpoint(request: Request):
         
         # Create user
         auth_service = get_auth_service(config_service=config_service)
-        success, user_id, error = auth_service.create_user(username, password)
+        success, user_id, error = await auth_service.create_user_async(username, password)
         
         if success:
             return {
@@ -451,6 +479,8 @@ async def create_user_endpoint(request: Request):
                 }
             )
             
+    except PasswordHasherBusyError as e:
+        return _password_hasher_busy_response(e)
     except Exception as e:
         logger.error(f"User creation failed: {e}")
         return JSONResponse(
@@ -497,7 +527,7 @@ async def list_users_endpoint(request: Request):
         
         # Validate session and check admin access
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -536,7 +566,7 @@ async def list_users_endpoint(request: Request):
             )
         
         # Get users list
-        users = auth_service.list_users()
+        users = await async_db_manager.run(auth_service.list_users)
         
         return {
             "data": {
@@ -596,7 +626,7 @@ async def delete_user_endpoint(username: str, request: Request):
         
         # Validate session and check admin access
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -635,7 +665,7 @@ async def delete_user_endpoint(username: str, request: Request):
             )
         
         # Delete user
-        success = auth_service.delete_user(username)
+        success = await async_db_manager.run(auth_service.delete_user, username)
         
         if success:
             return {
@@ -711,7 +741,7 @@ async def get_config(config_name: str, request: Request):
             )
         
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         if not valid:
             return JSONResponse(
                 status_code=401,
@@ -807,7 +837,7 @@ async def update_config(config_name: str, request: Request):
             )
         
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         if not valid:
             return JSONResponse(
                 status_code=401,
@@ -927,7 +957,7 @@ async def auth_validate(request: Request):
         
         # Validate session
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -1013,11 +1043,12 @@ async def auth_login(request: Request):
         
         # Authenticate user with unified auth
         auth_service = get_auth_service(config_service=config_service)
-        success, session_token, error = auth_service.authenticate(username, password)
+        # Password hashing is CPU-bound; it is awaited on the bounded bcrypt pool (429 when saturated)
+        success, session_token, error = await auth_service.authenticate_async(username, password)
         
         if success:
             # Get user info to return admin status
-            valid, session_data, _ = auth_service.validate_session(session_token)
+            valid, session_data, _ = await async_db_manager.run(auth_service.validate_session, session_token)
             if valid:
                 return {
                     "data": {
@@ -1067,6 +1098,8 @@ async def auth_login(request: Request):
                 }
             )
             
+    except PasswordHasherBusyError as e:
+        return _password_hasher_busy_response(e)
     except Exception as e:
         logger.error(f"Authentication failed: {e}")
         return JSONResponse(
@@ -1113,7 +1146,7 @@ async def create_session(request: Request):
         
         # Validate session with unified auth
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -1172,7 +1205,7 @@ async def create_session(request: Request):
 async def get_session(session_id: str):
     """Get session by ID"""
     try:
-        session = Session.get_by_session_id(session_id)
+        session = await async_db_manager.run(Session.get_by_session_id, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -1197,134 +1230,151 @@ async def get_session(session_id: str):
         logger.error(f"Session retrieval failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve session")
 
+def _error_response(status_code: int, code: str, message: str, field, details, headers=None) -> JSONResponse:
+    """Build an error response in the evaluation endpoints' format"""
+    return JSONResponse(
+        status_code=status_code,
+        headers=headers,
+        content={
+            "data": None,
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "request_id": "placeholder"
+            },
+            "errors": [{
+                "code": code,
+                "message": message,
+                "field": field,
+                "details": details
+            }]
+        }
+    )
+
+def _password_hasher_busy_response(e: PasswordHasherBusyError) -> JSONResponse:
+    """Build the 429 response for a login or user creation rejected by the password hashing pool"""
+    return _error_response(
+        429, "RATE_LIMIT_ERROR", "Authentication service is busy", None,
+        f"Too many logins in progress. Please retry in {e.retry_after} seconds",
+        {"Retry-After": str(e.retry_after)}
+    )
+
+async def _authenticate_evaluation_request(request: Request):
+    """Validate the session of an evaluation request
+    
+    Returns:
+        Tuple of (session_data, error_response); exactly one is None
+    """
+    session_token = request.headers.get("X-Session-Token", "")
+    if not session_token:
+        return None, _error_response(
+            401, "AUTHENTICATION_ERROR", "Authentication required",
+            "session_token", "Please log in to submit evaluations"
+        )
+    
+    auth_service = get_auth_service(config_service=config_service)
+    valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
+    if not valid:
+        return None, _error_response(
+            401, "AUTHENTICATION_ERROR", "Invalid session",
+            "session_token", error or "Please log in again"
+        )
+    return session_data, None
+
+def _validate_text_content(text_content: str, llm_service: EnhancedLLMService):
+    """Return an error response if the submitted text is not acceptable, else None"""
+    if not text_content or len(text_content.strip()) == 0:
+        return _error_response(
+            400, "VALIDATION_ERROR", "Text content is required",
+            "text_content", "Please provide text content for evaluation"
+        )
+    max_text_length = llm_service.llm_config.request_settings.get('max_text_length', 10000)
+    if len(text_content) > max_text_length:
+        return _error_response(
+            400, "VALIDATION_ERROR", "Text content too long",
+            "text_content", f"Text content exceeds maximum length of {max_text_length:,} characters"
+        )
+    return None
+
+def _llm_error_response(e: Exception) -> JSONResponse:
+    """Build the error response for a failed LLM evaluation"""
+    status_code, headers, error = describe_llm_error(e)
+    return _error_response(status_code, error["code"], error["message"], error["field"], error["details"], headers)
+
+def _format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.post("/api/v1/evaluations/submit")
 async def submit_evaluation(request: Request):
     """Submit text for evaluation (authenticated users only)"""
     try:
-        # Get session token from header
-        session_token = request.headers.get("X-Session-Token", "")
-        
-        if not session_token:
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "data": None,
-                    "meta": {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "request_id": "placeholder"
-                    },
-                    "errors": [{
-                        "code": "AUTHENTICATION_ERROR",
-                        "message": "Authentication required",
-                        "field": "session_token",
-                        "details": "Please log in to submit evaluations"
-                    }]
-                }
-            )
-        
-        # Validate session
-        auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
-        
-        if not valid:
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "data": None,
-                    "meta": {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "request_id": "placeholder"
-                    },
-                    "errors": [{
-                        "code": "AUTHENTICATION_ERROR",
-                        "message": "Invalid session",
-                        "field": "session_token",
-                        "details": error or "Please log in again"
-                    }]
-                }
-            )
+        session_data, error_response = await _authenticate_evaluation_request(request)
+        if error_response:
+            return error_response
         
         # Parse request body
         body = await request.json()
         text_content = body.get("text_content", "")
         
-        # Validate input
-        if not text_content or len(text_content.strip()) == 0:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "data": None,
-                    "meta": {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "request_id": "placeholder"
-                    },
-                    "errors": [{
-                        "code": "VALIDATION_ERROR",
-                        "message": "Text content is required",
-                        "field": "text_content",
-                        "details": "Please provide text content for evaluation"
-                    }]
-                }
-            )
+        # Validate input (resolving the service may stat or reload config files, so it runs off the event loop)
+        llm_service = await async_db_manager.run(get_llm_service)
+        error_response = _validate_text_content(text_content, llm_service)
+        if error_response:
+            return error_response
+        
+        callback_url = body.get("callback_url")
+        if callback_url:
+            try:
+                # Resolves the host, so it runs off the event loop
+                await asyncio.to_thread(get_job_worker().check_callback_url, str(callback_url))
+            except CallbackURLError as e:
+                return _error_response(
+                    400, "VALIDATION_ERROR", "Invalid callback URL", "callback_url", str(e)
+                )
+        run_async = bool(body.get("async")) or "respond-async" in request.headers.get("Prefer", "") or bool(callback_url)
         
-        if len(text_content) > 10000:
+        # Create submission record
+        submission = await async_db_manager.run(Submission.create, text_content, session_data['session_id'], session_data['user_id'])
+        
+        if run_async:
+            # Queue the evaluation and return immediately; poll the status URL or await the callback
+            job = await async_db_manager.run(
+                EvaluationJob.create,
+                submission.id,
+                user_id=session_data['user_id'],
+                priority=llm_service.get_request_priority(text_content, session_data['is_admin']),
+                callback_url=callback_url
+            )
+            get_job_worker().submit(job)
+            status_url = f"/api/v1/evaluations/{job.id}"
             return JSONResponse(
-                status_code=400,
+                status_code=202,
+                headers={"Location": status_url},
                 content={
-                    "data": None,
+                    "data": {
+                        "job_id": job.id,
+                        "status": job.status,
+                        "status_url": status_url
+                    },
                     "meta": {
                         "timestamp": datetime.utcnow().isoformat(),
                         "request_id": "placeholder"
                     },
-                    "errors": [{
-                        "code": "VALIDATION_ERROR",
-                        "message": "Text content too long",
-                        "field": "text_content",
-                        "details": "Text content exceeds maximum length of 10,000 characters"
-                    }]
+                    "errors": []
                 }
             )
         
-        # Create submission record
-        submission = Submission.create(text_content, session_data['session_id'])
-        
         # Use enhanced LLM service for text evaluation
         try:
-            llm_service = EnhancedLLMService()
-            evaluation_result = llm_service.evaluate_text_with_llm(text_content)
-        except Exception as e:
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "data": None,
-                    "meta": {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "request_id": "placeholder"
-                    },
-                    "errors": [{
-                        "code": "LLM_ERROR",
-                        "message": "Evaluation processing failed",
-                        "field": None,
-                        "details": str(e)
-                    }]
-                }
+            evaluation_result = await llm_service.evaluate_text_with_llm_async(
+                text_content,
+                priority=llm_service.get_request_priority(text_content, session_data['is_admin'])
             )
+        except Exception as e:
+            return _llm_error_response(e)
         
         # Create evaluation record with raw data and language detection metadata
-        evaluation = Evaluation.create(
-            submission_id=submission.id,
-            overall_score=evaluation_result['overall_score'],
-            strengths=json.dumps(evaluation_result['strengths']),
-            opportunities=json.dumps(evaluation_result['opportunities']),
-            rubric_scores=json.dumps(evaluation_result['rubric_scores']),
-            segment_feedback=json.dumps(evaluation_result['segment_feedback']),
-            llm_provider='claude',
-            llm_model=evaluation_result.get('metadata', {}).get('llm_model', 'claude-3-haiku-20240307'),
-            raw_prompt=evaluation_result.get('metadata', {}).get('raw_prompt', ''),
-            raw_response=evaluation_result.get('metadata', {}).get('raw_response', ''),
-            debug_enabled=True,  # Enable debug mode
-            processing_time=evaluation_result.get('metadata', {}).get('processing_time', 0)
-        )
+        await async_db_manager.run(store_evaluation, submission.id, evaluation_result, session_data['user_id'])
         
         return {
             "data": {
@@ -1342,40 +1392,274 @@ async def submit_evaluation(request: Request):
         
     except Exception as e:
         logger.error(f"Evaluation submission failed: {e}")
+        return _error_response(
+            500, "INTERNAL_ERROR", "Evaluation processing failed",
+            None, "An internal error occurred during evaluation processing"
+        )
+
+@app.post("/api/v1/evaluations/stream")
+async def stream_evaluation(request: Request):
+    """Submit text for evaluation and stream results as Server-Sent Events (authenticated users only)
+    
+    Events: `language`, then one event per response field (`overall_score`,
+    `strengths`, `opportunities`, `rubric_scores`, `segment_feedback`) as soon
+    as it is generated, then `complete` with the stored evaluation, or `error`.
+    Failures before the first event are returned as regular JSON errors.
+    """
+    try:
+        session_data, error_response = await _authenticate_evaluation_request(request)
+        if error_response:
+            return error_response
+        
+        # Parse request body
+        body = await request.json()
+        text_content = body.get("text_content", "")
+        
+        # Validate input (resolving the service may stat or reload config files, so it runs off the event loop)
+        llm_service = await async_db_manager.run(get_llm_service)
+        error_response = _validate_text_content(text_content, llm_service)
+        if error_response:
+            return error_response
+        
+        # Create submission record
+        submission = await async_db_manager.run(Submission.create, text_content, session_data['session_id'], session_data['user_id'])
+        
+        events = llm_service.evaluate_text_with_llm_stream(
+            text_content,
+            priority=llm_service.get_request_priority(text_content, session_data['is_admin'])
+        )
+        try:
+            first_event = await events.__anext__()
+        except Exception as e:
+            await events.aclose()
+            return _llm_error_response(e)
+        
+        async def event_stream():
+            try:
+                yield _format_sse(*first_event)
+                async for event, data in events:
+                    if event == "complete":
+                        evaluation = await async_db_manager.run(store_evaluation, submission.id, data, session_data['user_id'])
+                        data = {"evaluation": data, "evaluation_id": evaluation.id}
+                    yield _format_sse(event, data)
+            except Exception as e:
+                logger.error(f"Streaming evaluation failed: {e}")
+                yield _format_sse("error", describe_llm_error(e)[2])
+            finally:
+                await events.aclose()
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        
+    except Exception as e:
+        logger.error(f"Streaming evaluation submission failed: {e}")
+        return _error_response(
+            500, "INTERNAL_ERROR", "Evaluation processing failed",
+            None, "An internal error occurred during evaluation processing"
+        )
+
+@app.post("/api/v1/evaluations/batch")
+async def submit_evaluation_batch(request: Request):
+    """Submit many texts for background evaluation in one request (authenticated users only)
+    
+    Returns 202 with one job per text; poll `/api/v1/evaluations/batch/{batch_id}`
+    for per-item progress.
+    """
+    try:
+        session_data, error_response = await _authenticate_evaluation_request(request)
+        if error_response:
+            return error_response
+        
+        # Parse request body
+        body = await request.json()
+        texts = body.get("texts")
+        llm_service = await async_db_manager.run(get_llm_service)
+        max_items = llm_service.llm_config.performance_optimization.get('batch_max_items', 100)
+        
+        if not isinstance(texts, list) or not texts:
+            return _error_response(
+                400, "VALIDATION_ERROR", "Texts are required",
+                "texts", "Please provide a non-empty list of texts for evaluation"
+            )
+        if len(texts) > max_items:
+            return _error_response(
+                400, "VALIDATION_ERROR", "Too many texts",
+                "texts", f"A batch can contain at most {max_items} texts"
+            )
+        for index, text_content in enumerate(texts):
+            error_response = _validate_text_content(text_content if isinstance(text_content, str) else "", llm_service)
+            if error_response:
+                error = json.loads(error_response.body)["errors"][0]
+                return _error_response(400, error["code"], error["message"], f"texts[{index}]", error["details"])
+        
+        # Create all submissions and their jobs in one transaction each
+        batch_id = uuid.uuid4().hex
+        submissions = await async_db_manager.run(Submission.create_many, texts, session_data['session_id'], session_data['user_id'])
+        jobs = await async_db_manager.run(
+            EvaluationJob.create_many,
+            [submission.id for submission in submissions],
+            batch_id,
+            user_id=session_data['user_id'],
+            priority=PRIORITY_ADMIN if session_data['is_admin'] else PRIORITY_NORMAL
+        )
+        get_batch_dispatcher().start(batch_id, list(zip(jobs, submissions)))
+        
+        status_url = f"/api/v1/evaluations/batch/{batch_id}"
         return JSONResponse(
-            status_code=500,
+            status_code=202,
+            headers={"Location": status_url},
             content={
-                "data": None,
+                "data": {
+                    "batch_id": batch_id,
+                    "status_url": status_url,
+                    "items": [
+                        {"index": index, "job_id": job.id, "submission_id": job.submission_id, "status": job.status}
+                        for index, job in enumerate(jobs)
+                    ]
+                },
                 "meta": {
                     "timestamp": datetime.utcnow().isoformat(),
                     "request_id": "placeholder"
                 },
-                "errors": [{
-                    "code": "INTERNAL_ERROR",
-                    "message": "Evaluation processing failed",
-                    "field": None,
-                    "details": "An internal error occurred during evaluation processing"
-                }]
+                "errors": []
             }
         )
+        
+    except Exception as e:
+        logger.error(f"Batch submission failed: {e}")
+        return _error_response(
+            500, "INTERNAL_ERROR", "Batch submission failed",
+            None, "An internal error occurred during batch submission"
+        )
 
-@app.get("/api/v1/evaluations/{evaluation_id}")
-async def get_evaluation(evaluation_id: str):
-    """Get evaluation results by ID"""
+@app.get("/api/v1/evaluations/batch/{batch_id}")
+async def get_evaluation_batch(batch_id: str, request: Request):
+    """Get per-item progress of a batch submission"""
     try:
-        # Placeholder implementation
+        session_data, error_response = await _authenticate_evaluation_request(request)
+        if error_response:
+            return error_response
+        
+        jobs = await async_db_manager.run(EvaluationJob.get_by_batch, batch_id)
+        if not jobs or (jobs[0].user_id != session_data['user_id'] and not session_data['is_admin']):
+            return _error_response(
+                404, "NOT_FOUND", "Batch not found", "batch_id", f"No batch with ID {batch_id}"
+            )
+        
+        counts = {status: 0 for status in (
+            EvaluationJob.STATUS_QUEUED, EvaluationJob.STATUS_RUNNING,
+            EvaluationJob.STATUS_COMPLETED, EvaluationJob.STATUS_FAILED
+        )}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        
         return {
             "data": {
-                "evaluation": {
-                    "id": evaluation_id,
-                    "overall_score": 3.5,
-                    "strengths": "Sample strengths",
-                    "opportunities": "Sample opportunities",
-                    "rubric_scores": {},
-                    "segment_feedback": [],
-                    "created_at": datetime.utcnow().isoformat()
-                }
+                "batch_id": batch_id,
+                "total": len(jobs),
+                "done": counts[EvaluationJob.STATUS_COMPLETED] + counts[EvaluationJob.STATUS_FAILED] == len(jobs),
+                "counts": counts,
+                "items": [
+                    {
+                        "index": index,
+                        "job_id": job.id,
+                        "submission_id": job.submission_id,
+                        "status": job.status,
+                        "evaluation_id": job.evaluation_id,
+                        "error": json.loads(job.error) if job.error else None
+                    }
+                    for index, job in enumerate(jobs)
+                ]
+            },
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "request_id": "placeholder"
             },
+            "errors": []
+        }
+    except Exception as e:
+        logger.error(f"Batch retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve batch")
+
+def _format_evaluation(evaluation: Evaluation) -> Dict[str, Any]:
+    """Serialize a stored evaluation for API responses"""
+    return {
+        "id": evaluation.id,
+        "submission_id": evaluation.submission_id,
+        "overall_score": evaluation.overall_score,
+        "strengths": json.loads(evaluation.strengths),
+        "opportunities": json.loads(evaluation.opportunities),
+        "rubric_scores": json.loads(evaluation.rubric_scores),
+        "segment_feedback": json.loads(evaluation.segment_feedback),
+        "llm_provider": evaluation.llm_provider,
+        "llm_model": evaluation.llm_model,
+        "processing_time": evaluation.processing_time,
+        "token_usage": {
+            "input_tokens": evaluation.input_tokens,
+            "output_tokens": evaluation.output_tokens,
+            "cache_read_tokens": evaluation.cache_read_tokens,
+            "cache_write_tokens": evaluation.cache_write_tokens
+        },
+        "cost_usd": evaluation.cost_usd,
+        "created_at": evaluation.created_at.isoformat()
+    }
+
+async def _get_evaluation_owner(evaluation_id: int):
+    """Return the user id that submitted an evaluation, or None"""
+    result = await async_db_manager.execute_query("""
+        SELECT s.user_id FROM evaluations e
+        JOIN submissions s ON e.submission_id = s.id
+        WHERE e.id = ?
+    """, (evaluation_id,))
+    return result[0]['user_id'] if result else None
+
+@app.get("/api/v1/evaluations/{evaluation_id}")
+async def get_evaluation(evaluation_id: str, request: Request):
+    """Get an evaluation result, or the status of an asynchronous evaluation job, by ID
+    
+    Users can read their own evaluations and jobs; admins can read all of them.
+    """
+    try:
+        session_data, error_response = await _authenticate_evaluation_request(request)
+        if error_response:
+            return error_response
+        
+        not_found = _error_response(
+            404, "NOT_FOUND", "Evaluation not found", "evaluation_id",
+            f"No evaluation or job with ID {evaluation_id}"
+        )
+        
+        job = None if evaluation_id.isdigit() else await async_db_manager.run(EvaluationJob.get_by_id, evaluation_id)
+        if job is not None:
+            if job.user_id != session_data['user_id'] and not session_data['is_admin']:
+                return not_found
+            evaluation = await async_db_manager.run(Evaluation.get_by_id, job.evaluation_id) if job.evaluation_id else None
+            data = {
+                "job": {
+                    "id": job.id,
+                    "status": job.status,
+                    "created_at": job.created_at.isoformat(),
+                    "started_at": job.started_at.isoformat() if job.started_at else None,
+                    "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+                    "error": json.loads(job.error) if job.error else None
+                },
+                "evaluation": _format_evaluation(evaluation) if evaluation else None
+            }
+        elif evaluation_id.isdigit():
+            evaluation = await async_db_manager.run(Evaluation.get_by_id, int(evaluation_id))
+            if evaluation is None:
+                return not_found
+            if await _get_evaluation_owner(evaluation.id) != session_data['user_id'] and not session_data['is_admin']:
+                return not_found
+            data = {"evaluation": _format_evaluation(evaluation)}
+        else:
+            return not_found
+        
+        return {
+            "data": data,
             "meta": {
                 "timestamp": datetime.utcnow().isoformat(),
                 "request_id": "placeholder"
@@ -1497,7 +1781,7 @@ async def get_last_evaluations(request: Request):
         
         # Validate session and check admin status
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -1526,24 +1810,23 @@ async def get_last_evaluations(request: Request):
             SELECT 
                 e.id, e.submission_id, e.overall_score, e.processing_time,
                 e.created_at, e.llm_provider, e.llm_model, e.debug_enabled,
-                e.raw_prompt, e.raw_response,
+                (length(e.raw_prompt) > 0 OR e.prompt_template_hash IS NOT NULL
+                    OR length(e.raw_response) > 0) AS has_raw_data,
                 s.text_content as submission_content,
                 u.username, u.is_admin
             FROM evaluations e
             JOIN submissions s ON e.submission_id = s.id
-            JOIN sessions sess ON s.session_id = sess.session_id
-            JOIN users u ON sess.user_id = u.id
+            JOIN users u ON s.user_id = u.id
             WHERE e.id IN (
                 SELECT MAX(e2.id) FROM evaluations e2
                 JOIN submissions s2 ON e2.submission_id = s2.id
-                JOIN sessions sess2 ON s2.session_id = sess2.session_id
-                GROUP BY sess2.user_id
+                GROUP BY s2.user_id
             )
             ORDER BY e.created_at DESC
             LIMIT 50
         """
         
-        result = db_manager.execute_query(query)
+        result = await async_db_manager.execute_query(query)
         
         evaluations = []
         for row in result:
@@ -1556,8 +1839,8 @@ async def get_last_evaluations(request: Request):
                 "llm_provider": row['llm_provider'],
                 "llm_model": row['llm_model'],
                 "debug_enabled": bool(row['debug_enabled']),
-                # Consider raw data available if either prompt or response exists
-                "has_raw_data": bool(row['raw_prompt'] or row['raw_response']),
+                # Consider raw data available if either prompt (text or template reference) or response exists
+                "has_raw_data": bool(row['has_raw_data']),
                 "submission_preview": row['submission_content'][:100] + "..." if len(row['submission_content']) > 100 else row['submission_content'],
                 "username": row['username'],
                 "is_admin": bool(row['is_admin'])
@@ -1583,6 +1866,110 @@ async def get_last_evaluations(request: Request):
             )
         )
 
+@app.get("/api/v1/admin/usage")
+async def get_usage(request: Request, period: str = UsageRollup.PERIOD_DAY,
+                    user_id: Optional[int] = None, limit: int = 31):
+    """Get token and cost rollups per day or month, overall and per user (admin only)
+    
+    Without `user_id` every rollup of the period is returned; rollups with
+    `user_id` 0 are the totals across all users.
+    """
+    try:
+        # Get session token from header
+        session_token = request.headers.get("X-Session-Token", "")
+        
+        if not session_token:
+            return JSONResponse(
+                status_code=401,
+                content=create_error_response(
+                    "AUTHENTICATION_ERROR",
+                    "Authentication required",
+                    "session_token",
+                    "Please log in to access admin functions"
+                )
+            )
+        
+        # Validate session and check admin status
+        auth_service = get_auth_service(config_service=config_service)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
+        
+        if not valid:
+            return JSONResponse(
+                status_code=401,
+                content=create_error_response(
+                    "AUTHENTICATION_ERROR",
+                    "Invalid session",
+                    "session_token",
+                    error or "Please log in again"
+                )
+            )
+        
+        if not session_data.get('is_admin', False):
+            return JSONResponse(
+                status_code=403,
+                content=create_error_response(
+                    "AUTHORIZATION_ERROR",
+                    "Admin access required",
+                    None,
+                    "This endpoint requires administrator privileges"
+                )
+            )
+        
+        if period not in (UsageRollup.PERIOD_DAY, UsageRollup.PERIOD_MONTH):
+            return JSONResponse(
+                status_code=400,
+                content=create_error_response(
+                    "VALIDATION_ERROR",
+                    "Invalid period",
+                    "period",
+                    "Period must be 'day' or 'month'"
+                )
+            )
+        
+        # The LLM service applies the pricing and limits from llm.yaml to the ledger
+        await async_db_manager.run(get_llm_service)
+        rollups = await async_db_manager.run(UsageRollup.list, period, user_id=user_id, limit=max(1, min(limit, 366)))
+        usernames = {
+            row['id']: row['username'] for row in await async_db_manager.execute_query("SELECT id, username FROM users")
+        }
+        summary = await async_db_manager.run(get_usage_ledger().get_summary)
+        
+        usage = [
+            {
+                "period_start": rollup.period_start,
+                "user_id": rollup.user_id or None,
+                "username": usernames.get(rollup.user_id),
+                "evaluations": rollup.evaluations,
+                "input_tokens": rollup.input_tokens,
+                "output_tokens": rollup.output_tokens,
+                "cache_read_tokens": rollup.cache_read_tokens,
+                "cache_write_tokens": rollup.cache_write_tokens,
+                "cost_usd": round(rollup.cost_usd, 6)
+            }
+            for rollup in rollups
+        ]
+        
+        return {
+            "data": {
+                "period": period,
+                "usage": usage,
+                "current": summary
+            },
+            "meta": {"timestamp": datetime.utcnow().isoformat(), "request_id": str(secrets.token_urlsafe(16))},
+            "errors": []
+        }
+    except Exception as e:
+        logger.error(f"Failed to get usage: {e}")
+        return JSONResponse(
+            status_code=500,
+            content=create_error_response(
+                "INTERNAL_ERROR",
+                "Failed to retrieve usage",
+                None,
+                "An internal error occurred while retrieving usage data"
+            )
+        )
+
 @app.get("/api/v1/admin/evaluation/{evaluation_id}/raw")
 async def get_evaluation_raw_data(evaluation_id: int, request: Request):
     """Get raw data for specific evaluation (admin only)"""
@@ -1603,7 +1990,7 @@ async def get_evaluation_raw_data(evaluation_id: int, request: Request):
         
         # Validate session and check admin status
         auth_service = get_auth_service(config_service=config_service)
-        valid, session_data, error = auth_service.validate_session(session_token)
+        valid, session_data, error = await async_db_manager.run(auth_service.validate_session, session_token)
         
         if not valid:
             return JSONResponse(
@@ -1628,7 +2015,7 @@ async def get_evaluation_raw_data(evaluation_id: int, request: Request):
             )
         
         # Get evaluation by ID
-        evaluation = Evaluation.get_by_id(evaluation_id)
+        evaluation = await async_db_manager.run(Evaluation.get_by_id, evaluation_id)
         if not evaluation:
             return JSONResponse(
                 status_code=404,
@@ -1641,7 +2028,8 @@ async def get_evaluation_raw_data(evaluation_id: int, request: Request):
             )
         
         # Get submission data
-        submission = Submission.get_by_id(evaluation.submission_id)
+        submission = await async_db_manager.run(Submission.get_by_id, evaluation.submission_id)
+        raw_prompt = await async_db_manager.run(load_raw_prompt, evaluation, submission.text_content if submission else "")
         
         return {
             "data": {
@@ -1654,7 +2042,8 @@ async def get_evaluation_raw_data(evaluation_id: int, request: Request):
                     "llm_provider": evaluation.llm_provider,
                     "llm_model": evaluation.llm_model,
                     "debug_enabled": evaluation.debug_enabled,
-                    "raw_prompt": evaluation.raw_prompt,
+                    # Rebuilt from the stored prompt template and the submitted text
+                    "raw_prompt": raw_prompt,
                     "raw_response": evaluation.raw_response,
                     "submission": {
                         "id": submission.id if submission else None,
@@ -2,7 +2,9 @@
 Database models for Memo AI Coach
 """
 
-from .database import DatabaseManager, db_manager
-from .entities import User, Session, Submission, Evaluation
+from .database import DatabaseManager, AsyncDatabaseManager, db_manager, async_db_manager
+from .entities import User, Session, Submission, Evaluation, EvaluationJob, UsageRollup, LoginAttempt, RevokedToken
 
-__all__ = ['DatabaseManager', 'db_manager', 'User', 'Session', 'Submission', 'Evaluation']
+__all__ = ['DatabaseManager', 'AsyncDatabaseManager', 'db_manager', 'async_db_manager', 'User', 'Session',
+           'Submission', 'Evaluation', 'EvaluationJob', 'UsageRollup', 'LoginAttempt',
+           'RevokedToken']
@@ -68,6 +68,7 @@ class ContextConfig(BaseModel):
 class RequestConfig(BaseModel):
     """Request configuration for prompts"""
     request_text: str = Field(..., description="Request text for the LLM")
+    chunk_text: Optional[str] = Field(None, description="Note added when evaluating one chunk of a long text ({part}, {total})")
 
 class PromptLanguageConfig(BaseModel):
     """Language-specific prompt configuration"""
@@ -97,10 +98,13 @@ class LLMConfig(BaseModel):
     api_configuration: Dict[str, Any] = Field(..., description="API configuration")
     request_settings: Dict[str, Any] = Field(..., description="Request settings")
     response_handling: Dict[str, Any] = Field(..., description="Response handling configuration")
+    error_handling: Dict[str, Any] = Field(default_factory=dict, description="Retry and error handling settings")
     performance_optimization: Dict[str, Any] = Field(..., description="Performance optimization settings")
     monitoring: Dict[str, Any] = Field(..., description="Monitoring configuration")
     fallback_configuration: Dict[str, Any] = Field(..., description="Fallback configuration")
     cost_management: Dict[str, Any] = Field(..., description="Cost management settings")
+    model_routing: Dict[str, Any] = Field(default_factory=dict, description="Model routing tiers and escalation settings")
+    debug_settings: Dict[str, Any] = Field(default_factory=dict, description="Debug logging and raw data storage settings")
     security: Dict[str, Any] = Field(..., description="Security settings")
     model_specific_settings: Dict[str, Any] = Field(..., description="Model-specific settings")
     validation_rules: Dict[str, Any] = Field(..., description="Validation rules")
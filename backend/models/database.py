@@ -4,17 +4,64 @@ Database connection and management for Memo AI Coach
 
 import sqlite3
 import os
+import time
+import queue
+import asyncio
 import logging
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Optional
+from typing import Optional, List, Tuple, Callable, Any
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Connection pool defaults (pool size and busy timeout can be overridden with
+# DATABASE_POOL_SIZE and DATABASE_BUSY_TIMEOUT_MS)
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_TIMEOUT = 30.0
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHED_STATEMENTS = 256
+
+# PRAGMA auto_vacuum value for incremental mode
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Group commit defaults: a group closes after this many writes or this many
+# seconds after its first write; the writer thread exits when idle this long
+DEFAULT_WRITE_BATCH_SIZE = 32
+DEFAULT_WRITE_BATCH_DELAY = 0.002
+WRITER_IDLE_TIMEOUT = 30.0
+
+# Applied to every pooled connection (journal_mode is persistent; the rest are per connection)
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = 10000",
+    "PRAGMA temp_store = memory",
+)
+
 class DatabaseManager:
-    """Database connection manager with connection pooling and error handling"""
+    """Database connection manager with connection pooling and error handling
     
-    def __init__(self, db_path: Optional[str] = None):
+    Connections are kept in a bounded LIFO pool and reused, so per-connection
+    settings (PRAGMAs, page cache, prepared statement cache) persist across
+    queries. A connection is used by one thread at a time; callers beyond the
+    pool size wait up to `pool_timeout` seconds for one to be returned.
+    
+    Writes do not use the pool: they are queued to a single writer thread
+    that commits them in groups (group commit), so concurrent writers share
+    one transaction and one fsync instead of contending for SQLite's write
+    lock. Each write runs in its own savepoint, so a failing write does not
+    affect the others in its group.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None, pool_size: Optional[int] = None,
+                 pool_timeout: float = DEFAULT_POOL_TIMEOUT, busy_timeout_ms: Optional[int] = None,
+                 mmap_size: int = DEFAULT_MMAP_SIZE, cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+                 write_batch_delay: float = DEFAULT_WRITE_BATCH_DELAY):
         """Initialize database manager"""
         if db_path is None:
             # Get database URL from environment
@@ -42,7 +89,14 @@ class DatabaseManager:
             db_path = os.path.normpath(db_path)
 
         self.db_path = db_path
-        self._connection = None
+        self.pool_size = max(1, pool_size or int(os.getenv('DATABASE_POOL_SIZE', DEFAULT_POOL_SIZE)))
+        self.pool_timeout = pool_timeout
+        self.busy_timeout_ms = busy_timeout_ms or int(os.getenv('DATABASE_BUSY_TIMEOUT_MS', DEFAULT_BUSY_TIMEOUT_MS))
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.write_batch_size = max(1, write_batch_size)
+        self.write_batch_delay = write_batch_delay
+        self._reset_pool()
 
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
@@ -50,23 +104,279 @@ class DatabaseManager:
         logger.info(f"Database manager initialized with path: {self.db_path}")
         logger.info(f"Database URL: {os.getenv('DATABASE_URL', 'not set')}")
     
+    def _reset_pool(self):
+        """Start with an empty pool (also used in a forked child, which must not share the parent's connections)"""
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=self.pool_size)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stats = {"created": 0, "reused": 0, "waits": 0, "timeouts": 0, "discarded": 0, "in_use": 0}
+        self._write_queue: "queue.Queue[Optional[Tuple[Callable[[sqlite3.Cursor], Any], Future]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._write_stats = {"writes": 0, "failed": 0, "groups": 0, "largest_group": 0}
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection and apply the runtime PRAGMAs"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,  # Pooled connections move between threads, one at a time
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row  # Enable row factory for named access
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+    
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle pooled connection, open a new one below the pool size, or wait for one"""
+        if self._pid != os.getpid():
+            self._reset_pool()
+        try:
+            conn = self._pool.get_nowait()
+            with self._lock:
+                self._stats["reused"] += 1
+                self._stats["in_use"] += 1
+            return conn
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_open = self._stats["created"] - self._stats["discarded"] < self.pool_size
+            if can_open:
+                self._stats["created"] += 1
+            else:
+                self._stats["waits"] += 1
+        if can_open:
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self._lock:
+                    self._stats["created"] -= 1
+                raise
+        else:
+            try:
+                conn = self._pool.get(timeout=self.pool_timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise sqlite3.OperationalError(
+                    f"No database connection available within {self.pool_timeout}s (pool size {self.pool_size})"
+                )
+        with self._lock:
+            self._stats["in_use"] += 1
+        return conn
+    
+    def _release(self, conn: sqlite3.Connection, broken: bool = False):
+        """Return a connection to the pool, rolling back any open transaction; close it if unusable"""
+        with self._lock:
+            self._stats["in_use"] -= 1
+        if not broken and self._pid == os.getpid():
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._pool.put_nowait(conn)
+                return
+            except (sqlite3.Error, queue.Full):
+                pass
+        with self._lock:
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
     @contextmanager
     def get_connection(self):
-        """Get database connection with context management"""
-        conn = None
+        """Get a pooled database connection with context management"""
+        conn = self._acquire()
+        broken = False
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable row factory for named access
             yield conn
         except Exception as e:
             logger.error(f"Database connection error: {e}")
-            if conn:
+            try:
                 conn.rollback()
+            except sqlite3.Error:
+                broken = True
+            # Errors other than SQL-level ones may leave the connection unusable
+            broken = broken or isinstance(e, (sqlite3.InterfaceError, sqlite3.InternalError))
             raise
         finally:
-            if conn:
+            self._release(conn, broken)
+    
+    def submit_write(self, work: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """
+        Queue a write for the writer thread
+        
+        Args:
+            work: Function given a cursor inside the group's transaction; it
+                must not commit
+        
+        Returns:
+            Future resolving to the function's result once its group is
+            committed, or to the exception it (or the commit) raised
+        """
+        if self._pid != os.getpid():
+            self._reset_pool()
+        future: Future = Future()
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+                self._writer.start()
+            self._write_queue.put((work, future))
+        return future
+    
+    def submit_insert(self, query: str, params: tuple = ()) -> Future:
+        """Queue an insert; the future resolves to its `lastrowid`"""
+        return self.submit_write(lambda cursor: cursor.execute(query, params).lastrowid)
+    
+    def _writer_loop(self):
+        """Drain the write queue, committing up to `write_batch_size` writes per transaction"""
+        conn = None
+        try:
+            while True:
+                try:
+                    first = self._write_queue.get(timeout=WRITER_IDLE_TIMEOUT)
+                except queue.Empty:
+                    with self._lock:
+                        if self._write_queue.empty():
+                            self._writer = None
+                            return
+                    continue
+                if first is None:
+                    return
+                group = [first]
+                deadline = time.monotonic() + self.write_batch_delay
+                while len(group) < self.write_batch_size:
+                    try:
+                        item = self._write_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._write_queue.put(None)
+                        break
+                    group.append(item)
+                try:
+                    if conn is None:
+                        conn = self._open_connection()
+                        conn.isolation_level = None  # Transactions are managed explicitly per group
+                except Exception as e:
+                    logger.error(f"Database writer could not open a connection: {e}")
+                    for _, future in group:
+                        if future.set_running_or_notify_cancel():
+                            self._resolve(future, False, e)
+                    continue
+                # Writes cancelled while queued are skipped; the rest can no longer be cancelled
+                group = [(work, future) for work, future in group if future.set_running_or_notify_cancel()]
+                if group:
+                    self._commit_group(conn, group)
+        except Exception as e:
+            logger.error(f"Database writer stopped: {e}")
+            with self._lock:
+                self._writer = None
+        finally:
+            if conn is not None:
                 conn.close()
     
+    def _commit_group(self, conn: sqlite3.Connection, group: List[Tuple[Callable, Future]]):
+        """Run a group of writes in one transaction, each in its own savepoint"""
+        outcomes = []
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            for work, _ in group:
+                cursor.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((True, work(cursor)))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write")
+                    outcomes.append((False, e))
+                cursor.execute("RELEASE write")
+            cursor.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Database write group of {len(group)} failed: {e}")
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            outcomes = [(False, e)] * len(group)
+        
+        with self._lock:
+            self._write_stats["groups"] += 1
+            self._write_stats["largest_group"] = max(self._write_stats["largest_group"], len(group))
+            self._write_stats["writes"] += len(group)
+            self._write_stats["failed"] += sum(1 for ok, _ in outcomes if not ok)
+        for (_, future), (ok, value) in zip(group, outcomes):
+            self._resolve(future, ok, value)
+    
+    @staticmethod
+    def _resolve(future: Future, ok: bool, value: Any):
+        """Complete one write's future without letting a failure stop the writer"""
+        try:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        except Exception as e:
+            logger.error(f"Could not complete database write future: {e}")
+    
+    def write_stats(self) -> dict:
+        """Writer thread counters"""
+        with self._lock:
+            stats = dict(self._write_stats)
+            stats["running"] = self._writer is not None
+        stats["queued"] = self._write_queue.qsize()
+        return stats
+    
+    def compact(self, max_pages: int = 1000) -> int:
+        """Return up to `max_pages` free pages to the filesystem and refresh planner statistics
+        
+        Pages are only released when the database uses `auto_vacuum = INCREMENTAL`;
+        otherwise they stay on the freelist for reuse. Returns the pages released.
+        """
+        def work(cursor):
+            free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            released = 0
+            if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+                # Each statement step frees one page, and sqlite3 steps a pragma only once
+                for _ in range(min(free_pages, max_pages)):
+                    cursor.execute("PRAGMA incremental_vacuum(1)")
+                released = free_pages - cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            cursor.execute("PRAGMA optimize")
+            return released
+        return self.submit_write(work).result()
+    
+    def pool_stats(self) -> dict:
+        """Connection pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["open"] = stats["created"] - stats["discarded"]
+        stats["idle"] = self._pool.qsize()
+        stats["size"] = self.pool_size
+        return stats
+    
+    def close(self):
+        """Stop the writer thread after queued writes and close all idle pooled connections"""
+        with self._lock:
+            writer = self._writer
+            if writer is not None:
+                self._write_queue.put(None)
+        if writer is not None:
+            writer.join()
+            with self._lock:
+                self._writer = None
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._stats["discarded"] += 1
+            conn.close()
+    
     def health_check(self) -> dict:
         """Check database health and connectivity"""
         try:
@@ -107,12 +417,14 @@ class DatabaseManager:
                     "journal_mode": journal_mode,
                     "integrity": integrity_check,
                     "user_count": user_count,
-                    "db_path": self.db_path
+                    "db_path": self.db_path,
+                    "pool": self.pool_stats(),
+                    "writer": self.write_stats()
                 }
                 
         except Exception as e:
             logger.error(f"Database health check failed: {e}")
-            return {"status": "unhealthy", "error": str(e)}
+            return {"status": "unhealthy", "error": str(e), "pool": self.pool_stats(), "writer": self.write_stats()}
     
     def execute_query(self, query: str, params: tuple = ()) -> list:
         """Execute a query and return results"""
@@ -123,19 +435,84 @@ class DatabaseManager:
     
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute an update query and return affected rows"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+        return self.submit_write(lambda cursor: cursor.execute(query, params).rowcount).result()
     
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Execute an insert query and return the last row ID"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
+        return self.submit_insert(query, params).result()
+    
+    def execute_insert_many(self, query: str, params_list: List[tuple]) -> List[int]:
+        """Execute an insert query for each parameter tuple atomically and return the row IDs"""
+        return self.execute_transaction([(query, params) for params in params_list])
+    
+    def execute_transaction(self, statements: List[Tuple[str, tuple]]) -> List[int]:
+        """Execute (query, params) statements atomically and return the last row ID of each"""
+        return self.submit_write(
+            lambda cursor: [cursor.execute(query, params).lastrowid for query, params in statements]
+        ).result()
+    
+    def execute_update_many(self, query: str, params_list: List[tuple]) -> int:
+        """Execute an update query for each parameter tuple atomically and return affected rows"""
+        return self.submit_write(lambda cursor: cursor.executemany(query, params_list).rowcount).result()
+
+class AsyncDatabaseManager:
+    """Awaitable database access for async request handlers
+    
+    Blocking sqlite calls run on a dedicated thread pool sized to the
+    connection pool, so they never stall the event loop (e.g. while another
+    connection holds the write lock or a WAL checkpoint runs) and never
+    compete with LLM work for the default executor. `run` takes any blocking
+    callable, such as an entity classmethod.
+    """
+    
+    def __init__(self, manager: DatabaseManager):
+        self.manager = manager
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.manager.pool_size, thread_name_prefix="db")
+            return self._executor
+    
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking database call on the database threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+    
+    async def execute_query(self, query: str, params: tuple = ()) -> list:
+        return await self.run(self.manager.execute_query, query, params)
+    
+    # Writes await the writer thread's futures directly instead of holding a database thread.
+    # They are shielded: a cancelled caller stops waiting, but a queued write still commits.
+    
+    @staticmethod
+    async def _await_write(future: Future) -> Any:
+        return await asyncio.shield(asyncio.wrap_future(future))
+    
+    async def execute_update(self, query: str, params: tuple = ()) -> int:
+        return await self._await_write(
+            self.manager.submit_write(lambda cursor: cursor.execute(query, params).rowcount)
+        )
+    
+    async def execute_insert(self, query: str, params: tuple = ()) -> int:
+        return await self._await_write(self.manager.submit_insert(query, params))
+    
+    async def execute_transaction(self, statements: List[Tuple[str, tuple]]) -> List[int]:
+        return await self._await_write(self.manager.submit_write(
+            lambda cursor: [cursor.execute(query, params).lastrowid for query, params in statements]
+        ))
+    
+    def shutdown(self):
+        """Stop the database threads after pending calls finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
 
 # Global database manager instance
 db_manager = DatabaseManager()
+
+# Async access to the global database manager
+async_db_manager = AsyncDatabaseManager(db_manager)
@@ -2,14 +2,33 @@
 Database entity models for Memo AI Coach
 """
 
+import json
+import time
+import uuid
+import zlib
 import sqlite3
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union
 from .database import db_manager
 
 logger = logging.getLogger(__name__)
 
+# Encoding recorded for compressed raw responses (NULL for plain text)
+RESPONSE_ENCODING_ZLIB = "zlib"
+
+def compress_text(text: Optional[str]) -> Tuple[Optional[Union[str, bytes]], Optional[str]]:
+    """Compress text for storage; returns (value, encoding)"""
+    if not text:
+        return text, None
+    return sqlite3.Binary(zlib.compress(text.encode('utf-8'))), RESPONSE_ENCODING_ZLIB
+
+def decompress_text(value: Optional[Union[str, bytes]], encoding: Optional[str]) -> Optional[str]:
+    """Inverse of `compress_text`; rows written before compression are returned unchanged"""
+    if encoding == RESPONSE_ENCODING_ZLIB and value is not None:
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
 class User:
     """User entity model"""
     
@@ -130,23 +149,28 @@ class Session:
         self.is_active = is_active
     
     @classmethod
-    def create(cls, session_id: str, user_id: Optional[int] = None, is_admin: bool = False, config_service=None) -> 'Session':
-        """Create a new session"""
+    def timeout_seconds(cls, config_service=None) -> int:
+        """Session lifetime from the auth configuration"""
+        # Use injected config service or get default if not provided
+        if config_service is None:
+            from services.config_service import config_service as default_config_service
+            config_service = default_config_service
+        
+        auth_config = config_service.get_auth_config()
+        
+        # Default to 1 hour if configuration is not available
+        session_timeout_seconds = 3600
+        if auth_config and 'session_management' in auth_config:
+            session_timeout_seconds = auth_config['session_management'].get('session_timeout', 3600)
+        return session_timeout_seconds
+    
+    @classmethod
+    def create(cls, session_id: str, user_id: Optional[int] = None, is_admin: bool = False, config_service=None,
+               expires_at: Optional[datetime] = None) -> 'Session':
+        """Create a new session (expiring after the configured timeout unless `expires_at` is given)"""
         try:
-            # Use injected config service or get default if not provided
-            if config_service is None:
-                from services.config_service import config_service as default_config_service
-                config_service = default_config_service
-            
-            auth_config = config_service.get_auth_config()
-            
-            # Default to 1 hour if configuration is not available
-            session_timeout_seconds = 3600
-            if auth_config and 'session_management' in auth_config:
-                session_timeout_seconds = auth_config['session_management'].get('session_timeout', 3600)
-            
-
-            expires_at = datetime.utcnow() + timedelta(seconds=session_timeout_seconds)
+            if expires_at is None:
+                expires_at = datetime.utcnow() + timedelta(seconds=cls.timeout_seconds(config_service))
             query = """
                 INSERT INTO sessions (session_id, user_id, is_admin, created_at, expires_at, is_active)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -223,6 +247,26 @@ class Session:
             logger.error(f"Session retrieval failed: {e}")
             raise
             
+    @classmethod
+    def delete_expired(cls, batch_size: int = 500) -> int:
+        """Delete up to `batch_size` expired or inactive sessions
+        
+        Submissions keep their session_id as history only; ownership is read
+        from their own user_id, so no session has to outlive its expiry.
+        """
+        try:
+            query = """
+                DELETE FROM sessions WHERE id IN (
+                    SELECT id FROM sessions
+                    WHERE is_active = FALSE OR expires_at <= ?
+                    LIMIT ?
+                )
+            """
+            return db_manager.execute_update(query, (datetime.utcnow(), batch_size))
+        except Exception as e:
+            logger.error(f"Expired session deletion failed: {e}")
+            raise
+    
     @classmethod
     def get_active_sessions(cls) -> List['Session']:
         """Get all active sessions"""
@@ -253,26 +297,49 @@ class Submission:
     """Submission entity model"""
     
     def __init__(self, id: Optional[int] = None, text_content: str = "", session_id: str = "",
-                 created_at: Optional[datetime] = None):
+                 created_at: Optional[datetime] = None, user_id: Optional[int] = None):
         self.id = id
         self.text_content = text_content
         self.session_id = session_id
         self.created_at = created_at or datetime.utcnow()
+        self.user_id = user_id
+    
+    # The owner is stored on the submission; without an explicit user_id it is taken from the session
+    INSERT_QUERY = """
+        INSERT INTO submissions (text_content, session_id, created_at, user_id)
+        VALUES (?, ?, ?, COALESCE(?, (SELECT user_id FROM sessions WHERE session_id = ?)))
+    """
     
     @classmethod
-    def create(cls, text_content: str, session_id: str) -> 'Submission':
+    def create(cls, text_content: str, session_id: str, user_id: Optional[int] = None) -> 'Submission':
         """Create a new submission"""
         try:
-            query = """
-                INSERT INTO submissions (text_content, session_id, created_at)
-                VALUES (?, ?, ?)
-            """
-            submission_id = db_manager.execute_insert(query, (text_content, session_id, datetime.utcnow()))
+            submission_id = db_manager.execute_insert(
+                cls.INSERT_QUERY, (text_content, session_id, datetime.utcnow(), user_id, session_id)
+            )
             return cls.get_by_id(submission_id)
         except Exception as e:
             logger.error(f"Submission creation failed: {e}")
             raise
     
+    @classmethod
+    def create_many(cls, text_contents: List[str], session_id: str, user_id: Optional[int] = None) -> List['Submission']:
+        """Create several submissions in one transaction"""
+        try:
+            created_at = datetime.utcnow()
+            submission_ids = db_manager.execute_insert_many(
+                cls.INSERT_QUERY,
+                [(text_content, session_id, created_at, user_id, session_id) for text_content in text_contents]
+            )
+            return [
+                cls(id=submission_id, text_content=text_content, session_id=session_id, created_at=created_at,
+                    user_id=user_id)
+                for submission_id, text_content in zip(submission_ids, text_contents)
+            ]
+        except Exception as e:
+            logger.error(f"Submission batch creation failed: {e}")
+            raise
+    
     @classmethod
     def get_by_id(cls, submission_id: int) -> Optional['Submission']:
         """Get submission by ID"""
@@ -285,7 +352,8 @@ class Submission:
                     id=row['id'],
                     text_content=row['text_content'],
                     session_id=row['session_id'],
-                    created_at=datetime.fromisoformat(row['created_at'])
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    user_id=row['user_id']
                 )
             return None
         except Exception as e:
@@ -304,7 +372,8 @@ class Submission:
                     id=row['id'],
                     text_content=row['text_content'],
                     session_id=row['session_id'],
-                    created_at=datetime.fromisoformat(row['created_at'])
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    user_id=row['user_id']
                 ))
             return submissions
         except Exception as e:
@@ -319,7 +388,9 @@ class Evaluation:
                  segment_feedback: str = "", llm_provider: str = "claude", llm_model: str = "",
                  raw_prompt: Optional[str] = None, raw_response: Optional[str] = None,
                  debug_enabled: bool = False, processing_time: Optional[float] = None,
-                 created_at: Optional[datetime] = None):
+                 created_at: Optional[datetime] = None, input_tokens: int = 0, output_tokens: int = 0,
+                 cache_read_tokens: int = 0, cache_write_tokens: int = 0, cost_usd: float = 0.0,
+                 prompt_template_hash: Optional[str] = None, prompt_parts: Optional[List[List[int]]] = None):
         self.id = id
         self.submission_id = submission_id
         self.overall_score = overall_score
@@ -334,56 +405,135 @@ class Evaluation:
         self.debug_enabled = debug_enabled
         self.processing_time = processing_time
         self.created_at = created_at or datetime.utcnow()
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.cache_write_tokens = cache_write_tokens
+        self.cost_usd = cost_usd
+        self.prompt_template_hash = prompt_template_hash
+        self.prompt_parts = prompt_parts
+    
+    INSERT_QUERY = """
+        INSERT INTO evaluations (
+            submission_id, overall_score, strengths, opportunities, rubric_scores,
+            segment_feedback, llm_provider, llm_model, raw_prompt, raw_response,
+            debug_enabled, processing_time, created_at,
+            input_tokens, output_tokens, cache_read_tokens, cache_write_tokens, cost_usd,
+            prompt_template_hash, prompt_parts, response_encoding
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    @classmethod
+    def _statements(cls, record: Dict[str, Any], created_at: datetime) -> List[tuple]:
+        """Insert statement for one evaluation, its prompt template and its usage ledger updates
+        
+        The raw response is compressed; the prompt is stored as a reference to
+        a row of `prompt_templates` (inserted once per distinct template) plus
+        the memo chunk offsets, unless a rendered `raw_prompt` is given.
+        """
+        tokens = {
+            field: record.get(field) or 0
+            for field in ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens')
+        }
+        cost_usd = record.get('cost_usd') or 0.0
+        template = record.get('prompt_template')
+        prompt_parts = record.get('prompt_parts')
+        raw_response, response_encoding = compress_text(record.get('raw_response'))
+        statements = [(cls.INSERT_QUERY, (
+            record['submission_id'], record['overall_score'], record['strengths'], record['opportunities'],
+            record['rubric_scores'], record['segment_feedback'], record.get('llm_provider', 'claude'),
+            record.get('llm_model', ''), record.get('raw_prompt'), raw_response,
+            record.get('debug_enabled', False), record.get('processing_time'), created_at,
+            tokens['input_tokens'], tokens['output_tokens'], tokens['cache_read_tokens'],
+            tokens['cache_write_tokens'], cost_usd, template['template_hash'] if template else None,
+            json.dumps(prompt_parts) if prompt_parts else None, response_encoding
+        ))]
+        if template:
+            statements.append(PromptTemplate.insert_statement(template, created_at))
+        return statements + UsageRollup.record_statements(record.get('user_id'), tokens, cost_usd, created_at)
     
     @classmethod
     def create(cls, submission_id: int, overall_score: float, strengths: str, opportunities: str,
                rubric_scores: str, segment_feedback: str, llm_provider: str = "claude",
                llm_model: str = "", raw_prompt: Optional[str] = None, raw_response: Optional[str] = None,
-               debug_enabled: bool = False, processing_time: Optional[float] = None) -> 'Evaluation':
-        """Create a new evaluation"""
+               debug_enabled: bool = False, processing_time: Optional[float] = None,
+               input_tokens: int = 0, output_tokens: int = 0, cache_read_tokens: int = 0,
+               cache_write_tokens: int = 0, cost_usd: float = 0.0, user_id: Optional[int] = None,
+               prompt_template: Optional[Dict[str, Any]] = None,
+               prompt_parts: Optional[List[List[int]]] = None) -> 'Evaluation':
+        """Create a new evaluation and add its token usage and cost to the usage ledger"""
         try:
-            query = """
-                INSERT INTO evaluations (
-                    submission_id, overall_score, strengths, opportunities, rubric_scores,
-                    segment_feedback, llm_provider, llm_model, raw_prompt, raw_response,
-                    debug_enabled, processing_time, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            evaluation_id = db_manager.execute_insert(query, (
-                submission_id, overall_score, strengths, opportunities, rubric_scores,
-                segment_feedback, llm_provider, llm_model, raw_prompt, raw_response,
-                debug_enabled, processing_time, datetime.utcnow()
-            ))
+            record = {
+                "submission_id": submission_id, "overall_score": overall_score, "strengths": strengths,
+                "opportunities": opportunities, "rubric_scores": rubric_scores, "segment_feedback": segment_feedback,
+                "llm_provider": llm_provider, "llm_model": llm_model, "raw_prompt": raw_prompt,
+                "raw_response": raw_response, "debug_enabled": debug_enabled, "processing_time": processing_time,
+                "input_tokens": input_tokens, "output_tokens": output_tokens, "cache_read_tokens": cache_read_tokens,
+                "cache_write_tokens": cache_write_tokens, "cost_usd": cost_usd, "user_id": user_id,
+                "prompt_template": prompt_template, "prompt_parts": prompt_parts
+            }
+            evaluation_id = db_manager.execute_transaction(cls._statements(record, datetime.utcnow()))[0]
             return cls.get_by_id(evaluation_id)
         except Exception as e:
             logger.error(f"Evaluation creation failed: {e}")
             raise
     
+    @classmethod
+    def create_many(cls, records: List[Dict[str, Any]]) -> List[int]:
+        """Create several evaluations (and their usage ledger updates) in one transaction
+        
+        Args:
+            records: Dicts with the same keys as the `create` arguments
+            
+        Returns:
+            IDs of the new evaluations, in order
+        """
+        try:
+            created_at = datetime.utcnow()
+            statements = []
+            insert_positions = []
+            for record in records:
+                insert_positions.append(len(statements))
+                statements.extend(cls._statements(record, created_at))
+            row_ids = db_manager.execute_transaction(statements)
+            return [row_ids[position] for position in insert_positions]
+        except Exception as e:
+            logger.error(f"Evaluation batch creation failed: {e}")
+            raise
+    
+    @classmethod
+    def _from_row(cls, row: sqlite3.Row) -> 'Evaluation':
+        return cls(
+            id=row['id'],
+            submission_id=row['submission_id'],
+            overall_score=row['overall_score'],
+            strengths=row['strengths'],
+            opportunities=row['opportunities'],
+            rubric_scores=row['rubric_scores'],
+            segment_feedback=row['segment_feedback'],
+            llm_provider=row['llm_provider'],
+            llm_model=row['llm_model'],
+            raw_prompt=row['raw_prompt'],
+            raw_response=decompress_text(row['raw_response'], row['response_encoding']),
+            debug_enabled=bool(row['debug_enabled']),
+            processing_time=row['processing_time'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            input_tokens=row['input_tokens'] or 0,
+            output_tokens=row['output_tokens'] or 0,
+            cache_read_tokens=row['cache_read_tokens'] or 0,
+            cache_write_tokens=row['cache_write_tokens'] or 0,
+            cost_usd=row['cost_usd'] or 0.0,
+            prompt_template_hash=row['prompt_template_hash'],
+            prompt_parts=json.loads(row['prompt_parts']) if row['prompt_parts'] else None
+        )
+    
     @classmethod
     def get_by_id(cls, evaluation_id: int) -> Optional['Evaluation']:
         """Get evaluation by ID"""
         try:
             query = "SELECT * FROM evaluations WHERE id = ?"
             result = db_manager.execute_query(query, (evaluation_id,))
-            if result:
-                row = result[0]
-                return cls(
-                    id=row['id'],
-                    submission_id=row['submission_id'],
-                    overall_score=row['overall_score'],
-                    strengths=row['strengths'],
-                    opportunities=row['opportunities'],
-                    rubric_scores=row['rubric_scores'],
-                    segment_feedback=row['segment_feedback'],
-                    llm_provider=row['llm_provider'],
-                    llm_model=row['llm_model'],
-                    raw_prompt=row['raw_prompt'],
-                    raw_response=row['raw_response'],
-                    debug_enabled=bool(row['debug_enabled']),
-                    processing_time=row['processing_time'],
-                    created_at=datetime.fromisoformat(row['created_at'])
-                )
-            return None
+            return cls._from_row(result[0]) if result else None
         except Exception as e:
             logger.error(f"Evaluation retrieval failed: {e}")
             raise
@@ -394,25 +544,479 @@ class Evaluation:
         try:
             query = "SELECT * FROM evaluations WHERE submission_id = ? ORDER BY created_at DESC LIMIT 1"
             result = db_manager.execute_query(query, (submission_id,))
-            if result:
-                row = result[0]
-                return cls(
-                    id=row['id'],
-                    submission_id=row['submission_id'],
-                    overall_score=row['overall_score'],
-                    strengths=row['strengths'],
-                    opportunities=row['opportunities'],
-                    rubric_scores=row['rubric_scores'],
-                    segment_feedback=row['segment_feedback'],
-                    llm_provider=row['llm_provider'],
-                    llm_model=row['llm_model'],
-                    raw_prompt=row['raw_prompt'],
-                    raw_response=row['raw_response'],
-                    debug_enabled=bool(row['debug_enabled']),
-                    processing_time=row['processing_time'],
-                    created_at=datetime.fromisoformat(row['created_at'])
-                )
-            return None
+            return cls._from_row(result[0]) if result else None
         except Exception as e:
             logger.error(f"Evaluation retrieval failed: {e}")
             raise
+
+class PromptTemplate:
+    """Static prompt parts of one language, stored once per distinct content hash
+    
+    Evaluations reference a template by hash instead of storing the rendered
+    prompt, which is mostly identical text; `content` holds the JSON-encoded
+    prompt artifact from which the full prompt is rebuilt around the memo.
+    """
+    
+    def __init__(self, template_hash: str = "", language: str = "", template_version: str = "",
+                 content: str = "", created_at: Optional[datetime] = None):
+        self.template_hash = template_hash
+        self.language = language
+        self.template_version = template_version
+        self.content = content
+        self.created_at = created_at or datetime.utcnow()
+    
+    @classmethod
+    def insert_statement(cls, template: Dict[str, Any], created_at: datetime) -> tuple:
+        """Statement storing a template unless a row with its hash already exists"""
+        return ("""
+            INSERT OR IGNORE INTO prompt_templates (template_hash, language, template_version, content, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (template['template_hash'], template['language'], template['template_version'],
+              template['content'], created_at))
+    
+    @classmethod
+    def get_by_hash(cls, template_hash: str) -> Optional['PromptTemplate']:
+        """Get prompt template by content hash"""
+        try:
+            query = "SELECT * FROM prompt_templates WHERE template_hash = ?"
+            result = db_manager.execute_query(query, (template_hash,))
+            if not result:
+                return None
+            row = result[0]
+            return cls(
+                template_hash=row['template_hash'],
+                language=row['language'],
+                template_version=row['template_version'],
+                content=row['content'],
+                created_at=datetime.fromisoformat(row['created_at'])
+            )
+        except Exception as e:
+            logger.error(f"Prompt template retrieval failed: {e}")
+            raise
+
+class UsageRollup:
+    """Token and cost totals for one user (or all users) over one day or month
+    
+    Rows are keyed by (period, period_start, user_id) and incremented in the
+    same transaction that stores each evaluation, so totals never need to be
+    recomputed from `evaluations` and a limit check is a single key lookup.
+    """
+    
+    PERIOD_DAY = "day"
+    PERIOD_MONTH = "month"
+    ALL_USERS = 0
+    
+    def __init__(self, period: str = PERIOD_DAY, period_start: str = "", user_id: int = ALL_USERS,
+                 evaluations: int = 0, input_tokens: int = 0, output_tokens: int = 0,
+                 cache_read_tokens: int = 0, cache_write_tokens: int = 0, cost_usd: float = 0.0,
+                 updated_at: Optional[datetime] = None):
+        self.period = period
+        self.period_start = period_start
+        self.user_id = user_id
+        self.evaluations = evaluations
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.cache_write_tokens = cache_write_tokens
+        self.cost_usd = cost_usd
+        self.updated_at = updated_at
+    
+    UPSERT_QUERY = """
+        INSERT INTO usage_ledger (
+            period, period_start, user_id, evaluations, input_tokens, output_tokens,
+            cache_read_tokens, cache_write_tokens, cost_usd, updated_at
+        ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (period, period_start, user_id) DO UPDATE SET
+            evaluations = evaluations + 1,
+            input_tokens = input_tokens + excluded.input_tokens,
+            output_tokens = output_tokens + excluded.output_tokens,
+            cache_read_tokens = cache_read_tokens + excluded.cache_read_tokens,
+            cache_write_tokens = cache_write_tokens + excluded.cache_write_tokens,
+            cost_usd = cost_usd + excluded.cost_usd,
+            updated_at = excluded.updated_at
+    """
+    
+    @classmethod
+    def period_starts(cls, when: datetime) -> List[tuple]:
+        """Return the (period, period_start) keys that a moment falls in"""
+        return [(cls.PERIOD_DAY, when.strftime('%Y-%m-%d')), (cls.PERIOD_MONTH, when.strftime('%Y-%m'))]
+    
+    @classmethod
+    def record_statements(cls, user_id: Optional[int], tokens: Dict[str, int], cost_usd: float,
+                          when: datetime) -> List[tuple]:
+        """Statements adding one evaluation to the user's and the all-users rollups"""
+        user_ids = [cls.ALL_USERS] + ([user_id] if user_id else [])
+        return [
+            (cls.UPSERT_QUERY, (
+                period, period_start, rollup_user_id, tokens['input_tokens'], tokens['output_tokens'],
+                tokens['cache_read_tokens'], tokens['cache_write_tokens'], cost_usd, when
+            ))
+            for period, period_start in cls.period_starts(when)
+            for rollup_user_id in user_ids
+        ]
+    
+    @classmethod
+    def _from_row(cls, row: sqlite3.Row) -> 'UsageRollup':
+        return cls(
+            period=row['period'],
+            period_start=row['period_start'],
+            user_id=row['user_id'],
+            evaluations=row['evaluations'],
+            input_tokens=row['input_tokens'],
+            output_tokens=row['output_tokens'],
+            cache_read_tokens=row['cache_read_tokens'],
+            cache_write_tokens=row['cache_write_tokens'],
+            cost_usd=row['cost_usd'],
+            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
+        )
+    
+    @classmethod
+    def get(cls, period: str, period_start: str, user_id: int = ALL_USERS) -> Optional['UsageRollup']:
+        """Get one rollup by key"""
+        try:
+            query = "SELECT * FROM usage_ledger WHERE period = ? AND period_start = ? AND user_id = ?"
+            result = db_manager.execute_query(query, (period, period_start, user_id))
+            return cls._from_row(result[0]) if result else None
+        except Exception as e:
+            logger.error(f"Usage rollup retrieval failed: {e}")
+            raise
+    
+    @classmethod
+    def list(cls, period: str, user_id: Optional[int] = None, limit: int = 31) -> List['UsageRollup']:
+        """Get the most recent rollups for a period, for one user or for every user"""
+        try:
+            if user_id is None:
+                query = """
+                    SELECT * FROM usage_ledger WHERE period = ?
+                    ORDER BY period_start DESC, user_id LIMIT ?
+                """
+                result = db_manager.execute_query(query, (period, limit))
+            else:
+                query = """
+                    SELECT * FROM usage_ledger WHERE period = ? AND user_id = ?
+                    ORDER BY period_start DESC LIMIT ?
+                """
+                result = db_manager.execute_query(query, (period, user_id, limit))
+            return [cls._from_row(row) for row in result]
+        except Exception as e:
+            logger.error(f"Usage rollup retrieval failed: {e}")
+            raise
+
+class LoginAttempt:
+    """Failed login attempts shared by every worker for brute force detection
+    
+    Each failure is one row; the lockout check counts a user's rows inside a
+    sliding window. Recording a failure prunes rows older than the window and
+    the oldest rows beyond `max_tracked`, so the table stays bounded.
+    """
+    
+    @classmethod
+    def record_failure(cls, username: str, window: int, max_tracked: int = 10000) -> None:
+        """Record one failed attempt and prune expired and excess rows"""
+        try:
+            now = time.time()
+            db_manager.execute_transaction([
+                ("INSERT INTO login_attempts (username, attempted_at) VALUES (?, ?)", (username, now)),
+                ("DELETE FROM login_attempts WHERE attempted_at <= ?", (now - window,)),
+                ("""
+                    DELETE FROM login_attempts WHERE id <= (
+                        SELECT id FROM login_attempts ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                """, (max_tracked,))
+            ])
+        except Exception as e:
+            logger.error(f"Login attempt recording failed: {e}")
+            raise
+    
+    @classmethod
+    def count_recent(cls, username: str, window: int) -> int:
+        """Count a user's failed attempts within the last `window` seconds"""
+        try:
+            query = "SELECT COUNT(*) AS attempts FROM login_attempts WHERE username = ? AND attempted_at > ?"
+            result = db_manager.execute_query(query, (username, time.time() - window))
+            return result[0]['attempts'] if result else 0
+        except Exception as e:
+            logger.error(f"Login attempt retrieval failed: {e}")
+            raise
+    
+    @classmethod
+    def clear(cls, username: str) -> int:
+        """Forget a user's failed attempts (after a successful login)"""
+        try:
+            return db_manager.execute_update("DELETE FROM login_attempts WHERE username = ?", (username,))
+        except Exception as e:
+            logger.error(f"Login attempt cleanup failed: {e}")
+            raise
+
+class RevokedToken:
+    """Revocations of signed session tokens
+    
+    A row either names one token (`token_id`, on logout) or a user whose tokens
+    issued up to `revoked_at` are all revoked (on deletion). Rows are only
+    needed until `expires_at`, after which the tokens they cover have expired
+    anyway; each new revocation prunes the expired ones.
+    """
+    
+    INSERT_QUERY = "INSERT INTO revoked_tokens (token_id, user_id, revoked_at, expires_at) VALUES (?, ?, ?, ?)"
+    
+    @classmethod
+    def _revoke(cls, token_id: Optional[str], user_id: Optional[int], expires_at: float) -> Dict[str, Any]:
+        revoked_at = time.time()
+        revocation_id = db_manager.execute_transaction([
+            (cls.INSERT_QUERY, (token_id, user_id, revoked_at, expires_at)),
+            ("DELETE FROM revoked_tokens WHERE expires_at <= ?", (revoked_at,))
+        ])[0]
+        return {"id": revocation_id, "token_id": token_id, "user_id": user_id,
+                "revoked_at": revoked_at, "expires_at": expires_at}
+    
+    @classmethod
+    def revoke_token(cls, token_id: str, expires_at: float) -> Dict[str, Any]:
+        """Revoke one token until it expires"""
+        try:
+            return cls._revoke(token_id, None, expires_at)
+        except Exception as e:
+            logger.error(f"Token revocation failed: {e}")
+            raise
+    
+    @classmethod
+    def revoke_user(cls, user_id: int, expires_at: float) -> Dict[str, Any]:
+        """Revoke every token issued to a user so far"""
+        try:
+            return cls._revoke(None, user_id, expires_at)
+        except Exception as e:
+            logger.error(f"User token revocation failed: {e}")
+            raise
+    
+    @classmethod
+    def get_since(cls, last_id: int) -> List[Dict[str, Any]]:
+        """Get unexpired revocations recorded after `last_id`"""
+        try:
+            query = "SELECT * FROM revoked_tokens WHERE id > ? AND expires_at > ? ORDER BY id"
+            return [dict(row) for row in db_manager.execute_query(query, (last_id, time.time()))]
+        except Exception as e:
+            logger.error(f"Token revocation retrieval failed: {e}")
+            raise
+
+class EvaluationJob:
+    """Asynchronous evaluation job entity model"""
+    
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    
+    def __init__(self, id: str = "", submission_id: int = 0, user_id: Optional[int] = None,
+                 status: str = "queued", priority: int = 2, callback_url: Optional[str] = None,
+                 evaluation_id: Optional[int] = None, error: Optional[str] = None,
+                 created_at: Optional[datetime] = None, started_at: Optional[datetime] = None,
+                 completed_at: Optional[datetime] = None, batch_id: Optional[str] = None):
+        self.id = id
+        self.submission_id = submission_id
+        self.user_id = user_id
+        self.status = status
+        self.priority = priority
+        self.callback_url = callback_url
+        self.evaluation_id = evaluation_id
+        self.error = error
+        self.created_at = created_at or datetime.utcnow()
+        self.started_at = started_at
+        self.completed_at = completed_at
+        self.batch_id = batch_id
+    
+    @classmethod
+    def _from_row(cls, row) -> 'EvaluationJob':
+        return cls(
+            id=row['id'],
+            submission_id=row['submission_id'],
+            user_id=row['user_id'],
+            status=row['status'],
+            priority=row['priority'],
+            callback_url=row['callback_url'],
+            evaluation_id=row['evaluation_id'],
+            error=row['error'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            started_at=datetime.fromisoformat(row['started_at']) if row['started_at'] else None,
+            completed_at=datetime.fromisoformat(row['completed_at']) if row['completed_at'] else None,
+            batch_id=row['batch_id']
+        )
+    
+    @classmethod
+    def create(cls, submission_id: int, user_id: Optional[int] = None, priority: int = 2,
+               callback_url: Optional[str] = None) -> 'EvaluationJob':
+        """Create a new queued job"""
+        try:
+            job_id = uuid.uuid4().hex
+            query = """
+                INSERT INTO evaluation_jobs (id, submission_id, user_id, status, priority, callback_url, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            db_manager.execute_insert(query, (
+                job_id, submission_id, user_id, cls.STATUS_QUEUED, priority, callback_url, datetime.utcnow()
+            ))
+            return cls.get_by_id(job_id)
+        except Exception as e:
+            logger.error(f"Evaluation job creation failed: {e}")
+            raise
+    
+    @classmethod
+    def create_many(cls, submission_ids: List[int], batch_id: str, user_id: Optional[int] = None,
+                    priority: int = 2) -> List['EvaluationJob']:
+        """Create queued jobs for a batch in one transaction"""
+        try:
+            created_at = datetime.utcnow()
+            jobs = [
+                cls(id=uuid.uuid4().hex, submission_id=submission_id, user_id=user_id, priority=priority,
+                    created_at=created_at, batch_id=batch_id)
+                for submission_id in submission_ids
+            ]
+            query = """
+                INSERT INTO evaluation_jobs (id, submission_id, user_id, status, priority, created_at, batch_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            db_manager.execute_insert_many(query, [
+                (job.id, job.submission_id, user_id, cls.STATUS_QUEUED, priority, created_at, batch_id)
+                for job in jobs
+            ])
+            return jobs
+        except Exception as e:
+            logger.error(f"Evaluation job batch creation failed: {e}")
+            raise
+    
+    @classmethod
+    def get_by_batch(cls, batch_id: str) -> List['EvaluationJob']:
+        """Get all jobs of a batch in submission order"""
+        try:
+            query = "SELECT * FROM evaluation_jobs WHERE batch_id = ? ORDER BY submission_id"
+            return [cls._from_row(row) for row in db_manager.execute_query(query, (batch_id,))]
+        except Exception as e:
+            logger.error(f"Evaluation job retrieval failed: {e}")
+            raise
+    
+    @classmethod
+    def claim_batch(cls, batch_id: str) -> int:
+        """Move the queued jobs of a batch to running, returning how many were claimed"""
+        try:
+            query = "UPDATE evaluation_jobs SET status = ?, started_at = ? WHERE batch_id = ? AND status = ?"
+            return db_manager.execute_update(query, (cls.STATUS_RUNNING, datetime.utcnow(), batch_id, cls.STATUS_QUEUED))
+        except Exception as e:
+            logger.error(f"Evaluation job batch claim failed: {e}")
+            raise
+    
+    @classmethod
+    def heartbeat_batch(cls, batch_id: str) -> int:
+        """Refresh started_at of a batch's running jobs so they are not recovered as stale"""
+        try:
+            query = "UPDATE evaluation_jobs SET started_at = ? WHERE batch_id = ? AND status = ?"
+            return db_manager.execute_update(query, (datetime.utcnow(), batch_id, cls.STATUS_RUNNING))
+        except Exception as e:
+            logger.error(f"Evaluation job heartbeat failed: {e}")
+            raise
+    
+    @classmethod
+    def fail_batch(cls, batch_id: str, error: str) -> int:
+        """Mark a batch's running jobs failed (error is a JSON-encoded error object), returning how many"""
+        try:
+            query = """
+                UPDATE evaluation_jobs SET status = ?, error = ?, completed_at = ?
+                WHERE batch_id = ? AND status = ?
+            """
+            return db_manager.execute_update(query, (cls.STATUS_FAILED, error, datetime.utcnow(), batch_id, cls.STATUS_RUNNING))
+        except Exception as e:
+            logger.error(f"Evaluation job batch failure update failed: {e}")
+            raise
+    
+    @classmethod
+    def mark_many_completed(cls, completions: List[tuple]) -> int:
+        """Record several successful evaluations given (job_id, evaluation_id) pairs"""
+        try:
+            completed_at = datetime.utcnow()
+            query = """
+                UPDATE evaluation_jobs SET status = ?, evaluation_id = ?, error = NULL, completed_at = ?
+                WHERE id = ?
+            """
+            return db_manager.execute_update_many(query, [
+                (cls.STATUS_COMPLETED, evaluation_id, completed_at, job_id) for job_id, evaluation_id in completions
+            ])
+        except Exception as e:
+            logger.error(f"Evaluation job batch update failed: {e}")
+            raise
+    
+    @classmethod
+    def get_by_id(cls, job_id: str) -> Optional['EvaluationJob']:
+        """Get job by ID"""
+        try:
+            result = db_manager.execute_query("SELECT * FROM evaluation_jobs WHERE id = ?", (job_id,))
+            return cls._from_row(result[0]) if result else None
+        except Exception as e:
+            logger.error(f"Evaluation job retrieval failed: {e}")
+            raise
+    
+    @classmethod
+    def get_recoverable(cls, stale_before: datetime) -> List['EvaluationJob']:
+        """Get queued jobs and running jobs whose worker has not reported since `stale_before`"""
+        try:
+            query = """
+                SELECT * FROM evaluation_jobs
+                WHERE status = ? OR (status = ? AND started_at < ?)
+                ORDER BY created_at
+            """
+            result = db_manager.execute_query(query, (cls.STATUS_QUEUED, cls.STATUS_RUNNING, stale_before))
+            return [cls._from_row(row) for row in result]
+        except Exception as e:
+            logger.error(f"Evaluation job retrieval failed: {e}")
+            raise
+    
+    def claim(self) -> bool:
+        """Atomically move the job to running; returns False if another worker owns it"""
+        try:
+            started_at = datetime.utcnow()
+            query = """
+                UPDATE evaluation_jobs SET status = ?, started_at = ?
+                WHERE id = ? AND status = ? AND started_at IS ?
+            """
+            affected = db_manager.execute_update(query, (
+                self.STATUS_RUNNING, started_at, self.id, self.status, self.started_at
+            ))
+            if affected > 0:
+                self.status = self.STATUS_RUNNING
+                self.started_at = started_at
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Evaluation job claim failed: {e}")
+            raise
+    
+    def requeue(self) -> None:
+        """Return an interrupted running job to the queue"""
+        try:
+            query = "UPDATE evaluation_jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?"
+            db_manager.execute_update(query, (self.STATUS_QUEUED, self.id, self.STATUS_RUNNING))
+            self.status = self.STATUS_QUEUED
+            self.started_at = None
+        except Exception as e:
+            logger.error(f"Evaluation job requeue failed: {e}")
+            raise
+    
+    def mark_completed(self, evaluation_id: int) -> None:
+        """Record a successful evaluation"""
+        self._finish(self.STATUS_COMPLETED, evaluation_id, None)
+    
+    def mark_failed(self, error: str) -> None:
+        """Record a failed evaluation (error is a JSON-encoded error object)"""
+        self._finish(self.STATUS_FAILED, None, error)
+    
+    def _finish(self, status: str, evaluation_id: Optional[int], error: Optional[str]) -> None:
+        try:
+            completed_at = datetime.utcnow()
+            query = """
+                UPDATE evaluation_jobs SET status = ?, evaluation_id = ?, error = ?, completed_at = ?
+                WHERE id = ?
+            """
+            db_manager.execute_update(query, (status, evaluation_id, error, completed_at, self.id))
+            self.status = status
+            self.evaluation_id = evaluation_id
+            self.error = error
+            self.completed_at = completed_at
+        except Exception as e:
+            logger.error(f"Evaluation job update failed: {e}")
+            raise
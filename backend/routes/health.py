@@ -10,15 +10,15 @@ import logging
 try:
     # When imported from main application
     from services.config_service import ConfigService
-    from services.auth_service import AuthService
-    from services.llm_service import EnhancedLLMService
+    from services.auth_service import get_auth_service
+    from services.llm_service import EnhancedLLMService, get_llm_service as get_shared_llm_service
     from utils.responses import create_standardized_response, create_error_response
     from decorators import require_auth
 except ImportError:
     # When imported from tests or other contexts
     from ..services.config_service import ConfigService
-    from ..services.auth_service import AuthService
-    from ..services.llm_service import EnhancedLLMService
+    from ..services.auth_service import get_auth_service
+    from ..services.llm_service import EnhancedLLMService, get_llm_service as get_shared_llm_service
     from ..utils.responses import create_standardized_response, create_error_response
     from ..decorators import require_auth
 
@@ -30,14 +30,14 @@ router = APIRouter(prefix="/health", tags=["health"])
 
 # Shared service instances (instantiated once)
 config_service = ConfigService()
-auth_service = AuthService(config_service=config_service)
+auth_service = get_auth_service(config_service=config_service)
 
 
 
 def get_llm_service() -> EnhancedLLMService:
-    """Get LLM service instance with error handling"""
+    """Get shared LLM service instance with error handling"""
     try:
-        return EnhancedLLMService()
+        return get_shared_llm_service()
     except Exception as e:
         logger.error(f"Failed to instantiate LLM service: {e}")
         raise HTTPException(
@@ -3,8 +3,8 @@ Services for Memo AI Coach
 """
 
 from .config_service import ConfigService, config_service
-from .llm_service import EnhancedLLMService
+from .llm_service import EnhancedLLMService, get_llm_service
 from .auth_service import AuthService, get_auth_service
 from .config_manager import ConfigManager, get_config_manager, read_config_file, write_config_file
 
-__all__ = ['ConfigService', 'config_service', 'EnhancedLLMService', 'AuthService', 'get_auth_service', 'ConfigManager', 'get_config_manager', 'read_config_file', 'write_config_file']
+__all__ = ['ConfigService', 'config_service', 'EnhancedLLMService', 'get_llm_service', 'AuthService', 'get_auth_service', 'ConfigManager', 'get_config_manager', 'read_config_file', 'write_config_file']
@@ -4,18 +4,36 @@ Handles admin authentication and session management
 """
 
 import os
-import bcrypt
+import time
 import secrets
 import logging
+import threading
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime, timedelta
 import yaml
 import hashlib
 from .path_utils import resolve_config_dir_with_fallback
+from .session_cache import get_session_cache
+from .password_hasher import get_password_hasher, PasswordHasherBusyError
+from .session_tokens import TokenSigner, get_revocation_list
+
+try:
+    from models.database import async_db_manager
+except ImportError:
+    from backend.models.database import async_db_manager
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+# Permissions granted to admin sessions
+ADMIN_PERMISSIONS = [
+    'system_configuration',
+    'user_management',
+    'debug_access',
+    'backup_management',
+    'log_access'
+]
+
 class AuthService:
     """Service for unified user and admin authentication"""
     
@@ -27,7 +45,8 @@ class AuthService:
         self.config_path = config_path
         self.config_service = config_service
         self.auth_config = None
-        self.login_attempts = {}  # Track login attempts for brute force protection
+        self._config_mtime = None
+        self.token_signer = None
         
         # Load authentication configuration
         self._load_auth_config()
@@ -35,27 +54,64 @@ class AuthService:
     def _load_auth_config(self):
         """Load authentication configuration from YAML"""
         try:
-            with open(f"{self.config_path}/auth.yaml", 'r') as f:
+            config_file = f"{self.config_path}/auth.yaml"
+            self._config_mtime = os.path.getmtime(config_file)
+            with open(config_file, 'r') as f:
                 self.auth_config = yaml.safe_load(f)
+            session_config = self.auth_config.get('session_management', {})
+            get_session_cache().configure(
+                max_size=session_config.get('session_cache_max_size', 10000),
+                ttl=session_config.get('session_cache_ttl', 30)
+            )
+            signed_config = session_config.get('signed_tokens', {})
+            self.token_signer = TokenSigner.from_config(signed_config)
+            get_revocation_list().configure(signed_config.get('revocation_sync_interval', 5))
+            # Import the reaper here to avoid circular imports (it uses the entity models)
+            from .session_reaper import get_session_reaper
+            storage_config = self.auth_config.get('session_storage', {}).get('database_storage', {})
+            get_session_reaper().configure(
+                enabled=storage_config.get('cleanup_enabled', True),
+                interval=storage_config.get('cleanup_interval', 300),
+                batch_size=storage_config.get('cleanup_batch_size', 500),
+                batch_pause=storage_config.get('cleanup_batch_pause', 0.1),
+                max_batches=storage_config.get('cleanup_max_batches', 100),
+                vacuum_pages=storage_config.get('cleanup_vacuum_pages', 1000)
+            )
+            admin_config = self.auth_config.get('authentication_methods', {}).get('admin_authentication', {})
+            get_password_hasher().configure(
+                workers=admin_config.get('password_hash_workers', 0),
+                queue_size=admin_config.get('password_hash_queue_size', 32),
+                rounds=admin_config.get('bcrypt_rounds', 12)
+            )
             logger.info("Authentication configuration loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load authentication configuration: {e}")
             raise
     
+    def reload_if_changed(self):
+        """Reload auth.yaml if it was modified since it was last loaded"""
+        try:
+            if os.path.getmtime(f"{self.config_path}/auth.yaml") != self._config_mtime:
+                self._load_auth_config()
+        except Exception as e:
+            logger.error(f"Failed to reload authentication configuration: {e}")
+    
     def _hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
+        """Hash password using bcrypt on the shared password hashing pool"""
         try:
-            salt = bcrypt.gensalt()
-            hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-            return hashed.decode('utf-8')
+            return get_password_hasher().hash(password)
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
             logger.error(f"Password hashing failed: {e}")
             raise
     
     def _verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
+        """Verify password against hash on the shared password hashing pool"""
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+            return get_password_hasher().verify(password, hashed_password)
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
             logger.error(f"Password verification failed: {e}")
             return False
@@ -71,24 +127,21 @@ class AuthService:
             logger.error(f"Session token generation failed: {e}")
             return secrets.token_urlsafe(32)
     
+    def _brute_force_settings(self) -> Tuple[int, int, int]:
+        """Return (threshold, window seconds, max tracked attempts) from auth.yaml"""
+        brute_force_config = self.auth_config.get('authentication_methods', {}).get('admin_authentication', {})
+        return (
+            brute_force_config.get('brute_force_threshold', 3),
+            brute_force_config.get('brute_force_window', 300),
+            brute_force_config.get('brute_force_max_tracked', 10000)
+        )
+    
     def _is_brute_force_attempt(self, username: str) -> bool:
         """Check if login attempt is part of brute force attack"""
         try:
-            brute_force_config = self.auth_config.get('authentication_methods', {}).get('admin_authentication', {})
-            threshold = brute_force_config.get('brute_force_threshold', 3)
-            window = brute_force_config.get('brute_force_window', 300)
-            
-            if username not in self.login_attempts:
-                return False
-            
-            attempts = self.login_attempts[username]
-            now = datetime.utcnow()
-            
-            # Remove old attempts outside the window
-            attempts = [attempt for attempt in attempts if (now - attempt).total_seconds() < window]
-            self.login_attempts[username] = attempts
-            
-            return len(attempts) >= threshold
+            from models.entities import LoginAttempt
+            threshold, window, _ = self._brute_force_settings()
+            return LoginAttempt.count_recent(username, window) >= threshold
             
         except Exception as e:
             logger.error(f"Brute force check failed: {e}")
@@ -97,18 +150,65 @@ class AuthService:
     def _record_login_attempt(self, username: str, success: bool):
         """Record login attempt for brute force detection"""
         try:
-            if username not in self.login_attempts:
-                self.login_attempts[username] = []
-            
+            from models.entities import LoginAttempt
             if not success:
-                self.login_attempts[username].append(datetime.utcnow())
+                _, window, max_tracked = self._brute_force_settings()
+                LoginAttempt.record_failure(username, window, max_tracked)
             else:
                 # Clear attempts on successful login
-                self.login_attempts[username] = []
+                LoginAttempt.clear(username)
                 
         except Exception as e:
             logger.error(f"Failed to record login attempt: {e}")
     
+    def _check_login(self, username: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Look up the user for a login attempt, returning (user, None) or (None, error_message)"""
+        # Check brute force protection
+        if self._is_brute_force_attempt(username):
+            logger.warning(f"Brute force attempt detected for user: {username}")
+            return None, "Account temporarily locked due to too many failed attempts"
+        
+        # Import User model here to avoid circular imports
+        from models.entities import User
+        
+        # Get user from database
+        user = User.get_by_username(username)
+        if not user:
+            self._record_login_attempt(username, False)
+            return None, "Invalid credentials"
+        
+        if not user.is_active:
+            return None, "Account is deactivated"
+        return user, None
+    
+    def _finish_login(self, username: str, user, password_valid: bool) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Record the outcome of a password check and create the session on success"""
+        if not password_valid:
+            self._record_login_attempt(username, False)
+            return False, None, "Invalid credentials"
+        
+        # Create session in database (signed tokens are also recorded, for session listings)
+        from models.entities import Session
+        if self.token_signer is not None:
+            expires_at = datetime.utcnow() + timedelta(seconds=Session.timeout_seconds(self.config_service))
+            session_token = self.token_signer.issue(user.id, user.username, user.is_admin, expires_at)
+        else:
+            session_token = self._generate_session_token()
+            expires_at = None
+        session = Session.create(
+            session_id=session_token,
+            user_id=user.id,
+            is_admin=user.is_admin,
+            config_service=self.config_service,
+            expires_at=expires_at
+        )
+        
+        # Record successful login
+        self._record_login_attempt(username, True)
+        
+        logger.info(f"Authentication successful for user: {username} (admin: {user.is_admin})")
+        return True, session_token, None
+    
     def authenticate(self, username: str, password: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Unified authentication for both users and admins
@@ -119,48 +219,51 @@ class AuthService:
             
         Returns:
             Tuple of (success, session_token, error_message)
+            
+        Raises:
+            PasswordHasherBusyError: If the password hashing pool is saturated
         """
         try:
-            # Check brute force protection
-            if self._is_brute_force_attempt(username):
-                logger.warning(f"Brute force attempt detected for user: {username}")
-                return False, None, "Account temporarily locked due to too many failed attempts"
-            
-            # Import User model here to avoid circular imports
-            from models.entities import User
-            
-            # Get user from database
-            user = User.get_by_username(username)
-            if not user:
-                self._record_login_attempt(username, False)
-                return False, None, "Invalid credentials"
-            
-            if not user.is_active:
-                return False, None, "Account is deactivated"
+            user, error = self._check_login(username)
+            if error:
+                return False, None, error
             
             # Verify password
-            if not self._verify_password(password, user.password_hash):
-                self._record_login_attempt(username, False)
-                return False, None, "Invalid credentials"
-            
-            # Generate session token
-            session_token = self._generate_session_token()
-            
-            # Create session in database
-            from models.entities import Session
-            session = Session.create(
-                session_id=session_token,
-                user_id=user.id,
-                is_admin=user.is_admin,
-                config_service=self.config_service
-            )
-            
-            # Record successful login
-            self._record_login_attempt(username, True)
-            
-            logger.info(f"Authentication successful for user: {username} (admin: {user.is_admin})")
-            return True, session_token, None
+            return self._finish_login(username, user, self._verify_password(password, user.password_hash))
             
+        except PasswordHasherBusyError:
+            raise
+        except Exception as e:
+            logger.error(f"Authentication failed: {e}")
+            return False, None, f"Authentication error: {str(e)}"
+    
+    async def authenticate_async(self, username: str, password: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Same as authenticate, for the event loop
+        
+        Database steps run on the database threads and bcrypt is awaited on the
+        hashing pool, so no thread waits on the hash and a saturated pool is
+        rejected on the loop.
+        
+        Raises:
+            PasswordHasherBusyError: If the password hashing pool is saturated
+        """
+        try:
+            user, error = await async_db_manager.run(self._check_login, username)
+            if error:
+                return False, None, error
+            
+            try:
+                password_valid = await get_password_hasher().verify_async(password, user.password_hash)
+            except PasswordHasherBusyError:
+                raise
+            except Exception as e:
+                logger.error(f"Password verification failed: {e}")
+                password_valid = False
+            return await async_db_manager.run(self._finish_login, username, user, password_valid)
+            
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             return False, None, f"Authentication error: {str(e)}"
@@ -176,6 +279,16 @@ class AuthService:
             Tuple of (valid, session_data, error_message)
         """
         try:
+            # Signed tokens are checked locally, without a database read
+            if self.token_signer is not None and TokenSigner.is_signed(session_token):
+                return self._validate_signed_token(session_token)
+            
+            # Recently validated sessions are served from memory
+            cache = get_session_cache()
+            session_data = cache.get(session_token)
+            if session_data is not None:
+                return True, session_data, None
+            
             # Import Session model here to avoid circular imports
             from models.entities import Session
             
@@ -208,21 +321,41 @@ class AuthService:
                 'created_at': session.created_at,
                 'expires_at': session.expires_at,
                 'is_active': session.is_active,
-                'permissions': [
-                    'system_configuration',
-                    'user_management',
-                    'debug_access',
-                    'backup_management',
-                    'log_access'
-                ] if session.is_admin else []
+                'permissions': list(ADMIN_PERMISSIONS) if session.is_admin else []
             }
             
+            cache.set(session_token, session_data)
             return True, session_data, None
             
         except Exception as e:
             logger.error(f"Session validation failed: {e}")
             return False, None, f"Session validation error: {str(e)}"
     
+    def _validate_signed_token(self, session_token: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Validate a signed token against its signature, expiry and the revocation list"""
+        claims = self.token_signer.verify(session_token)
+        if claims is None:
+            return False, None, "Invalid session token"
+        if time.time() >= claims['exp']:
+            return False, None, "Session expired"
+        
+        revocations = get_revocation_list()
+        revocations.sync()
+        if revocations.is_revoked(claims):
+            return False, None, "Session is inactive"
+        
+        session_data = {
+            'session_id': session_token,
+            'user_id': claims['sub'],
+            'username': claims['usr'],
+            'is_admin': claims['adm'],
+            'created_at': datetime.utcfromtimestamp(claims['iat']),
+            'expires_at': datetime.utcfromtimestamp(claims['exp']),
+            'is_active': True,
+            'permissions': list(ADMIN_PERMISSIONS) if claims['adm'] else []
+        }
+        return True, session_data, None
+    
     def logout(self, session_token: str) -> bool:
         """
         Logout any user type
@@ -237,13 +370,22 @@ class AuthService:
             # Import Session model here to avoid circular imports
             from models.entities import Session
             
+            get_session_cache().invalidate(session_token)
+            
+            # Signed tokens stay valid until revoked, wherever they are checked
+            revoked = False
+            claims = self.token_signer.verify(session_token) if self.token_signer is not None else None
+            if claims is not None and time.time() < claims['exp']:
+                get_revocation_list().revoke_token(claims)
+                revoked = True
+            
             # Get session from database
             session = Session.get_by_session_id(session_token)
             if session and session.is_active:
                 session.deactivate()
-                logger.info(f"Session terminated: {session_token[:8]}...")
+                logger.info(f"Session terminated: {TokenSigner.label(session_token)}...")
                 return True
-            return False
+            return revoked
             
         except Exception as e:
             logger.error(f"Logout failed: {e}")
@@ -269,18 +411,12 @@ class AuthService:
                 if session.expires_at > now:
                     user = User.get_by_id(session.user_id) if session.user_id else None
                     if user and user.is_active:
-                        active_sessions[session.session_id[:8] + "..."] = {
+                        active_sessions[TokenSigner.label(session.session_id) + "..."] = {
                             'username': user.username,
                             'is_admin': session.is_admin,
                             'created_at': session.created_at.isoformat(),
                             'expires_at': session.expires_at.isoformat(),
-                            'permissions': [
-                                'system_configuration',
-                                'user_management',
-                                'debug_access',
-                                'backup_management',
-                                'log_access'
-                            ] if session.is_admin else []
+                            'permissions': list(ADMIN_PERMISSIONS) if session.is_admin else []
                         }
             
             return {
@@ -318,6 +454,7 @@ class AuthService:
             
             # Get active sessions count
             from models.entities import Session
+            from .session_reaper import get_session_reaper
             active_sessions = len(Session.get_active_sessions())
             
             return {
@@ -328,6 +465,11 @@ class AuthService:
                 "brute_force_protection": True,
                 "session_expiry_hours": self.auth_config["session_management"].get("session_expiry_hours", 24),
                 "session_token_length": self.auth_config["session_management"].get("session_token_length", 32),
+                "session_cache": get_session_cache().get_stats(),
+                "password_hasher": get_password_hasher().get_stats(),
+                "signed_tokens": self.token_signer is not None,
+                "revocation_list": get_revocation_list().get_stats(),
+                "session_reaper": get_session_reaper().get_stats(),
                 "last_check": datetime.utcnow().isoformat()
             }
             
@@ -340,6 +482,32 @@ class AuthService:
                 "last_check": datetime.utcnow().isoformat()
             }
 
+    def _check_new_user(self, username: str) -> Optional[str]:
+        """Return an error message if the username cannot be registered"""
+        # Import User model here to avoid circular imports
+        from models.entities import User
+        
+        # Validate input
+        if not username or len(username.strip()) < 3:
+            return "Username must be at least 3 characters long"
+        
+        # Password length validation temporarily disabled
+        # if not password or len(password) < 8:
+        #     return "Password must be at least 8 characters long"
+        
+        # Check if user already exists
+        if User.get_by_username(username):
+            return f"Username '{username}' already exists"
+        return None
+    
+    def _store_user(self, username: str, password_hash: str, is_admin: bool) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Create the user row once the password is hashed"""
+        from models.entities import User
+        user = User.create(username=username, password_hash=password_hash, is_admin=is_admin)
+        
+        logger.info(f"User created successfully: {username} (admin: {is_admin})")
+        return True, str(user.id), None
+    
     def create_user(self, username: str, password: str, is_admin: bool = False) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Create new user account (admin-only function)
@@ -350,33 +518,41 @@ class AuthService:
             
         Returns:
             Tuple of (success, user_id, error_message)
+            
+        Raises:
+            PasswordHasherBusyError: If the password hashing pool is saturated
         """
         try:
-            # Import User model here to avoid circular imports
-            from models.entities import User
-            
-            # Validate input
-            if not username or len(username.strip()) < 3:
-                return False, None, "Username must be at least 3 characters long"
-            
-            # Password length validation temporarily disabled
-            # if not password or len(password) < 8:
-            #     return False, None, "Password must be at least 8 characters long"
-            
-            # Check if user already exists
-            existing_user = User.get_by_username(username)
-            if existing_user:
-                return False, None, f"Username '{username}' already exists"
+            error = self._check_new_user(username)
+            if error:
+                return False, None, error
             
             # Hash password
-            password_hash = self._hash_password(password)
+            return self._store_user(username, self._hash_password(password), is_admin)
             
-            # Create user
-            user = User.create(username=username, password_hash=password_hash, is_admin=is_admin)
+        except PasswordHasherBusyError:
+            raise
+        except Exception as e:
+            logger.error(f"User creation failed: {e}")
+            return False, None, f"User creation error: {str(e)}"
+    
+    async def create_user_async(self, username: str, password: str, is_admin: bool = False) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Same as create_user, for the event loop (see authenticate_async)
+        
+        Raises:
+            PasswordHasherBusyError: If the password hashing pool is saturated
+        """
+        try:
+            error = await async_db_manager.run(self._check_new_user, username)
+            if error:
+                return False, None, error
             
-            logger.info(f"User created successfully: {username} (admin: {is_admin})")
-            return True, str(user.id), None
+            password_hash = await get_password_hasher().hash_async(password)
+            return await async_db_manager.run(self._store_user, username, password_hash, is_admin)
             
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
             logger.error(f"User creation failed: {e}")
             return False, None, f"User creation error: {str(e)}"
@@ -432,6 +608,8 @@ class AuthService:
                 return False
             
             # Deactivate all user sessions
+            get_session_cache().invalidate_user(user.id)
+            get_revocation_list().revoke_user(user.id, time.time() + Session.timeout_seconds(self.config_service))
             sessions = Session.get_by_user_id(user.id)
             for session in sessions:
                 session.deactivate()
@@ -448,21 +626,27 @@ class AuthService:
 
 # Global auth service instance
 auth_service = None
+_auth_service_lock = threading.Lock()
 
 def get_auth_service(config_path: str = None, config_service=None) -> AuthService:
     """
     Get the global authentication service instance
     
+    The instance is created once and reloads auth.yaml when the file changes.
+    
     Args:
-        config_path: Optional path to config directory
+        config_path: Optional path to config directory (a different path gets its own instance)
         config_service: Optional ConfigService instance to inject
     """
     global auth_service
-    if auth_service is None:
-        auth_service = AuthService(config_path, config_service)
-    elif config_path is not None or config_service is not None:
-        # Create new instance with custom config or service
+    with _auth_service_lock:
+        if auth_service is None:
+            auth_service = AuthService(config_path, config_service)
+            return auth_service
+    if config_path is not None and config_path != auth_service.config_path:
+        # Create new instance with custom config
         return AuthService(config_path, config_service)
+    if config_service is not None:
+        auth_service.config_service = config_service
+    auth_service.reload_if_changed()
     return auth_service
-
-
@@ -0,0 +1,187 @@
+"""
+Circuit Breaker for Memo AI Coach
+Per-provider closed/open/half-open breaker tracking error rate and latency
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the provider's circuit is open"""
+
+    def __init__(self, name: str, retry_after: int = 1):
+        super().__init__(f"Circuit for provider '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker
+
+    The breaker opens when, over the last `window_size` calls (and at least
+    `minimum_calls`), the failure rate or the slow-call rate reaches its
+    threshold. While open, calls are refused without touching the provider.
+    After `open_duration` seconds a limited number of trial calls are let
+    through (half-open); a good trial closes the circuit, a bad one reopens it.
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, slow_call_threshold: float = 14.0,
+                 slow_call_rate_threshold: float = 0.8, window_size: int = 20, minimum_calls: int = 5,
+                 open_duration: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._outcomes = deque()
+        self._rejected = 0
+        self._times_opened = 0
+        self.configure(failure_rate_threshold, slow_call_threshold, slow_call_rate_threshold,
+                       window_size, minimum_calls, open_duration, half_open_max_calls)
+
+    def configure(self, failure_rate_threshold: float = 0.5, slow_call_threshold: float = 14.0,
+                  slow_call_rate_threshold: float = 0.8, window_size: int = 20, minimum_calls: int = 5,
+                  open_duration: float = 30.0, half_open_max_calls: int = 1) -> None:
+        """Apply new thresholds (the current state is kept)"""
+        with self._lock:
+            self.failure_rate_threshold = failure_rate_threshold
+            self.slow_call_threshold = slow_call_threshold
+            self.slow_call_rate_threshold = slow_call_rate_threshold
+            self.window_size = max(1, int(window_size))
+            self.minimum_calls = max(1, int(minimum_calls))
+            self.open_duration = open_duration
+            self.half_open_max_calls = max(1, int(half_open_max_calls))
+            self._outcomes = deque(self._outcomes, maxlen=self.window_size)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = STATE_HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def retry_after(self) -> int:
+        """Seconds until the circuit lets a trial call through (at least 1)"""
+        with self._lock:
+            if self._current_state() != STATE_OPEN:
+                return 1
+            return max(1, math.ceil(self.open_duration - (time.monotonic() - self._opened_at)))
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed (reserving a trial slot when half-open)"""
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_OPEN:
+                self._rejected += 1
+                return False
+            if state == STATE_HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self._rejected += 1
+                    return False
+                self._half_open_in_flight += 1
+            return True
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds"""
+        slow = latency >= self.slow_call_threshold
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if slow:
+                    self._open("slow trial call")
+                else:
+                    self._close()
+                return
+            self._outcomes.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, latency: float) -> None:
+        """Record a failed call"""
+        slow = latency >= self.slow_call_threshold
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._open("failed trial call")
+                return
+            self._outcomes.append((True, slow))
+            self._evaluate()
+
+    def record_cancelled(self) -> None:
+        """Release a call abandoned by its caller without recording an outcome"""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _evaluate(self) -> None:
+        if self._state != STATE_CLOSED or len(self._outcomes) < self.minimum_calls:
+            return
+        total = len(self._outcomes)
+        failure_rate = sum(1 for failed, _ in self._outcomes if failed) / total
+        slow_rate = sum(1 for _, slow in self._outcomes if slow) / total
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f"failure rate {failure_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._open(f"slow call rate {slow_rate:.0%}")
+
+    def _open(self, reason: str) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._times_opened += 1
+        logger.warning(f"Circuit for provider '{self.name}' opened: {reason}")
+
+    def _close(self) -> None:
+        self._state = STATE_CLOSED
+        self._outcomes.clear()
+        logger.info(f"Circuit for provider '{self.name}' closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return breaker statistics"""
+        with self._lock:
+            total = len(self._outcomes)
+            return {
+                "state": self._current_state(),
+                "window_calls": total,
+                "failure_rate": round(sum(1 for failed, _ in self._outcomes if failed) / total, 3) if total else 0.0,
+                "slow_call_rate": round(sum(1 for _, slow in self._outcomes if slow) / total, 3) if total else 0.0,
+                "rejected": self._rejected,
+                "times_opened": self._times_opened
+            }
+
+# Global circuit breakers keyed by provider name (shared across LLM service reloads)
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get (creating if needed) the global circuit breaker for a provider"""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _circuit_breakers[name] = breaker
+        return breaker
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics for all known circuit breakers"""
+    with _circuit_breakers_lock:
+        breakers = list(_circuit_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
+
+def reset_circuit_breakers() -> None:
+    """Forget all circuit breakers (mainly for tests)"""
+    with _circuit_breakers_lock:
+        _circuit_breakers.clear()
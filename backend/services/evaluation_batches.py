@@ -0,0 +1,228 @@
+"""
+Evaluation Batches for Memo AI Coach
+Runs batch submissions through the provider's Message Batches API or a bounded local stand-in
+"""
+
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+try:
+    from models.entities import Submission, Evaluation, EvaluationJob
+    from models.database import async_db_manager
+except ImportError:
+    from backend.models.entities import Submission, Evaluation, EvaluationJob
+    from backend.models.database import async_db_manager
+from .llm_service import get_llm_service, EnhancedLLMService, PreparedEvaluation
+from .llm_admission import LLMQueueFullError
+from .llm_providers import ClaudeProvider
+from .usage_ledger import get_usage_ledger
+from .evaluation_jobs import evaluation_record, describe_llm_error
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class _ResultBuffer:
+    """Collects finished items and bulk-inserts them into `evaluations`"""
+
+    def __init__(self, flush_size: int):
+        self.flush_size = flush_size
+        self._pending: List[Tuple[EvaluationJob, Dict[str, Any]]] = []
+        self.completed = 0
+
+    async def add(self, job: EvaluationJob, evaluation_result: Dict[str, Any]) -> None:
+        self._pending.append((job, evaluation_result))
+        if len(self._pending) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        await async_db_manager.run(self._store, pending)
+        self.completed += len(pending)
+
+    @staticmethod
+    def _store(pending: List[Tuple[EvaluationJob, Dict[str, Any]]]) -> None:
+        evaluation_ids = Evaluation.create_many([
+            evaluation_record(job.submission_id, evaluation_result, job.user_id) for job, evaluation_result in pending
+        ])
+        EvaluationJob.mark_many_completed([(job.id, evaluation_id) for (job, _), evaluation_id in zip(pending, evaluation_ids)])
+
+class BatchDispatcher:
+    """Evaluate the items of a batch submission in the background
+
+    Items are prepared (language detection, prompt rendering, cache lookup)
+    up front and grouped by detected language so that prompts sharing a
+    prefix are sent together. Each group goes to the provider's Message
+    Batches API when available; otherwise (mock mode, other providers, or if
+    batch creation fails) items are evaluated locally with bounded
+    parallelism. Progress is tracked per item on its `evaluation_jobs` row.
+    """
+
+    def __init__(self, concurrency: int = 4, poll_interval: float = 30.0, flush_size: int = 20,
+                 use_provider_batch_api: bool = True):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.flush_size = flush_size
+        self.use_provider_batch_api = use_provider_batch_api
+        self._tasks = set()
+
+    def configure(self, concurrency: int, poll_interval: float, flush_size: int, use_provider_batch_api: bool) -> None:
+        """Apply new settings (takes effect for subsequent batches)"""
+        self.concurrency = max(1, int(concurrency))
+        self.poll_interval = max(0.0, float(poll_interval))
+        self.flush_size = max(1, int(flush_size))
+        self.use_provider_batch_api = bool(use_provider_batch_api)
+
+    def start(self, batch_id: str, items: List[Tuple[EvaluationJob, Submission]]) -> asyncio.Task:
+        """Run a batch in a background task on the current event loop"""
+        task = asyncio.create_task(self.run(batch_id, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, batch_id: str, items: List[Tuple[EvaluationJob, Submission]]) -> None:
+        """Evaluate every item of a batch and store the results"""
+        await async_db_manager.run(EvaluationJob.claim_batch, batch_id)
+        llm_service = get_llm_service()
+        buffer = _ResultBuffer(self.flush_size)
+        start_time = time.time()
+
+        try:
+            prepared_items = await asyncio.to_thread(
+                lambda: [(job, llm_service.prepare_evaluation(submission.text_content)) for job, submission in items]
+            )
+
+            # Cache hits need no provider call; long texts are chunked and merged
+            # locally; the rest are grouped by language
+            groups: "OrderedDict[str, List[Tuple[EvaluationJob, PreparedEvaluation]]]" = OrderedDict()
+            chunked = []
+            for job, prepared in prepared_items:
+                if prepared.cached is not None:
+                    await buffer.add(job, await llm_service.evaluate_prepared_async(prepared, job.priority, start_time))
+                elif prepared.parts:
+                    chunked.append((job, prepared))
+                else:
+                    groups.setdefault(prepared.language.value, []).append((job, prepared))
+
+            for language, group in groups.items():
+                logger.info(f"Batch {batch_id}: dispatching {len(group)} '{language}' items")
+                if self._can_use_provider_batch(llm_service):
+                    handled = set()
+                    try:
+                        await self._run_provider_batch(llm_service, batch_id, group, buffer, start_time, handled)
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Batch {batch_id}: provider batch failed, evaluating locally: {e}")
+                        group = [(job, prepared) for job, prepared in group if job.id not in handled]
+                await self._run_local(llm_service, group, buffer)
+            if chunked:
+                await self._run_local(llm_service, chunked, buffer)
+        except Exception as e:
+            logger.error(f"Batch {batch_id} failed: {e}")
+            # Store what finished, then give every item still running a final status
+            try:
+                await buffer.flush()
+            finally:
+                failed = await async_db_manager.run(
+                    EvaluationJob.fail_batch, batch_id, json.dumps(describe_llm_error(e)[2])
+                )
+                logger.error(f"Batch {batch_id}: {failed} unfinished items marked failed")
+            raise
+        finally:
+            await buffer.flush()
+            logger.info(f"Batch {batch_id} finished: {buffer.completed}/{len(items)} evaluations stored")
+
+    def _can_use_provider_batch(self, llm_service: EnhancedLLMService) -> bool:
+        client = llm_service.async_client
+        return self.use_provider_batch_api and client is not None and hasattr(client.messages, 'batches')
+
+    async def _run_local(self, llm_service: EnhancedLLMService, group: List[Tuple[EvaluationJob, PreparedEvaluation]],
+                         buffer: _ResultBuffer) -> None:
+        """Evaluate items concurrently, at most `concurrency` at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def evaluate(job: EvaluationJob, prepared: PreparedEvaluation) -> None:
+            async with semaphore:
+                while True:
+                    try:
+                        evaluation_result = await llm_service.evaluate_prepared_async(prepared, job.priority)
+                        break
+                    except LLMQueueFullError as e:
+                        # Batch items wait for capacity instead of failing
+                        await asyncio.sleep(e.retry_after)
+                    except Exception as e:
+                        await self._fail(job, describe_llm_error(e)[2])
+                        return
+            await buffer.add(job, evaluation_result)
+
+        await asyncio.gather(*(evaluate(job, prepared) for job, prepared in group))
+
+    async def _run_provider_batch(self, llm_service: EnhancedLLMService, batch_id: str,
+                                  group: List[Tuple[EvaluationJob, PreparedEvaluation]],
+                                  buffer: _ResultBuffer, start_time: float, handled: set) -> None:
+        """Submit a group as one Message Batch, wait for it to end and store the results
+        
+        IDs of jobs whose outcome has been recorded are added to `handled`.
+        """
+        await async_db_manager.run(get_usage_ledger().check_limits)
+        client = llm_service.async_client
+        items = {job.id: (job, prepared) for job, prepared in group}
+        params = {job.id: llm_service.build_request_params(prepared) for job, prepared in group}
+        message_batch = await client.messages.batches.create(requests=[
+            {"custom_id": job_id, "params": job_params} for job_id, job_params in params.items()
+        ])
+        logger.info(f"Batch {batch_id}: provider batch {message_batch.id} created")
+
+        while message_batch.processing_status != "ended":
+            await asyncio.sleep(self.poll_interval)
+            await async_db_manager.run(EvaluationJob.heartbeat_batch, batch_id)
+            message_batch = await client.messages.batches.retrieve(message_batch.id)
+
+        async for entry in await client.messages.batches.results(message_batch.id):
+            job, prepared = items[entry.custom_id]
+            handled.add(job.id)
+            if entry.result.type != "succeeded":
+                await self._fail(job, {
+                    "code": "LLM_ERROR",
+                    "message": "Evaluation processing failed",
+                    "field": None,
+                    "details": f"Batch request {entry.result.type}"
+                })
+                continue
+            prepared.provider_name = "claude"
+            prepared.model = params[job.id]["model"]
+            llm_service.record_usage(prepared, prepared.model, ClaudeProvider.usage_from(entry.result.message))
+            try:
+                evaluation_result = await llm_service.finish_evaluation_async(
+                    prepared, entry.result.message.content[0].text, start_time
+                )
+            except Exception as e:
+                await self._fail(job, describe_llm_error(e)[2])
+                continue
+            await buffer.add(job, evaluation_result)
+
+    async def _fail(self, job: EvaluationJob, error: Dict[str, Any]) -> None:
+        logger.error(f"Batch item {job.id} failed: {error['details']}")
+        await async_db_manager.run(job.mark_failed, json.dumps(error))
+
+# Global batch dispatcher instance
+batch_dispatcher = None
+
+def get_batch_dispatcher() -> BatchDispatcher:
+    """Get the global batch dispatcher, configured from llm.yaml"""
+    global batch_dispatcher
+    if batch_dispatcher is None:
+        batch_dispatcher = BatchDispatcher()
+        perf_config = get_llm_service().llm_config.performance_optimization
+        batch_dispatcher.configure(
+            concurrency=perf_config.get('batch_concurrency', 4),
+            poll_interval=perf_config.get('batch_poll_interval', 30),
+            flush_size=perf_config.get('batch_flush_size', 20),
+            use_provider_batch_api=perf_config.get('use_provider_batch_api', True)
+        )
+    return batch_dispatcher
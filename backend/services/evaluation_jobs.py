@@ -0,0 +1,343 @@
+"""
+Evaluation Jobs for Memo AI Coach
+Background worker pool for asynchronous evaluations with completion callbacks
+"""
+
+import json
+import socket
+import asyncio
+import ipaddress
+import itertools
+import logging
+import urllib.request
+from urllib.parse import urlparse
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple, List
+
+try:
+    from models.entities import Submission, Evaluation, EvaluationJob, PromptTemplate
+    from models.database import async_db_manager
+except ImportError:
+    from backend.models.entities import Submission, Evaluation, EvaluationJob, PromptTemplate
+    from backend.models.database import async_db_manager
+from .llm_service import get_llm_service, PromptArtifact, rebuild_prompt
+from .llm_admission import LLMQueueFullError
+from .llm_retry import LLMDeadlineExceededError
+from .circuit_breaker import CircuitOpenError
+from .usage_ledger import CostLimitExceededError
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class CallbackURLError(ValueError):
+    """Raised when a callback URL may not be called by the server"""
+
+def validate_callback_url(url: str, allowed_hosts: Optional[List[str]] = None) -> None:
+    """Check that a callback URL is http(s) and cannot reach internal services
+
+    With `allowed_hosts` configured, only those hosts (and their subdomains) are
+    accepted and they are trusted as listed. Otherwise the host must resolve
+    only to public addresses: private, loopback, link-local, reserved,
+    multicast and unspecified addresses are rejected. Resolves DNS, so call it
+    off the event loop.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise CallbackURLError("Callback URL must be an http(s) URL")
+    host = parsed.hostname.rstrip('.').lower()
+    
+    if allowed_hosts:
+        if not any(host == allowed or host.endswith('.' + allowed) for allowed in allowed_hosts):
+            raise CallbackURLError(f"Callback host '{host}' is not in the allowed hosts")
+        return
+    
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (ValueError, OSError) as e:
+        raise CallbackURLError(f"Callback host '{host}' could not be resolved: {e}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if not ip.is_global or ip.is_multicast or ip.is_reserved:
+            raise CallbackURLError(f"Callback host '{host}' resolves to a non-public address")
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Refuse redirects so a callback cannot be bounced to an internal address"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+def evaluation_record(submission_id: int, evaluation_result: Dict[str, Any],
+                      user_id: Optional[int] = None) -> Dict[str, Any]:
+    """Build the `Evaluation.create` arguments for an LLM evaluation result"""
+    metadata = evaluation_result.get('metadata', {})
+    token_usage = metadata.get('token_usage') or {}
+    debug_fields = get_llm_service().debug_record(metadata)
+    return {
+        "submission_id": submission_id,
+        "overall_score": evaluation_result['overall_score'],
+        "strengths": json.dumps(evaluation_result['strengths']),
+        "opportunities": json.dumps(evaluation_result['opportunities']),
+        "rubric_scores": json.dumps(evaluation_result['rubric_scores']),
+        "segment_feedback": json.dumps(evaluation_result['segment_feedback']),
+        "llm_provider": metadata.get('llm_provider', 'claude'),
+        "llm_model": metadata.get('llm_model', 'claude-3-haiku-20240307'),
+        **debug_fields,
+        "processing_time": metadata.get('processing_time', 0),
+        "input_tokens": token_usage.get('input_tokens', 0),
+        "output_tokens": token_usage.get('output_tokens', 0),
+        "cache_read_tokens": token_usage.get('cache_read_input_tokens', 0),
+        "cache_write_tokens": token_usage.get('cache_creation_input_tokens', 0),
+        "cost_usd": metadata.get('cost_usd', 0.0),
+        "user_id": user_id
+    }
+
+def store_evaluation(submission_id: int, evaluation_result: Dict[str, Any],
+                     user_id: Optional[int] = None) -> Evaluation:
+    """Create the evaluation record with raw data, token usage and language detection metadata"""
+    return Evaluation.create(**evaluation_record(submission_id, evaluation_result, user_id))
+
+def load_raw_prompt(evaluation: Evaluation, text_content: str) -> Optional[str]:
+    """
+    Full prompt of a stored evaluation, rebuilt from its prompt template when not stored as text
+    
+    Args:
+        evaluation: Stored evaluation
+        text_content: Text of the evaluated submission
+        
+    Returns:
+        Prompt text, or None if the evaluation kept no prompt
+    """
+    if evaluation.raw_prompt or not evaluation.prompt_template_hash:
+        return evaluation.raw_prompt
+    template = PromptTemplate.get_by_hash(evaluation.prompt_template_hash)
+    if not template:
+        logger.warning(f"Prompt template {evaluation.prompt_template_hash} of evaluation {evaluation.id} not found")
+        return None
+    return rebuild_prompt(PromptArtifact(**json.loads(template.content)), text_content, evaluation.prompt_parts)
+
+def describe_llm_error(e: Exception) -> Tuple[int, Optional[Dict[str, str]], Dict[str, Any]]:
+    """Map an LLM service error to (status_code, headers, error)"""
+    if isinstance(e, LLMQueueFullError):
+        return 429, {"Retry-After": str(e.retry_after)}, {
+            "code": "RATE_LIMIT_ERROR",
+            "message": "Evaluation service is busy",
+            "field": None,
+            "details": f"Too many evaluations in progress. Please retry in {e.retry_after} seconds"
+        }
+    if isinstance(e, LLMDeadlineExceededError):
+        return 504, None, {
+            "code": "LLM_TIMEOUT",
+            "message": "Evaluation took too long",
+            "field": None,
+            "details": str(e)
+        }
+    if isinstance(e, CostLimitExceededError):
+        return 429, {"Retry-After": str(e.retry_after)}, {
+            "code": "COST_LIMIT_EXCEEDED",
+            "message": "Evaluation spending limit reached",
+            "field": None,
+            "details": str(e)
+        }
+    if isinstance(e, CircuitOpenError):
+        return 503, {"Retry-After": str(e.retry_after)}, {
+            "code": "LLM_UNAVAILABLE",
+            "message": "Evaluation service is temporarily unavailable",
+            "field": None,
+            "details": f"LLM providers are failing. Please retry in {e.retry_after} seconds"
+        }
+    return 500, None, {
+        "code": "LLM_ERROR",
+        "message": "Evaluation processing failed",
+        "field": None,
+        "details": str(e)
+    }
+
+class EvaluationJobWorker:
+    """Pool of asyncio workers that run queued evaluation jobs
+
+    Job state lives in the `evaluation_jobs` table; the in-memory queue only
+    holds job references. Workers claim a job atomically before running it, so
+    a job recovered by more than one process is still evaluated once. When the
+    LLM admission queue is full, background jobs wait and retry instead of
+    failing.
+    """
+
+    def __init__(self, num_workers: int = 3, callback_timeout: float = 10.0, callback_retries: int = 3,
+                 stale_after: int = 600, callback_allowed_hosts: Optional[List[str]] = None):
+        self.num_workers = num_workers
+        self.callback_timeout = callback_timeout
+        self.callback_retries = callback_retries
+        self.stale_after = stale_after
+        self.callback_allowed_hosts = callback_allowed_hosts or []
+        self._opener = urllib.request.build_opener(_NoRedirectHandler)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._completed = 0
+        self._failed = 0
+
+    def configure(self, num_workers: int, callback_timeout: float, callback_retries: int, stale_after: int,
+                  callback_allowed_hosts: Optional[List[str]] = None) -> None:
+        """Apply new settings (the worker count applies on the next start)"""
+        self.num_workers = max(1, int(num_workers))
+        self.callback_timeout = callback_timeout
+        self.callback_retries = max(0, int(callback_retries))
+        self.stale_after = stale_after
+        self.callback_allowed_hosts = [host.rstrip('.').lower() for host in callback_allowed_hosts or []]
+
+    def ensure_started(self) -> None:
+        """Start the worker tasks on the running event loop if needed"""
+        if self._tasks and not all(task.done() for task in self._tasks):
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        logger.info(f"Evaluation job worker pool started with {self.num_workers} workers")
+
+    def recover(self) -> int:
+        """Enqueue jobs left queued, or running on a dead worker, by a previous process"""
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        jobs = EvaluationJob.get_recoverable(stale_before)
+        for job in jobs:
+            self.submit(job)
+        if jobs:
+            logger.info(f"Recovered {len(jobs)} evaluation jobs")
+        return len(jobs)
+
+    def submit(self, job: EvaluationJob) -> None:
+        """Queue a job for background evaluation"""
+        self.ensure_started()
+        self._queue.put_nowait((job.priority, next(self._sequence), job))
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks (interrupted jobs are returned to the queue)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Evaluation job {job.id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: EvaluationJob) -> None:
+        if not await async_db_manager.run(job.claim):
+            return
+        try:
+            evaluation_result = await self._evaluate(job)
+        except asyncio.CancelledError:
+            # Requeue synchronously: an await here could itself be cancelled
+            job.requeue()
+            raise
+        except Exception as e:
+            logger.error(f"Evaluation job {job.id} failed: {e}")
+            error = describe_llm_error(e)[2]
+            await async_db_manager.run(job.mark_failed, json.dumps(error))
+            self._failed += 1
+            await self._notify(job, {"job_id": job.id, "status": job.status, "evaluation_id": None, "error": error})
+            return
+
+        evaluation = await async_db_manager.run(self._store, job, evaluation_result)
+        self._completed += 1
+        public_result = dict(evaluation_result)
+        public_result['metadata'] = {
+            key: value for key, value in evaluation_result.get('metadata', {}).items()
+            if key not in ('raw_prompt', 'raw_response')
+        }
+        await self._notify(job, {
+            "job_id": job.id,
+            "status": job.status,
+            "evaluation_id": evaluation.id,
+            "evaluation": public_result,
+            "error": None
+        })
+
+    @staticmethod
+    def _store(job: EvaluationJob, evaluation_result: Dict[str, Any]) -> Evaluation:
+        evaluation = store_evaluation(job.submission_id, evaluation_result, job.user_id)
+        job.mark_completed(evaluation.id)
+        return evaluation
+
+    async def _evaluate(self, job: EvaluationJob) -> Dict[str, Any]:
+        submission = await async_db_manager.run(Submission.get_by_id, job.submission_id)
+        if submission is None:
+            raise ValueError(f"Submission {job.submission_id} not found")
+        while True:
+            llm_service = get_llm_service()
+            try:
+                return await llm_service.evaluate_text_with_llm_async(submission.text_content, priority=job.priority)
+            except LLMQueueFullError as e:
+                # Background jobs wait for capacity instead of failing
+                await asyncio.sleep(e.retry_after)
+
+    def check_callback_url(self, url: str) -> None:
+        """Raise `CallbackURLError` unless the URL is an allowed callback target"""
+        validate_callback_url(url, self.callback_allowed_hosts)
+
+    async def _notify(self, job: EvaluationJob, payload: Dict[str, Any]) -> None:
+        """POST the job outcome to its callback URL, retrying with backoff"""
+        if not job.callback_url:
+            return
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        for attempt in range(self.callback_retries + 1):
+            try:
+                status = await asyncio.to_thread(self._post_callback, job.callback_url, body)
+                logger.info(f"Callback for job {job.id} delivered (HTTP {status})")
+                return
+            except CallbackURLError as e:
+                logger.error(f"Callback for job {job.id} refused: {e}")
+                return
+            except Exception as e:
+                logger.warning(f"Callback for job {job.id} failed (attempt {attempt + 1}): {e}")
+                if attempt < self.callback_retries:
+                    await asyncio.sleep(2 ** attempt)
+        logger.error(f"Giving up on callback for job {job.id}")
+
+    def _post_callback(self, url: str, body: bytes) -> int:
+        # Checked again at send time: DNS may have changed since the job was submitted
+        self.check_callback_url(url)
+        request = urllib.request.Request(
+            url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with self._opener.open(request, timeout=self.callback_timeout) as response:
+            return response.status
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return worker pool statistics"""
+        return {
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self._completed,
+            "failed": self._failed
+        }
+
+# Global evaluation job worker instance
+job_worker = None
+
+def get_job_worker() -> EvaluationJobWorker:
+    """Get the global evaluation job worker, configured from llm.yaml"""
+    global job_worker
+    if job_worker is None:
+        job_worker = EvaluationJobWorker()
+        perf_config = get_llm_service().llm_config.performance_optimization
+        job_worker.configure(
+            num_workers=perf_config.get('job_workers', 3),
+            callback_timeout=perf_config.get('job_callback_timeout', 10),
+            callback_retries=perf_config.get('job_callback_retries', 3),
+            stale_after=perf_config.get('job_stale_after', 600),
+            callback_allowed_hosts=perf_config.get('job_callback_allowed_hosts', [])
+        )
+    return job_worker
@@ -0,0 +1,86 @@
+"""
+Incremental JSON Parser for Memo AI Coach
+Emits top-level members of a streamed JSON object as soon as each one is complete
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Tuple
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class IncrementalJSONParser:
+    """Scan a JSON object arriving in chunks and return completed top-level members
+
+    Only structural characters are tracked (string state, nesting depth), so
+    each chunk is scanned once. A member is decoded when the comma or closing
+    brace that ends it arrives at depth one. Any text before the opening brace
+    (e.g. a code fence) is skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None
+        self.done = False
+        self.members: Dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add streamed text and return members completed by it
+
+        Args:
+            chunk: Next piece of model output
+
+        Returns:
+            List of (key, value) pairs in document order
+        """
+        self._buffer += chunk
+        buffer = self._buffer
+        completed = []
+        i = self._position
+        while i < len(buffer) and not self.done:
+            ch = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._member_start is None:
+                if ch == '{':
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._decode_member(buffer[self._member_start:i], completed)
+                    self.done = True
+            elif ch == ',' and self._depth == 1:
+                self._decode_member(buffer[self._member_start:i], completed)
+                self._member_start = i + 1
+            i += 1
+        self._position = i
+        return completed
+
+    def _decode_member(self, text: str, completed: List[Tuple[str, Any]]) -> None:
+        text = text.strip()
+        if not text:
+            return
+        try:
+            member = json.loads("{" + text + "}")
+        except ValueError as e:
+            logger.warning(f"Skipping undecodable streamed JSON member: {e}")
+            return
+        for key, value in member.items():
+            self.members[key] = value
+            completed.append((key, value))
@@ -0,0 +1,165 @@
+"""
+LLM Admission Control for Memo AI Coach
+Bounds concurrent provider calls and queues the overflow by priority
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower value is served first)
+PRIORITY_ADMIN = 0
+PRIORITY_SHORT_TEXT = 1
+PRIORITY_NORMAL = 2
+
+class LLMQueueFullError(Exception):
+    """Raised when the LLM wait queue is full and the request is rejected"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM request queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Semaphore-style limiter with a bounded priority wait queue
+
+    At most `max_concurrent` callers hold a slot at any time. Further callers
+    wait in a heap ordered by (priority, arrival) until a slot is handed over
+    to them; once `queue_size` callers are waiting, new ones are rejected
+    immediately with `LLMQueueFullError` instead of piling up.
+
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, max_concurrent: int = 5, queue_size: int = 10, priority_enabled: bool = True):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.priority_enabled = priority_enabled
+        self._active = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._avg_hold_time = 5.0  # seconds, seeded with a typical LLM latency
+        self._admitted = 0
+        self._rejected = 0
+        self._wake_pending = False
+
+    def configure(self, max_concurrent: int, queue_size: int, priority_enabled: bool) -> None:
+        """Apply new limits (takes effect for subsequent acquisitions)
+
+        May be called from any thread: waiters are only ever woken on the event
+        loop, so a call from elsewhere defers that to the next acquire or release.
+        """
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.queue_size = max(0, int(queue_size))
+        self.priority_enabled = bool(priority_enabled)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._wake_pending = True
+            return
+        self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        """Hand free slots to waiters (raised limits can admit them right away)"""
+        self._wake_pending = False
+        while self._active < self.max_concurrent and self._wake_next_waiter():
+            self._active += 1
+
+    def estimate_retry_after(self) -> int:
+        """Estimate seconds until a queue position frees up"""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._avg_hold_time * backlog / self.max_concurrent))
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        """Wait for a slot, or raise `LLMQueueFullError` if the queue is full"""
+        if self._wake_pending:
+            self._admit_waiters()
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._rejected += 1
+            retry_after = self.estimate_retry_after()
+            logger.warning(f"LLM queue full ({len(self._waiters)} waiting), rejecting request; retry after {retry_after}s")
+            raise LLMQueueFullError(retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority if self.priority_enabled else PRIORITY_NORMAL, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+        self._admitted += 1
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it"""
+        if self._active > self.max_concurrent:
+            # Limits were lowered; shrink instead of handing over
+            self._active -= 1
+            return
+        if not self._wake_next_waiter():
+            self._active -= 1
+        if self._wake_pending:
+            self._admit_waiters()
+
+    def _wake_next_waiter(self) -> bool:
+        """Resolve the highest priority live waiter, returning False if none"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL):
+        """Hold a slot for the duration of the block"""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self._avg_hold_time = 0.8 * self._avg_hold_time + 0.2 * held
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return current limiter statistics"""
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "queue_size": self.queue_size,
+            "priority_enabled": self.priority_enabled,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_hold_time": round(self._avg_hold_time, 3)
+        }
+
+# Global admission controller instance (shared across LLM service reloads)
+admission_controller = None
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global admission controller instance"""
+    global admission_controller
+    if admission_controller is None:
+        admission_controller = AdmissionController()
+    return admission_controller
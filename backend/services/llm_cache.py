@@ -0,0 +1,193 @@
+"""
+Evaluation Result Cache for Memo AI Coach
+Content-addressed LRU+TTL cache with an optional SQLite second tier
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Seconds between deletions of expired rows from the persistent tier
+PRUNE_INTERVAL = 60.0
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different resubmissions share a cache entry"""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+def make_cache_key(text: str, language: str, template_version: str, model: str, temperature: float) -> str:
+    """Build a content-addressed cache key for an evaluation request"""
+    digest = hashlib.sha256()
+    for part in (normalize_text(text), language, template_version, model, repr(float(temperature))):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+class EvaluationCache:
+    """Thread-safe LRU cache with per-entry TTL
+
+    When `persistent_path` is set, entries are also written to a small SQLite
+    database so cache hits survive restarts. Memory misses fall through to the
+    persistent tier and are promoted back into memory.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: int = 3600, persistent_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persistent_path = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._last_pruned = 0.0
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self.configure(max_size, ttl, persistent_path)
+
+    def configure(self, max_size: int, ttl: int, persistent_path: Optional[str] = None) -> None:
+        """Apply new limits and (re)open the persistent tier if its path changed"""
+        with self._lock:
+            self.max_size = max(1, int(max_size))
+            self.ttl = max(1, int(ttl))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        if persistent_path != self.persistent_path:
+            with self._db_lock:
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+                self.persistent_path = persistent_path
+                if persistent_path:
+                    self._open_persistent_tier(persistent_path)
+
+    def _open_persistent_tier(self, path: str) -> None:
+        """Open the SQLite tier, disabling it on failure"""
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode = WAL')
+            self._db.execute('PRAGMA synchronous = NORMAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS evaluation_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_cache_expires ON evaluation_cache(expires_at)')
+            self._db.commit()
+            logger.info(f"Persistent evaluation cache enabled at: {path}")
+        except Exception as e:
+            logger.error(f"Failed to open persistent evaluation cache at {path}: {e}")
+            self._db = None
+            self.persistent_path = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached value, or None on miss or expiry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._get_persistent(key, now)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._persistent_hits += 1
+        self._set_memory(key, value, now + self.ttl)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value in memory and, if enabled, in the persistent tier"""
+        expires_at = time.time() + self.ttl
+        self._set_memory(key, value, expires_at)
+        self._set_persistent(key, value, expires_at)
+
+    def _set_memory(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_persistent(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT value FROM evaluation_cache WHERE cache_key = ? AND expires_at > ?',
+                    (key, now)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Persistent evaluation cache read failed: {e}")
+            return None
+
+    def _set_persistent(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO evaluation_cache (cache_key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value, ensure_ascii=False), expires_at)
+                )
+                # Expired rows are never served, so pruning them can wait
+                now = time.time()
+                if now - self._last_pruned >= PRUNE_INTERVAL:
+                    self._db.execute('DELETE FROM evaluation_cache WHERE expires_at <= ?', (now,))
+                    self._last_pruned = now
+                self._db.commit()
+        except Exception as e:
+            logger.error(f"Persistent evaluation cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM evaluation_cache')
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        with self._lock:
+            lookups = self._hits + self._persistent_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._persistent_hits) / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None
+            }
+
+# Global evaluation cache instance (shared across LLM service reloads)
+evaluation_cache = None
+
+def get_evaluation_cache() -> EvaluationCache:
+    """Get the global evaluation cache instance"""
+    global evaluation_cache
+    if evaluation_cache is None:
+        evaluation_cache = EvaluationCache()
+    return evaluation_cache
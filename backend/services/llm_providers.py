@@ -0,0 +1,264 @@
+"""
+LLM Providers for Memo AI Coach
+Provider abstraction over Claude and the configured fallback, guarded by circuit breakers
+"""
+
+import json
+import time
+import socket
+import asyncio
+import logging
+import urllib.error
+import urllib.request
+from typing import Dict, Any, Optional, List, AsyncIterator
+
+from .circuit_breaker import get_circuit_breaker, CircuitOpenError
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Token counters reported in ProviderResponse.usage; input_tokens excludes cached input
+USAGE_FIELDS = ('input_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens', 'output_tokens')
+
+class ProviderError(Exception):
+    """HTTP or transport error raised by a non-Anthropic provider"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Mimic the SDK error shape so Retry-After hints are honoured
+        self.response = type('ProviderResponseInfo', (), {'headers': headers or {}})()
+
+class ProviderResponse:
+    """Text and token usage returned by a provider call"""
+
+    def __init__(self, text: str, model: str, usage: Optional[Dict[str, int]] = None):
+        self.text = text
+        self.model = model
+        self.usage = usage or {}
+
+class LLMProvider:
+    """Base provider; subclasses implement `_complete` and optionally `_complete_async`
+
+    Every call passes through the provider's circuit breaker: calls are refused
+    with `CircuitOpenError` while the circuit is open, and each outcome and its
+    latency are recorded.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, max_output_tokens: Optional[int] = None):
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.breaker = get_circuit_breaker(self.name)
+
+    def model_for(self, params: Dict[str, Any]) -> str:
+        """Model a request is sent to (the provider's configured model)"""
+        return self.model
+
+    def _prepare_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        params = {**params, "model": self.model_for(params)}
+        if self.max_output_tokens:
+            params["max_tokens"] = min(params.get("max_tokens", self.max_output_tokens), self.max_output_tokens)
+        return params
+
+    @staticmethod
+    def is_provider_failure(error: Exception) -> bool:
+        """Whether an error says the provider is unhealthy (transport errors, timeouts, 429 and 5xx)
+
+        Other 4xx responses, such as 400 or 401, are caused by the request and
+        are not counted against the provider.
+        """
+        status_code = getattr(error, 'status_code', None)
+        return status_code is None or status_code == 429 or status_code >= 500
+
+    def _record_error(self, error: BaseException, started: float) -> None:
+        if isinstance(error, Exception) and self.is_provider_failure(error):
+            self.breaker.record_failure(time.monotonic() - started)
+        else:
+            # Cancelled by the caller (client disconnect, a failed sibling chunk,
+            # shutdown) or rejected as a bad request: says nothing about the provider
+            self.breaker.record_cancelled()
+
+    def record_timeout(self, elapsed: float) -> None:
+        """Record a call abandoned by the retry layer's per-attempt timeout as a failure"""
+        self.breaker.record_failure(elapsed)
+
+    def complete(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        """Run one Messages-style request (blocking)"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+        started = time.monotonic()
+        try:
+            response = self._complete(self._prepare_params(params), timeout)
+        except BaseException as e:
+            self._record_error(e, started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return response
+
+    async def complete_async(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        """Run one Messages-style request without blocking the event loop
+
+        Cancellation is not recorded as a failure; the per-attempt timeout is
+        reported through `record_timeout` by the retry layer.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+        started = time.monotonic()
+        try:
+            response = await self._complete_async(self._prepare_params(params), timeout)
+        except BaseException as e:
+            self._record_error(e, started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return response
+
+    async def stream_async(self, params: Dict[str, Any], timeout: float,
+                           usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        """Yield response text as it is generated
+        
+        Token usage is written into `usage` (if given) once the stream ends.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+        started = time.monotonic()
+        try:
+            async for text in self._stream_async(self._prepare_params(params), timeout,
+                                                 usage if usage is not None else {}):
+                yield text
+        except GeneratorExit:
+            # The consumer stopped reading; that says nothing about the provider
+            self.breaker.record_cancelled()
+            raise
+        except BaseException as e:
+            self._record_error(e, started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+
+    def _complete(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        raise NotImplementedError
+
+    async def _complete_async(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        return await asyncio.to_thread(self._complete, params, timeout)
+
+    async def _stream_async(self, params: Dict[str, Any], timeout: float,
+                            usage: Dict[str, int]) -> AsyncIterator[str]:
+        # Providers without streaming deliver the whole response as one chunk
+        response = await self._complete_async(params, timeout)
+        usage.update(response.usage)
+        yield response.text
+
+class ClaudeProvider(LLMProvider):
+    """Anthropic Messages API via the shared sync and async SDK clients"""
+
+    name = "claude"
+
+    def __init__(self, client, async_client, model: str, max_output_tokens: Optional[int] = None):
+        super().__init__(model, max_output_tokens)
+        self.client = client
+        self.async_client = async_client
+
+    def model_for(self, params: Dict[str, Any]) -> str:
+        """Requests may name a Claude model chosen by the model router"""
+        return params.get("model") or self.model
+
+    @staticmethod
+    def usage_from(message) -> Dict[str, int]:
+        """Extract token counts (including prompt cache reads and writes) from a Messages API response"""
+        usage = getattr(message, 'usage', None)
+        tokens = {}
+        for field in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                tokens[field] = value
+        return tokens
+
+    @classmethod
+    def _to_response(cls, message, model: str) -> ProviderResponse:
+        return ProviderResponse(text=message.content[0].text, model=model, usage=cls.usage_from(message))
+
+    def _complete(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        return self._to_response(self.client.messages.create(**params, timeout=timeout), params["model"])
+
+    async def _complete_async(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        if self.async_client is None:
+            return await super()._complete_async(params, timeout)
+        message = await self.async_client.messages.create(**params, timeout=timeout)
+        return self._to_response(message, params["model"])
+
+    async def _stream_async(self, params: Dict[str, Any], timeout: float,
+                            usage: Dict[str, int]) -> AsyncIterator[str]:
+        if self.async_client is None:
+            async for text in super()._stream_async(params, timeout, usage):
+                yield text
+            return
+        async with self.async_client.messages.stream(**params, timeout=timeout) as stream:
+            async for text in stream.text_stream:
+                yield text
+            usage.update(self.usage_from(await stream.get_final_message()))
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI Chat Completions API over plain HTTPS (no extra SDK dependency)"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, api_base_url: str = "https://api.openai.com/v1",
+                 max_output_tokens: Optional[int] = None):
+        super().__init__(model, max_output_tokens)
+        self.api_key = api_key
+        self.api_base_url = api_base_url.rstrip('/')
+
+    def _complete(self, params: Dict[str, Any], timeout: float) -> ProviderResponse:
+        payload = {
+            "model": params["model"],
+            "max_tokens": params.get("max_tokens"),
+            "temperature": params.get("temperature"),
+            "messages": self._convert_messages(params)
+        }
+        request = urllib.request.Request(
+            f"{self.api_base_url}/chat/completions",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            raise ProviderError(f"OpenAI API error {e.code}: {e.reason}", e.code, dict(e.headers or {})) from e
+        except socket.timeout as e:
+            raise TimeoutError(f"OpenAI API request timed out after {timeout:.1f}s") from e
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, socket.timeout):
+                raise TimeoutError(f"OpenAI API request timed out after {timeout:.1f}s") from e
+            raise ProviderError(f"OpenAI API connection error: {e.reason}") from e
+
+        usage = body.get('usage') or {}
+        # OpenAI caches long prompt prefixes automatically and reports the hits
+        cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
+        return ProviderResponse(
+            text=body["choices"][0]["message"]["content"],
+            model=body.get('model', params["model"]),
+            usage={
+                "input_tokens": usage.get('prompt_tokens', 0) - cached_tokens,
+                "cache_read_input_tokens": cached_tokens,
+                "output_tokens": usage.get('completion_tokens', 0)
+            }
+        )
+
+    @staticmethod
+    def _convert_messages(params: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Flatten Anthropic-style messages (and system prompt) into chat messages"""
+        messages = []
+        system = params.get("system")
+        if system:
+            if isinstance(system, list):
+                system = "\n\n".join(block.get("text", "") for block in system)
+            messages.append({"role": "system", "content": system})
+        for message in params.get("messages", []):
+            content = message["content"]
+            if isinstance(content, list):
+                content = "\n\n".join(block.get("text", "") for block in content if block.get("type") == "text")
+            messages.append({"role": message["role"], "content": content})
+        return messages
@@ -0,0 +1,223 @@
+"""
+LLM Retry Engine for Memo AI Coach
+Error classification, exponential backoff with jitter, and a total deadline
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar, List
+
+import anthropic
+
+from .llm_providers import ProviderError
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Error classes
+ERROR_RATE_LIMIT = "rate_limit"
+ERROR_OVERLOADED = "overloaded"
+ERROR_TIMEOUT = "timeout"
+ERROR_SERVER = "server_error"
+ERROR_CONNECTION = "connection_error"
+ERROR_FATAL = "fatal"
+
+class LLMDeadlineExceededError(Exception):
+    """Raised when the total time budget for an LLM call is used up"""
+
+    def __init__(self, deadline: float, last_error: Optional[Exception] = None):
+        message = f"LLM call exceeded its {deadline:.0f}s deadline"
+        if last_error is not None:
+            message += f" (last error: {last_error})"
+        super().__init__(message)
+        self.last_error = last_error
+
+def classify_error(error: Exception) -> str:
+    """Map a provider exception to a retry error class"""
+    if isinstance(error, anthropic.RateLimitError):
+        return ERROR_RATE_LIMIT
+    if isinstance(error, (anthropic.APITimeoutError, asyncio.TimeoutError, TimeoutError)):
+        return ERROR_TIMEOUT
+    if isinstance(error, anthropic.APIConnectionError):
+        return ERROR_CONNECTION
+    if isinstance(error, anthropic.APIStatusError):
+        if error.status_code == 529:
+            return ERROR_OVERLOADED
+        if error.status_code == 429:
+            return ERROR_RATE_LIMIT
+        if error.status_code >= 500:
+            return ERROR_SERVER
+    if isinstance(error, ProviderError):
+        if error.status_code is None:
+            return ERROR_CONNECTION
+        if error.status_code == 429:
+            return ERROR_RATE_LIMIT
+        if error.status_code >= 500:
+            return ERROR_SERVER
+    return ERROR_FATAL
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read a Retry-After hint (seconds) from a provider error response"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        value = headers.get('retry-after')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class RetryStats:
+    """Record of the attempts made for a single LLM call"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.errors: List[str] = []
+        self.total_backoff = 0.0
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "errors": list(self.errors),
+            "total_backoff": round(self.total_backoff, 3)
+        }
+
+class RetryPolicy:
+    """Retry limits and delays, built from the llm.yaml error handling settings"""
+
+    def __init__(self, max_retries: int = 3, retry_delay: float = 1.0, rate_limit_delay: float = 60.0,
+                 max_rate_limit_retries: int = 3, max_timeout_retries: int = 2, rate_limit_retry: bool = True,
+                 timeout_retry: bool = True, request_timeout: float = 30.0, deadline: float = 15.0,
+                 max_backoff: float = 8.0):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.rate_limit_delay = rate_limit_delay
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_timeout_retries = max_timeout_retries
+        self.rate_limit_retry = rate_limit_retry
+        self.timeout_retry = timeout_retry
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def from_config(cls, llm_config) -> 'RetryPolicy':
+        """Build a policy from a validated LLMConfig"""
+        api_config = llm_config.api_configuration
+        error_config = getattr(llm_config, 'error_handling', None) or {}
+        perf_config = llm_config.performance_optimization
+        return cls(
+            max_retries=api_config.get('max_retries', 3),
+            retry_delay=api_config.get('retry_delay', 1),
+            rate_limit_delay=error_config.get('rate_limit_delay', 60),
+            max_rate_limit_retries=error_config.get('max_rate_limit_retries', 3),
+            max_timeout_retries=error_config.get('max_timeout_retries', 2),
+            rate_limit_retry=error_config.get('rate_limit_retry', True),
+            timeout_retry=error_config.get('timeout_retry', True),
+            request_timeout=api_config.get('timeout', 30),
+            deadline=perf_config.get('max_response_time', 15),
+            max_backoff=error_config.get('max_backoff', 8)
+        )
+
+    def retry_budget(self, error_class: str) -> int:
+        """Number of retries allowed for an error class"""
+        if error_class == ERROR_RATE_LIMIT:
+            return self.max_rate_limit_retries if self.rate_limit_retry else 0
+        if error_class == ERROR_TIMEOUT:
+            return self.max_timeout_retries if self.timeout_retry else 0
+        if error_class in (ERROR_OVERLOADED, ERROR_SERVER, ERROR_CONNECTION):
+            return self.max_retries
+        return 0
+
+    def backoff(self, error_class: str, retry_number: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the given retry (1-based), using full jitter"""
+        if retry_after is not None:
+            return retry_after
+        base = self.rate_limit_delay if error_class == ERROR_RATE_LIMIT else self.retry_delay
+        ceiling = min(self.max_backoff, base * (2 ** (retry_number - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+class _RetryState:
+    """Bookkeeping shared by the sync and async retry loops"""
+
+    def __init__(self, policy: RetryPolicy, stats: RetryStats, started_at: Optional[float]):
+        self.policy = policy
+        self.stats = stats
+        self.expires_at = (started_at if started_at is not None else time.monotonic()) + policy.deadline
+        self.retries_by_class: Dict[str, int] = {}
+
+    def attempt_timeout(self, last_error: Optional[Exception]) -> float:
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceededError(self.policy.deadline, last_error)
+        self.stats.attempts += 1
+        return min(self.policy.request_timeout, remaining)
+
+    def next_delay(self, error: Exception) -> float:
+        """Return the delay before retrying, or re-raise if the error is final"""
+        error_class = classify_error(error)
+        self.stats.errors.append(error_class)
+        used = self.retries_by_class.get(error_class, 0)
+        if used >= self.policy.retry_budget(error_class):
+            raise error
+        self.retries_by_class[error_class] = used + 1
+
+        delay = self.policy.backoff(error_class, used + 1, get_retry_after(error))
+        if time.monotonic() + delay >= self.expires_at:
+            # Waiting would blow the deadline; give up now rather than later
+            raise LLMDeadlineExceededError(self.policy.deadline, error) from error
+        self.stats.total_backoff += delay
+        logger.warning(f"LLM call failed ({error_class}), retrying in {delay:.2f}s: {error}")
+        return delay
+
+def call_with_retry(func: Callable[[float], T], policy: RetryPolicy, stats: Optional[RetryStats] = None,
+                    started_at: Optional[float] = None) -> T:
+    """
+    Call `func(timeout)` with retries until it succeeds or the deadline passes
+
+    Args:
+        func: Callable taking the per-attempt timeout in seconds
+        policy: Retry policy
+        stats: Optional stats object to record attempts into
+        started_at: time.monotonic() at which the deadline starts (defaults to now)
+    """
+    state = _RetryState(policy, stats or RetryStats(), started_at)
+    last_error = None
+    while True:
+        timeout = state.attempt_timeout(last_error)
+        try:
+            return func(timeout)
+        except Exception as e:
+            last_error = e
+            time.sleep(state.next_delay(e))
+
+async def call_with_retry_async(func: Callable[[float], Awaitable[T]], policy: RetryPolicy,
+                                stats: Optional[RetryStats] = None, started_at: Optional[float] = None,
+                                on_timeout: Optional[Callable[[float], None]] = None) -> T:
+    """Async counterpart of `call_with_retry`; each attempt is also bounded by wait_for
+
+    `on_timeout(elapsed)` is called when wait_for abandons an attempt, since the
+    attempt itself only sees a cancellation.
+    """
+    state = _RetryState(policy, stats or RetryStats(), started_at)
+    last_error = None
+    while True:
+        timeout = state.attempt_timeout(last_error)
+        attempt_started = time.monotonic()
+        try:
+            return await asyncio.wait_for(func(timeout), timeout)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and on_timeout is not None:
+                on_timeout(time.monotonic() - attempt_started)
+            last_error = e
+            await asyncio.sleep(state.next_delay(e))
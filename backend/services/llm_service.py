@@ -6,12 +6,17 @@ Handles Claude API integration with Jinja2 templating, language detection, and P
 import os
 import json
 import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, List, AsyncIterator, NamedTuple, Type
 from datetime import datetime
 import anthropic
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 import yaml
+from pydantic import BaseModel
 from jinja2 import Environment, FileSystemLoader, Template
 from .path_utils import resolve_config_dir_with_fallback
 
@@ -21,25 +26,164 @@ try:
 except ImportError:
     from backend.models.config_models import PromptConfig, LLMConfig, Language
 from .language_detection import RobustLanguageDetector, DetectionResult
+from .llm_admission import get_admission_controller, PRIORITY_ADMIN, PRIORITY_SHORT_TEXT, PRIORITY_NORMAL
+from .llm_cache import get_evaluation_cache, make_cache_key
+from .llm_retry import (
+    RetryPolicy, RetryStats, call_with_retry, call_with_retry_async, classify_error, LLMDeadlineExceededError,
+    ERROR_RATE_LIMIT, ERROR_OVERLOADED, ERROR_SERVER, ERROR_CONNECTION, ERROR_TIMEOUT
+)
+from .llm_providers import LLMProvider, ClaudeProvider, OpenAIProvider
+from .circuit_breaker import get_circuit_breaker, get_circuit_breaker_stats, CircuitOpenError
+from .incremental_json import IncrementalJSONParser
+from .text_chunking import TextChunk, split_into_chunks, merge_chunk_evaluations
+from .usage_ledger import get_usage_ledger
+from .model_router import ModelRouter, Route, REASON_PARSE_FAILURE, REASON_SCORE_INCONSISTENCY
+from .response_parser import (
+    ResponseParseError, REPAIR_INSTRUCTION, build_response_model, parse_evaluation_response
+)
+
+try:
+    from models.database import db_manager, async_db_manager
+except ImportError:
+    from backend.models.database import db_manager, async_db_manager
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+# Files whose modification invalidates a loaded service instance
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+CONFIG_FILES = ('prompt.yaml', 'llm.yaml', 'response_template.yaml')
+TEMPLATE_FILES = ('evaluation_prompt.j2',)
+# Seconds between checks of the config and template files for changes
+CONFIG_CHECK_INTERVAL = 2.0
+
+# Error classes mapped to the `fallback_conditions` names used in llm.yaml
+FALLBACK_CONDITIONS = {
+    ERROR_RATE_LIMIT: "rate_limit_exceeded",
+    ERROR_OVERLOADED: "service_unavailable",
+    ERROR_SERVER: "service_unavailable",
+    ERROR_CONNECTION: "service_unavailable",
+    ERROR_TIMEOUT: "timeout_error"
+}
+
+# Prompt sections rendered from evaluation_prompt.j2, in request order
+PROMPT_BLOCKS = ('system', 'instructions', 'memo')
+
+# Markers substituted for per-request values when precompiling prompts
+TEXT_PLACEHOLDER = "\x00memo-text\x00"
+NOTE_PLACEHOLDER = "\x00chunk-note\x00"
+
+class PromptArtifact(NamedTuple):
+    """Rendered static prompt parts for one language (immutable)"""
+    system: str
+    instructions: str
+    memo_prefix: str
+    memo_suffix: str
+    chunk_prefix: str
+    chunk_middle: str
+    chunk_suffix: str
+    chunk_text: str
+
+    def render(self, text_content: str, part: Optional[Tuple[int, int]] = None) -> Dict[str, str]:
+        """
+        Build the prompt blocks for a text
+        
+        Args:
+            text_content: Text to evaluate
+            part: Optional (part number, total parts) when evaluating one chunk of a long text
+        """
+        if part and self.chunk_text:
+            chunk_note = self.chunk_text.format(part=part[0], total=part[1])
+            memo = "".join((self.chunk_prefix, chunk_note, self.chunk_middle, text_content, self.chunk_suffix))
+        else:
+            memo = "".join((self.memo_prefix, text_content, self.memo_suffix))
+        return {"system": self.system, "instructions": self.instructions, "memo": memo}
+
+    def fingerprint(self) -> str:
+        """Content hash identifying this template in the prompt_templates table"""
+        return hashlib.sha256(json.dumps(self._asdict(), sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def join_prompt_blocks(prompt_blocks: Dict[str, str]) -> str:
+    """Full prompt text of a set of prompt blocks"""
+    return "\n\n".join(prompt_blocks[name] for name in PROMPT_BLOCKS if prompt_blocks.get(name))
+
+def rebuild_prompt(artifact: PromptArtifact, text_content: str, part_spans: Optional[List[List[int]]] = None) -> str:
+    """
+    Rebuild the full prompt of an evaluation from its template and the memo
+    
+    Args:
+        artifact: Prompt template the evaluation was rendered with
+        text_content: Submitted memo text
+        part_spans: [start, end] offsets of each chunk when the memo was evaluated in chunks
+    """
+    if part_spans:
+        return "\n\n".join(
+            join_prompt_blocks(artifact.render(text_content[start:end], (index + 1, len(part_spans))))
+            for index, (start, end) in enumerate(part_spans)
+        )
+    return join_prompt_blocks(artifact.render(text_content))
+
+class PreparedEvaluation:
+    """Per-request evaluation state produced before the provider call"""
+    
+    def __init__(self, detection_result: DetectionResult, language: Language, prompt_blocks: Dict[str, str]):
+        self.detection_result = detection_result
+        self.language = language
+        self.prompt_blocks = prompt_blocks
+        # Full prompt text, as stored for debugging
+        self.prompt = join_prompt_blocks(prompt_blocks)
+        self.cache_key: Optional[str] = None
+        self.cached: Optional[Dict[str, Any]] = None
+        self.retry_stats = RetryStats()
+        self.provider_name: Optional[str] = None
+        self.model: Optional[str] = None
+        self.fallback_reason: Optional[str] = None
+        self.usage: Dict[str, int] = {}
+        self.cost_usd = 0.0
+        self.route: Optional[Route] = None
+        # Chunked evaluations of long texts: one prepared evaluation per chunk
+        self.parts: List['PreparedEvaluation'] = []
+        self.part_lengths: List[int] = []
+        self.part_spans: List[List[int]] = []
+
 class EnhancedLLMService:
-    """Enhanced LLM service with Jinja2 templating, language detection, and Pydantic validation"""
+    """Enhanced LLM service with Jinja2 templating, language detection, and Pydantic validation
+
+    Instances are treated as immutable once constructed. Use `get_llm_service()`
+    to obtain the shared process-wide instance; configuration changes produce a
+    new instance instead of mutating the one in use by in-flight requests.
+    """
     
-    def __init__(self, config_path: str = None):
-        """Initialize enhanced LLM service with automatic path detection"""
+    def __init__(self, config_path: str = None, client: Optional[Anthropic] = None,
+                 async_client: Optional[AsyncAnthropic] = None, client_settings: Optional[Tuple] = None):
+        """Initialize enhanced LLM service with automatic path detection
+
+        Args:
+            config_path: Optional path to config directory
+            client: Optional existing Claude client to reuse (keeps its connection pool)
+            async_client: Optional existing async Claude client to reuse
+            client_settings: The `client_settings` the given clients were built with;
+                if the API key or base URL has changed since, new clients are built
+        """
         if config_path is None:
             config_path = resolve_config_dir_with_fallback()
         
         self.config_path = config_path
-        self.client = None
+        self.client = client
+        self.async_client = async_client
+        self.client_settings = client_settings
         self.prompt_config = None
         self.llm_config = None
         self.language_detector = None
         self.jinja_env = None
         self.response_templates = {}
+        self.template_version = None
+        self.prompt_artifacts: Dict[Language, PromptArtifact] = {}
+        self.prompt_template_hashes: Dict[Language, str] = {}
+        self.response_models: Dict[Language, Type[BaseModel]] = {}
+        self.model_router: Optional[ModelRouter] = None
+        self.retry_policy = None
+        self.fallback_provider = None
         
         # Load configurations with Pydantic validation
         self._load_configurations()
@@ -90,18 +234,116 @@ class EnhancedLLMService:
             logger.info("Language detector initialized successfully")
             
             # Initialize Jinja2 environment with a stable path
-            base_dir = os.path.dirname(os.path.dirname(__file__))  # backend/
-            templates_dir = os.path.join(base_dir, 'templates')
-            self.jinja_env = Environment(loader=FileSystemLoader(templates_dir))
+            self.jinja_env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
             logger.info("Jinja2 environment initialized successfully")
             
-            # Initialize Claude client
-            self._initialize_client()
+            # Retry, timeout and deadline settings for provider calls
+            self.retry_policy = RetryPolicy.from_config(self.llm_config)
+            
+            # Fingerprint of everything that shapes the prompt (part of cache keys)
+            self.template_version = self._compute_template_version()
+            
+            # Static prompt parts per language; a change to prompt.yaml or the
+            # template builds a new service instance and so recompiles them
+            self.prompt_artifacts = {
+                language: self._compile_prompt_artifact(language) for language in self.prompt_config.languages
+            }
+            logger.info(f"Prompt artifacts compiled for {len(self.prompt_artifacts)} languages (version {self.template_version})")
+            
+            # Content hash of each artifact; evaluations store it instead of the rendered prompt
+            self.prompt_template_hashes = {
+                language: artifact.fingerprint() for language, artifact in self.prompt_artifacts.items()
+            }
+            
+            # Response models generated from each language's rubric
+            self.response_models = {
+                language: build_response_model(config.rubric)
+                for language, config in self.prompt_config.languages.items()
+            }
+            
+            # Model tiers for routing simple memos to a cheaper model
+            self.model_router = ModelRouter.from_config(
+                self.llm_config.model_routing, self.llm_config.provider.get('model', 'claude-3-haiku-20240307')
+            )
+            
+            # Initialize Claude clients unless existing ones were handed over for the same key and endpoint
+            settings = self._get_client_settings()
+            reuse = (self.client is not None or self.async_client is not None) and \
+                self.client_settings in (None, settings)
+            self.client_settings = settings
+            if not reuse:
+                self._initialize_client()
+            
+            # Fallback provider
+            self._initialize_fallback_provider()
             
         except Exception as e:
             logger.error(f"Failed to initialize components: {e}")
             raise
     
+    def apply_shared_settings(self):
+        """Apply this configuration to the process-wide components
+
+        The evaluation cache, admission controller, usage ledger and circuit
+        breakers outlive service instances; `get_llm_service` calls this only
+        once a rebuilt instance is about to be swapped in.
+        """
+        # Apply cache limits to the shared evaluation cache
+        perf_config = self.llm_config.performance_optimization
+        if self._is_caching_enabled():
+            persistent_path = None
+            if perf_config.get('persistent_cache', False):
+                cache_file = perf_config.get('persistent_cache_file', 'llm_cache.db')
+                persistent_path = os.path.join(os.path.dirname(db_manager.db_path), cache_file)
+            get_evaluation_cache().configure(
+                max_size=perf_config.get('cache_max_size', 1000),
+                ttl=perf_config.get('cache_ttl', 3600),
+                persistent_path=persistent_path
+            )
+        
+        # Apply concurrency limits to the shared admission controller (waiters are woken on the event loop)
+        get_admission_controller().configure(
+            max_concurrent=perf_config.get('max_concurrent_requests', 5),
+            queue_size=perf_config.get('request_queue_size', 10),
+            priority_enabled=perf_config.get('request_priority_queue', True)
+        )
+        
+        # Pricing and spending limits for the usage ledger
+        cost_config = self.llm_config.cost_management
+        get_usage_ledger().configure(
+            pricing=cost_config.get('pricing') or {},
+            track_cost_metrics=self.llm_config.monitoring.get('track_cost_metrics', True),
+            enforce_limits=cost_config.get('track_costs', False),
+            limit_per_request=cost_config.get('cost_limit_per_request'),
+            limit_per_day=cost_config.get('cost_limit_per_day'),
+            limit_per_month=cost_config.get('cost_limit_per_month')
+        )
+        
+        # Per-provider circuit breakers
+        fallback_config = self.llm_config.fallback_configuration
+        breaker_config = fallback_config.get('circuit_breaker') or {}
+        for name in ('claude', fallback_config.get('fallback_provider')):
+            if name:
+                get_circuit_breaker(name).configure(**breaker_config)
+    
+    def _get_client_settings(self) -> Tuple:
+        """Return (API key fingerprint, base URL) that the Claude clients are built from"""
+        api_key = os.getenv('CLAUDE_API_KEY')
+        key_fingerprint = hashlib.sha256(api_key.encode('utf-8')).hexdigest() if api_key else None
+        # CLAUDE_API_BASE_URL overrides provider.api_base_url, e.g. to use a local mock server
+        base_url = os.getenv('CLAUDE_API_BASE_URL') or self.llm_config.provider.get('api_base_url') or None
+        return key_fingerprint, base_url
+    
+    def _compute_template_version(self) -> str:
+        """Hash the prompt template, prompt configuration and response templates"""
+        digest = hashlib.sha256()
+        for name in TEMPLATE_FILES:
+            with open(os.path.join(TEMPLATES_DIR, name), 'rb') as f:
+                digest.update(f.read())
+        digest.update(json.dumps(self.prompt_config.model_dump(mode='json'), sort_keys=True).encode('utf-8'))
+        digest.update(json.dumps(self.response_templates, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
     def _initialize_client(self):
         """Initialize Claude API client"""
         try:
@@ -110,15 +352,67 @@ class EnhancedLLMService:
             if not api_key:
                 logger.warning("CLAUDE_API_KEY not set - using mock mode")
                 self.client = None
+                self.async_client = None
                 return
             
-            self.client = Anthropic(api_key=api_key)
-            logger.info("Claude API client initialized successfully")
+            # CLAUDE_API_BASE_URL overrides provider.api_base_url, e.g. to use a local mock server
+            base_url = os.getenv('CLAUDE_API_BASE_URL') or self.llm_config.provider.get('api_base_url') or None
+            
+            # Retries are handled by the service's own retry engine
+            self.client = Anthropic(api_key=api_key, base_url=base_url, max_retries=0)
+            self.async_client = AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0)
+            logger.info(f"Claude API client initialized successfully ({base_url or 'default endpoint'})")
             
         except Exception as e:
             logger.error(f"Failed to initialize Claude API client: {e}")
             raise
     
+    def _initialize_fallback_provider(self):
+        """Configure the fallback provider from fallback_configuration"""
+        fallback_config = self.llm_config.fallback_configuration
+        if not fallback_config.get('enable_fallback', False):
+            return
+        provider_name = fallback_config.get('fallback_provider')
+        if provider_name != OpenAIProvider.name:
+            logger.warning(f"Unsupported fallback provider '{provider_name}' - fallback disabled")
+            return
+        api_key = os.getenv('FALLBACK_API_KEY')
+        if not api_key:
+            logger.warning("FALLBACK_API_KEY not set - fallback provider disabled")
+            return
+        
+        model_settings = self.llm_config.model_specific_settings.get(provider_name) or {}
+        self.fallback_provider = OpenAIProvider(
+            api_key=api_key,
+            model=fallback_config.get('fallback_model', 'gpt-3.5-turbo'),
+            api_base_url=fallback_config.get('fallback_api_base_url', 'https://api.openai.com/v1'),
+            max_output_tokens=model_settings.get('max_output_tokens')
+        )
+        logger.info(f"Fallback provider initialized: {provider_name}/{self.fallback_provider.model}")
+    
+    def _get_providers(self) -> List[LLMProvider]:
+        """Return providers in routing order (primary first)"""
+        providers = [ClaudeProvider(
+            self.client,
+            self.async_client,
+            self.llm_config.provider.get('model', 'claude-3-haiku-20240307')
+        )]
+        if self.fallback_provider is not None:
+            providers.append(self.fallback_provider)
+        return providers
+    
+    def _get_fallback_condition(self, error: Exception) -> Optional[str]:
+        """Return the fallback condition an error matches, or None if it should not fail over"""
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if getattr(error, 'status_code', None) in (401, 403):
+            condition = "authentication_error"
+        else:
+            condition = FALLBACK_CONDITIONS.get(classify_error(error))
+        if condition in (self.llm_config.fallback_configuration.get('fallback_conditions') or []):
+            return condition
+        return None
+    
     def _get_rubric_content(self, language: Language) -> str:
         """Generate rubric content for prompts using new structure.
 
@@ -150,8 +444,16 @@ class EnhancedLLMService:
             logger.error(f"Error generating rubric content: {e}")
             raise
     
-    def _generate_prompt(self, text_content: str, language: Language) -> str:
-        """Generate prompt using Jinja2 template with new structure"""
+    def _compile_prompt_artifact(self, language: Language) -> 'PromptArtifact':
+        """Render the static parts of the evaluation prompt for a language
+        
+        The template defines a `system` block (context), an `instructions`
+        block (request, rubric and response format) and a `memo` block. The
+        first two are identical for every evaluation in a language, so they are
+        sent first and marked for provider prompt caching. The memo block is
+        rendered around placeholders and split, so that building a prompt only
+        joins strings around the memo text.
+        """
         try:
             # Get language-specific configuration
             lang_config = self.prompt_config.languages[language]
@@ -160,21 +462,48 @@ class EnhancedLLMService:
             template_vars = {
                 'context': lang_config.context.context_text,
                 'request': lang_config.request.request_text,
-                'text_content': text_content,
+                'chunk_note': None,
+                'text_content': TEXT_PLACEHOLDER,
                 'rubric_content': self._get_rubric_content(language),
                 'response_template': self._get_response_template(language)
             }
             
-            # Render template
+            # Render each template block
             template = self.jinja_env.get_template('evaluation_prompt.j2')
-            prompt = template.render(**template_vars)
             
-            logger.info(f"Prompt generated successfully for language: {language}")
-            return prompt
+            def render(name: str, **overrides) -> str:
+                return "".join(template.blocks[name](template.new_context({**template_vars, **overrides})))
+            
+            memo_prefix, memo_suffix = render('memo').split(TEXT_PLACEHOLDER)
+            chunk_head, chunk_rest = render('memo', chunk_note=NOTE_PLACEHOLDER).split(NOTE_PLACEHOLDER)
+            chunk_middle, chunk_suffix = chunk_rest.split(TEXT_PLACEHOLDER)
+            
+            return PromptArtifact(
+                system=render('system').strip(),
+                instructions=render('instructions').strip(),
+                memo_prefix=memo_prefix.lstrip(),
+                memo_suffix=memo_suffix.rstrip(),
+                chunk_prefix=chunk_head.lstrip(),
+                chunk_middle=chunk_middle,
+                chunk_suffix=chunk_suffix.rstrip(),
+                chunk_text=(lang_config.request.chunk_text or "").strip()
+            )
             
         except Exception as e:
-            logger.error(f"Error generating prompt: {e}")
+            logger.error(f"Error compiling prompt for language {language}: {e}")
             raise
+    
+    def _generate_prompt(self, text_content: str, language: Language,
+                         part: Optional[Tuple[int, int]] = None) -> Dict[str, str]:
+        """
+        Build the prompt blocks for a text from the precompiled artifact
+        
+        Args:
+            text_content: Text to evaluate
+            language: Prompt language
+            part: Optional (part number, total parts) when evaluating one chunk of a long text
+        """
+        return self.prompt_artifacts[language].render(text_content, part)
 
     def _get_response_template(self, language: Language) -> str:
         """Return the response JSON example/template for the given language.
@@ -193,6 +522,323 @@ class EnhancedLLMService:
             logger.error(f"Failed to obtain response template: {e}")
             return "{}"
     
+    def prepare_evaluation(self, text_content: str) -> 'PreparedEvaluation':
+        """Detect language, render the prompt and look up the result cache (blocking)"""
+        # Detect language
+        detection_result = self.language_detector.detect_language(text_content)
+        detected_language = detection_result.language
+        
+        # Use detected language or fallback to default
+        if detected_language == Language.UNKNOWN:
+            detected_language = Language(self.prompt_config.default_language)
+            logger.warning(f"Language detection failed, using default: {detected_language}")
+        
+        chunks = self._split_text(text_content)
+        if len(chunks) > 1:
+            # Long text: one prompt per chunk; the merged result is cached under the whole text
+            parts = [
+                PreparedEvaluation(
+                    detection_result, detected_language,
+                    self._generate_prompt(chunk.text, detected_language, (index + 1, len(chunks)))
+                )
+                for index, chunk in enumerate(chunks)
+            ]
+            prepared = PreparedEvaluation(detection_result, detected_language, {})
+            prepared.prompt = "\n\n".join(part.prompt for part in parts)
+            prepared.parts = parts
+            prepared.part_lengths = [len(chunk) for chunk in chunks]
+            prepared.part_spans = [[chunk.start, chunk.end] for chunk in chunks]
+            # Chunks are routed as the whole text is; each can escalate on its own
+            for part in parts:
+                part.route = self.model_router.route(text_content)
+        else:
+            # Generate language-appropriate prompt
+            prompt_blocks = self._generate_prompt(text_content, detected_language)
+            prepared = PreparedEvaluation(detection_result, detected_language, prompt_blocks)
+        prepared.route = self.model_router.route(text_content)
+        
+        # Only real primary provider responses are cached
+        if self.client and self._is_caching_enabled():
+            prepared.cache_key = make_cache_key(
+                text_content,
+                detected_language.value,
+                self.template_version,
+                prepared.route.model,
+                self.llm_config.api_configuration.get('temperature', 0.1)
+            )
+            prepared.cached = get_evaluation_cache().get(prepared.cache_key)
+        
+        return prepared
+    
+    def _split_text(self, text_content: str) -> List[TextChunk]:
+        """Split a text longer than the chunking threshold into chunks (empty list if not chunked)"""
+        settings = self.llm_config.request_settings
+        if not settings.get('chunking_enabled', False) or len(text_content) <= settings.get('chunking_threshold', 10000):
+            return []
+        return split_into_chunks(
+            text_content,
+            chunk_size=settings.get('chunk_size', 2000),
+            overlap_size=settings.get('overlap_size', 200),
+            max_chunks=settings.get('max_chunks', 8)
+        )
+    
+    def _cache_result(self, prepared: 'PreparedEvaluation', parsed_response: Dict[str, Any], response: str) -> None:
+        """Store a validated provider response in the result cache"""
+        if prepared.cache_key and prepared.fallback_reason is None:
+            get_evaluation_cache().set(prepared.cache_key, {"parsed": parsed_response, "response": response})
+    
+    def _can_request_repair(self, prepared: 'PreparedEvaluation') -> bool:
+        """Whether an invalid provider response may be sent back to the provider for correction"""
+        return prepared.provider_name is not None and self.llm_config.response_handling.get('retry_on_failure', True)
+    
+    def build_repair_params(self, prepared: 'PreparedEvaluation', response: str,
+                            error: ResponseParseError) -> Dict[str, Any]:
+        """Messages API parameters asking the model to correct its previous reply
+        
+        The original conversation is repeated unchanged, so its cached prefix is
+        reused, followed by the invalid reply and the validation errors.
+        """
+        params = self.build_request_params(prepared)
+        params["messages"] = params["messages"] + [
+            {"role": "assistant", "content": response.strip() or "{}"},
+            {"role": "user", "content": REPAIR_INSTRUCTION.format(
+                errors="\n".join(f"- {message}" for message in error.errors)
+            )}
+        ]
+        return params
+    
+    def _escalate(self, prepared: 'PreparedEvaluation', reason: str, detail: str) -> bool:
+        """Move an evaluation answered by the primary provider to the next model tier, if any"""
+        if prepared.route is None or prepared.provider_name is None or prepared.fallback_reason is not None:
+            return False
+        if reason == REASON_PARSE_FAILURE and not self.model_router.escalate_on_parse_failure:
+            return False
+        return self.model_router.escalate(prepared.route, reason, detail)
+    
+    def _score_inconsistency(self, prepared: 'PreparedEvaluation', parsed: Dict[str, Any]) -> Optional[str]:
+        criteria = self.prompt_config.languages[prepared.language].rubric.criteria
+        return self.model_router.score_inconsistency(parsed, {key: criterion.weight for key, criterion in criteria.items()})
+    
+    def _parse_with_repair(self, prepared: 'PreparedEvaluation', response: str,
+                           started_at: Optional[float] = None) -> Tuple[Dict[str, Any], str]:
+        """Validate a provider response, escalating to a stronger model or asking for a correction
+        
+        A response that fails validation after local repair is re-requested from
+        the next model tier if routing allows, otherwise sent back once for
+        correction. A valid response whose overall score disagrees with its
+        rubric scores is also re-requested from the next tier.
+        
+        Returns:
+            Tuple of (validated evaluation, response text it was parsed from)
+        """
+        try:
+            parsed = self._parse_llm_response(response, prepared.language)
+        except ResponseParseError as e:
+            if self._escalate(prepared, REASON_PARSE_FAILURE, str(e)):
+                return self._parse_with_repair(prepared, self._call_llm(prepared, started_at), started_at)
+            if not self._can_request_repair(prepared):
+                raise
+            logger.warning(f"LLM response invalid after local repair, requesting a correction: {e}")
+            response = self._call_llm(prepared, started_at, self.build_repair_params(prepared, response, e))
+            parsed = self._parse_llm_response(response, prepared.language)
+        
+        inconsistency = self._score_inconsistency(prepared, parsed)
+        if inconsistency and self._escalate(prepared, REASON_SCORE_INCONSISTENCY, inconsistency):
+            return self._parse_with_repair(prepared, self._call_llm(prepared, started_at), started_at)
+        return parsed, response
+    
+    async def _parse_with_repair_async(self, prepared: 'PreparedEvaluation', response: str,
+                                       started_at: Optional[float] = None) -> Tuple[Dict[str, Any], str]:
+        """Async counterpart of `_parse_with_repair`
+        
+        Follow-up calls complete an evaluation already in progress, so they are
+        admitted with the highest priority.
+        """
+        try:
+            parsed = await asyncio.to_thread(self._parse_llm_response, response, prepared.language)
+        except ResponseParseError as e:
+            if self._escalate(prepared, REASON_PARSE_FAILURE, str(e)):
+                async with get_admission_controller().slot(PRIORITY_ADMIN):
+                    response = await self._call_llm_async(prepared, started_at)
+                return await self._parse_with_repair_async(prepared, response, started_at)
+            if not self._can_request_repair(prepared):
+                raise
+            logger.warning(f"LLM response invalid after local repair, requesting a correction: {e}")
+            async with get_admission_controller().slot(PRIORITY_ADMIN):
+                response = await self._call_llm_async(
+                    prepared, started_at, self.build_repair_params(prepared, response, e)
+                )
+            parsed = await asyncio.to_thread(self._parse_llm_response, response, prepared.language)
+        
+        inconsistency = self._score_inconsistency(prepared, parsed)
+        if inconsistency and self._escalate(prepared, REASON_SCORE_INCONSISTENCY, inconsistency):
+            async with get_admission_controller().slot(PRIORITY_ADMIN):
+                response = await self._call_llm_async(prepared, started_at)
+            return await self._parse_with_repair_async(prepared, response, started_at)
+        return parsed, response
+    
+    def _merge_parts(self, prepared: 'PreparedEvaluation', evaluations: List[Dict[str, Any]],
+                     responses: List[str]) -> Tuple[Dict[str, Any], str]:
+        """Merge the validated per-chunk evaluations and cache the merged result
+        
+        Returns:
+            Tuple of (merged evaluation, raw responses joined for debug storage)
+        """
+        rubric = self.prompt_config.languages[prepared.language].rubric
+        merged = merge_chunk_evaluations(
+            evaluations,
+            prepared.part_lengths,
+            {key: criterion.weight for key, criterion in rubric.criteria.items()},
+            rubric.scores.min,
+            rubric.scores.max
+        )
+        # Provider details and call stats of the parts are reported on the whole evaluation
+        for part in prepared.parts:
+            prepared.retry_stats.attempts += part.retry_stats.attempts
+            prepared.retry_stats.errors.extend(part.retry_stats.errors)
+            prepared.retry_stats.total_backoff += part.retry_stats.total_backoff
+            for field, count in part.usage.items():
+                prepared.usage[field] = prepared.usage.get(field, 0) + count
+            prepared.cost_usd += part.cost_usd
+            prepared.fallback_reason = prepared.fallback_reason or part.fallback_reason
+            prepared.route.escalations.extend(part.route.escalations)
+            if part.route.tier > prepared.route.tier:
+                prepared.route.tier, prepared.route.model = part.route.tier, part.route.model
+        prepared.provider_name = prepared.parts[0].provider_name
+        prepared.model = prepared.parts[0].model
+        
+        response = "\n\n".join(responses)
+        self._cache_result(prepared, merged, response)
+        return merged, response
+    
+    def _evaluate_parts(self, prepared: 'PreparedEvaluation', started_at: float) -> Tuple[Dict[str, Any], str]:
+        """Evaluate the chunks of a long text concurrently (blocking) and merge the results"""
+        if not self.client:
+            results = [
+                self._parse_with_repair(part, self._generate_mock_response(prepared.language))
+                for part in prepared.parts
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=len(prepared.parts)) as executor:
+                results = list(executor.map(
+                    lambda part: self._parse_with_repair(part, self._call_llm(part, started_at), started_at),
+                    prepared.parts
+                ))
+        return self._merge_parts(prepared, [parsed for parsed, _ in results], [response for _, response in results])
+    
+    async def _evaluate_parts_async(self, prepared: 'PreparedEvaluation', priority: int,
+                                    started_at: float) -> Tuple[Dict[str, Any], str]:
+        """Evaluate the chunks of a long text concurrently and merge the results
+        
+        Each chunk takes its own admission slot, so a long text is bounded by
+        its slowest chunk rather than its total length.
+        """
+        async def call(part: 'PreparedEvaluation') -> Tuple[Dict[str, Any], str]:
+            if not self.async_client:
+                response = self._generate_mock_response(prepared.language)
+            else:
+                async with get_admission_controller().slot(priority):
+                    response = await self._call_llm_async(part, started_at)
+            return await self._parse_with_repair_async(part, response, started_at)
+        
+        tasks = [asyncio.ensure_future(call(part)) for part in prepared.parts]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return await asyncio.to_thread(
+            self._merge_parts, prepared, [parsed for parsed, _ in results], [response for _, response in results]
+        )
+    
+    def _is_caching_enabled(self) -> bool:
+        """Check whether evaluation result caching is enabled"""
+        return bool(self.llm_config.performance_optimization.get('enable_response_caching', False))
+    
+    def _build_evaluation_result(self, parsed_response: Dict[str, Any], prepared: 'PreparedEvaluation',
+                                 response: str, start_time: float) -> Dict[str, Any]:
+        """Attach evaluation metadata to a parsed LLM response"""
+        processing_time = time.time() - start_time
+        
+        result = {
+            **parsed_response,
+            "metadata": {
+                "language_detection": self._get_language_metadata(prepared),
+                "processing_time": processing_time,
+                "prompt_length": len(prepared.prompt),
+                "response_length": len(response) if response else 0,
+                "chunk_count": len(prepared.parts) or 1,
+                "token_usage": dict(prepared.usage),
+                "cost_usd": round(prepared.cost_usd, 6),
+                "routing": prepared.route.to_dict() if prepared.route and self.model_router.enabled else None,
+                "llm_provider": prepared.provider_name or self.llm_config.provider.get('name', 'claude'),
+                "llm_model": prepared.model or self.llm_config.provider.get('model', 'claude-3-haiku-20240307'),
+                "fallback_reason": prepared.fallback_reason,
+                "cache_hit": prepared.cached is not None,
+                "llm_call": prepared.retry_stats.to_dict(),
+                "prompt_template": self.prompt_template_hashes.get(prepared.language),
+                "prompt_parts": prepared.part_spans or None,
+                "raw_prompt": prepared.prompt,
+                "raw_response": response if response else ""
+            }
+        }
+        
+        logger.info(f"Evaluation completed successfully in {processing_time:.2f}s (cache hit: {prepared.cached is not None})")
+        if prepared.usage:
+            logger.info(
+                f"Token usage: {prepared.usage.get('input_tokens', 0)} fresh input, "
+                f"{prepared.usage.get('cache_read_input_tokens', 0)} cache read, "
+                f"{prepared.usage.get('cache_creation_input_tokens', 0)} cache write, "
+                f"{prepared.usage.get('output_tokens', 0)} output"
+            )
+        return result
+    
+    def debug_record(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Raw prompt and response fields of an evaluation record, as configured in `debug_settings`
+        
+        The prompt is stored as a reference to its deduplicated template plus
+        the chunk offsets of the memo, from which `rebuild_prompt` restores it
+        exactly. Prompts from a template this instance did not compile (the
+        configuration changed mid-evaluation) are kept as text.
+        
+        Args:
+            metadata: Metadata of an evaluation result
+        """
+        settings = self.llm_config.debug_settings
+        record = {
+            "raw_prompt": None,
+            "prompt_template": None,
+            "prompt_parts": None,
+            "raw_response": (metadata.get('raw_response') or None) if settings.get('store_raw_responses', True) else None
+        }
+        if settings.get('store_raw_prompts', True):
+            template_hash = metadata.get('prompt_template')
+            language = next(
+                (language for language, value in self.prompt_template_hashes.items() if value == template_hash), None
+            )
+            if language is not None:
+                record["prompt_template"] = {
+                    "template_hash": template_hash,
+                    "language": language.value,
+                    "template_version": self.template_version,
+                    "content": json.dumps(self.prompt_artifacts[language]._asdict())
+                }
+                record["prompt_parts"] = metadata.get('prompt_parts')
+            else:
+                record["raw_prompt"] = metadata.get('raw_prompt') or None
+        record["debug_enabled"] = any(record[field] for field in ('raw_prompt', 'prompt_template', 'raw_response'))
+        return record
+    
+    def _get_language_metadata(self, prepared: 'PreparedEvaluation') -> Dict[str, Any]:
+        """Describe the language detection outcome for a prepared evaluation"""
+        return {
+            "detected_language": prepared.language.value,
+            "confidence": prepared.detection_result.confidence,
+            "method": prepared.detection_result.method.value
+        }
+    
     def evaluate_text_with_llm(self, text_content: str) -> Dict[str, Any]:
         """
         Evaluate text using LLM with language detection and enhanced prompt generation
@@ -204,86 +850,302 @@ class EnhancedLLMService:
             Dictionary containing evaluation results and metadata
         """
         start_time = time.time()
+        deadline_start = time.monotonic()
         
         try:
-            # Detect language
-            detection_result = self.language_detector.detect_language(text_content)
-            detected_language = detection_result.language
+            prepared = self.prepare_evaluation(text_content)
             
-            # Use detected language or fallback to default
-            if detected_language == Language.UNKNOWN:
-                detected_language = Language(self.prompt_config.default_language)
-                logger.warning(f"Language detection failed, using default: {detected_language}")
+            if prepared.cached is not None:
+                return self._build_evaluation_result(
+                    prepared.cached["parsed"], prepared, prepared.cached["response"], start_time
+                )
             
-            # Generate language-appropriate prompt
-            prompt = self._generate_prompt(text_content, detected_language)
+            if self.client:
+                get_usage_ledger().check_limits()
+            
+            if prepared.parts:
+                parsed_response, response = self._evaluate_parts(prepared, deadline_start)
+                return self._build_evaluation_result(parsed_response, prepared, response, start_time)
             
             # Get LLM response
             if self.client:
                 # Real API call
-                response = self._call_claude_api(prompt)
+                response = self._call_llm(prepared, deadline_start)
             else:
                 # Mock response for development
-                response = self._generate_mock_response(detected_language)
+                response = self._generate_mock_response(prepared.language)
             
             # Parse and validate response
-            parsed_response = self._parse_llm_response(response, detected_language)
+            parsed_response, response = self._parse_with_repair(prepared, response, deadline_start)
+            self._cache_result(prepared, parsed_response, response)
             
-            # Calculate processing time
-            processing_time = time.time() - start_time
-            
-            # Add metadata
-            result = {
-                **parsed_response,
-                "metadata": {
-                    "language_detection": {
-                        "detected_language": detected_language.value,
-                        "confidence": detection_result.confidence,
-                        "method": detection_result.method.value
-                    },
-                    "processing_time": processing_time,
-                    "prompt_length": len(prompt),
-                    "response_length": len(response) if response else 0,
-                    "llm_model": self.llm_config.provider.get('model', 'claude-3-haiku-20240307') if self.llm_config else 'unknown',
-                    "raw_prompt": prompt,
-                    "raw_response": response if response else ""
-                }
-            }
-            
-            logger.info(f"Evaluation completed successfully in {processing_time:.2f}s")
-            return result
+            return self._build_evaluation_result(parsed_response, prepared, response, start_time)
             
         except Exception as e:
             processing_time = time.time() - start_time
             logger.error(f"Evaluation failed after {processing_time:.2f}s: {e}")
             raise
     
-    def _call_claude_api(self, prompt: str) -> str:
-        """Call Claude API with the generated prompt"""
-        try:
-            # Get model from configuration
-            model = self.llm_config.provider.get('model', 'claude-3-haiku-20240307')
-            max_tokens = self.llm_config.api_configuration.get('max_tokens', 4000)
-            temperature = self.llm_config.api_configuration.get('temperature', 0.1)
-            
-            response = self.client.messages.create(
-                model=model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+    def get_request_priority(self, text_content: str, is_admin: bool = False) -> int:
+        """Return the admission priority for a request (admins, then short texts)"""
+        if is_admin:
+            return PRIORITY_ADMIN
+        short_text_length = self.llm_config.performance_optimization.get('priority_short_text_length', 1500)
+        if len(text_content) <= short_text_length:
+            return PRIORITY_SHORT_TEXT
+        return PRIORITY_NORMAL
+    
+    async def evaluate_text_with_llm_async(self, text_content: str, priority: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Evaluate text without blocking the event loop
+        
+        Language detection, prompt rendering and response parsing run in a
+        worker thread; the provider call uses the async Claude client, so many
+        evaluations can be in flight on a single worker process. Provider calls
+        pass through the shared admission controller, which raises
+        `LLMQueueFullError` when its wait queue is full.
+        
+        Args:
+            text_content: Text to evaluate
+            priority: Admission priority (defaults to `get_request_priority`)
             
-            return response.content[0].text
+        Returns:
+            Dictionary containing evaluation results and metadata
+        """
+        start_time = time.time()
+        deadline_start = time.monotonic()
+        
+        try:
+            prepared = await asyncio.to_thread(self.prepare_evaluation, text_content)
+            if priority is None:
+                priority = self.get_request_priority(text_content)
+            return await self.evaluate_prepared_async(prepared, priority, start_time, deadline_start)
             
         except Exception as e:
-            logger.error(f"Claude API call failed: {e}")
+            processing_time = time.time() - start_time
+            logger.error(f"Evaluation failed after {processing_time:.2f}s: {e}")
             raise
     
+    async def evaluate_prepared_async(self, prepared: 'PreparedEvaluation', priority: int = PRIORITY_NORMAL,
+                                      start_time: Optional[float] = None,
+                                      deadline_start: Optional[float] = None) -> Dict[str, Any]:
+        """Run the provider call and parsing for an evaluation from `prepare_evaluation`"""
+        start_time = start_time if start_time is not None else time.time()
+        deadline_start = deadline_start if deadline_start is not None else time.monotonic()
+        
+        if prepared.cached is not None:
+            return self._build_evaluation_result(
+                prepared.cached["parsed"], prepared, prepared.cached["response"], start_time
+            )
+        
+        if self.async_client:
+            # The limit check reads the usage rollups, so it runs on a database thread
+            await async_db_manager.run(get_usage_ledger().check_limits)
+        
+        if prepared.parts:
+            parsed_response, response = await self._evaluate_parts_async(prepared, priority, deadline_start)
+            return self._build_evaluation_result(parsed_response, prepared, response, start_time)
+        
+        # Get LLM response
+        if self.async_client:
+            async with get_admission_controller().slot(priority):
+                response = await self._call_llm_async(prepared, deadline_start)
+        else:
+            response = self._generate_mock_response(prepared.language)
+        
+        return await self.finish_evaluation_async(prepared, response, start_time, deadline_start)
+    
+    async def finish_evaluation_async(self, prepared: 'PreparedEvaluation', response: str, start_time: float,
+                                      deadline_start: Optional[float] = None) -> Dict[str, Any]:
+        """Parse, validate and cache a provider response, then attach metadata"""
+        parsed_response, response = await self._parse_with_repair_async(prepared, response, deadline_start)
+        await asyncio.to_thread(self._cache_result, prepared, parsed_response, response)
+        return self._build_evaluation_result(parsed_response, prepared, response, start_time)
+    
+    async def evaluate_text_with_llm_stream(self, text_content: str,
+                                           priority: Optional[int] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Evaluate text, yielding results as the model generates them
+        
+        Yields ("language", detection) once a provider slot is held (so
+        admission errors surface before the first event), then one
+        (field, value) pair per top-level response field as soon as it can be
+        parsed from the partial output, and finally ("complete", result) with
+        the validated result and metadata, as returned by
+        `evaluate_text_with_llm_async`.
+        
+        Args:
+            text_content: Text to evaluate
+            priority: Admission priority (defaults to `get_request_priority`)
+        """
+        start_time = time.time()
+        deadline_start = time.monotonic()
+        
+        prepared = await asyncio.to_thread(self.prepare_evaluation, text_content)
+        
+        if prepared.cached is not None:
+            yield "language", self._get_language_metadata(prepared)
+            for key, value in prepared.cached["parsed"].items():
+                yield key, value
+            yield "complete", self._build_evaluation_result(
+                prepared.cached["parsed"], prepared, prepared.cached["response"], start_time
+            )
+            return
+        
+        if priority is None:
+            priority = self.get_request_priority(text_content)
+        
+        if prepared.parts:
+            # Chunked texts are merged before any field is final, so fields follow the merge
+            result = await self.evaluate_prepared_async(prepared, priority, start_time, deadline_start)
+            yield "language", self._get_language_metadata(prepared)
+            for key, value in result.items():
+                if key != 'metadata':
+                    yield key, value
+            yield "complete", result
+            return
+        
+        parser = IncrementalJSONParser()
+        if self.async_client:
+            await async_db_manager.run(get_usage_ledger().check_limits)
+            async with get_admission_controller().slot(priority):
+                yield "language", self._get_language_metadata(prepared)
+                chunks = []
+                async for chunk in self._stream_llm(prepared, deadline_start):
+                    chunks.append(chunk)
+                    for key, value in parser.feed(chunk):
+                        yield key, value
+                response = "".join(chunks)
+        else:
+            yield "language", self._get_language_metadata(prepared)
+            response = self._generate_mock_response(prepared.language)
+            for key, value in parser.feed(response):
+                yield key, value
+        
+        # Validate the complete response exactly as the non-streaming path does
+        yield "complete", await self.finish_evaluation_async(prepared, response, start_time, deadline_start)
+    
+    async def _stream_llm(self, prepared: 'PreparedEvaluation', started_at: float) -> AsyncIterator[str]:
+        """Stream from the primary provider; if it fails before any output, use `_call_llm_async`"""
+        params = self.build_request_params(prepared)
+        provider = self._get_providers()[0]
+        remaining = started_at + self.retry_policy.deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceededError(self.retry_policy.deadline)
+        
+        streamed = False
+        usage = {}
+        prepared.retry_stats.attempts += 1
+        try:
+            async for chunk in provider.stream_async(params, min(self.retry_policy.request_timeout, remaining), usage):
+                streamed = True
+                yield chunk
+        except Exception as e:
+            if streamed:
+                logger.error(f"LLM provider '{provider.name}' stream failed mid-response: {e}")
+                raise
+            prepared.retry_stats.errors.append(classify_error(e))
+            logger.warning(f"LLM provider '{provider.name}' stream failed, retrying without streaming: {e}")
+            yield await self._call_llm_async(prepared, started_at)
+            return
+        prepared.provider_name = provider.name
+        prepared.model = provider.model_for(params)
+        self.record_usage(prepared, prepared.model, usage)
+    
+    def record_usage(self, prepared: 'PreparedEvaluation', model: str, usage: Dict[str, int]) -> None:
+        """Add the tokens of one provider call to an evaluation and price them for its model"""
+        for field, count in usage.items():
+            prepared.usage[field] = prepared.usage.get(field, 0) + count
+        prepared.cost_usd += get_usage_ledger().cost_of(model, usage)
+    
+    def build_request_params(self, prepared: 'PreparedEvaluation') -> Dict[str, Any]:
+        """Build Messages API parameters from configuration
+        
+        The context goes in the system prompt and the static instructions in
+        the first content block, both marked as cache breakpoints when prompt
+        caching is enabled; the memo text is the last block.
+        """
+        blocks = prepared.prompt_blocks
+        cache_control = {}
+        if self.llm_config.performance_optimization.get('prompt_caching', True):
+            cache_control = {"cache_control": {"type": "ephemeral"}}
+        return {
+            "model": prepared.route.model if prepared.route else self.llm_config.provider.get('model', 'claude-3-haiku-20240307'),
+            "max_tokens": self.llm_config.api_configuration.get('max_tokens', 4000),
+            "temperature": self.llm_config.api_configuration.get('temperature', 0.1),
+            "system": [{"type": "text", "text": blocks['system'], **cache_control}],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": blocks['instructions'], **cache_control},
+                        {"type": "text", "text": blocks['memo']}
+                    ]
+                }
+            ]
+        }
+    
+    def _call_llm(self, prepared: 'PreparedEvaluation', started_at: Optional[float] = None,
+                  params: Optional[Dict[str, Any]] = None) -> str:
+        """Call the primary provider, failing over to the fallback on matching errors
+        
+        Each provider call is retried per the retry policy within the shared
+        response time deadline. While a provider's circuit is open its calls are
+        refused immediately, so requests move on to the fallback without waiting.
+        
+        Args:
+            prepared: Prepared evaluation (records provider, model and retry stats)
+            started_at: time.monotonic() at which the response time deadline starts
+            params: Request parameters (defaults to `build_request_params`)
+        """
+        params = params or self.build_request_params(prepared)
+        providers = self._get_providers()
+        for index, provider in enumerate(providers):
+            try:
+                response = call_with_retry(
+                    lambda timeout, provider=provider: provider.complete(params, timeout),
+                    self.retry_policy, prepared.retry_stats, started_at
+                )
+            except Exception as e:
+                if not self._fail_over(prepared, provider, e, index + 1 < len(providers)):
+                    raise
+                continue
+            prepared.provider_name = provider.name
+            prepared.model = response.model
+            self.record_usage(prepared, response.model, response.usage)
+            return response.text
+    
+    async def _call_llm_async(self, prepared: 'PreparedEvaluation', started_at: Optional[float] = None,
+                              params: Optional[Dict[str, Any]] = None) -> str:
+        """Async counterpart of `_call_llm`"""
+        params = params or self.build_request_params(prepared)
+        providers = self._get_providers()
+        for index, provider in enumerate(providers):
+            try:
+                response = await call_with_retry_async(
+                    lambda timeout, provider=provider: provider.complete_async(params, timeout),
+                    self.retry_policy, prepared.retry_stats, started_at, on_timeout=provider.record_timeout
+                )
+            except Exception as e:
+                if not self._fail_over(prepared, provider, e, index + 1 < len(providers)):
+                    raise
+                continue
+            prepared.provider_name = provider.name
+            prepared.model = response.model
+            self.record_usage(prepared, response.model, response.usage)
+            return response.text
+    
+    def _fail_over(self, prepared: 'PreparedEvaluation', provider: LLMProvider, error: Exception,
+                   has_next: bool) -> bool:
+        """Decide whether a failed provider call moves on to the next provider"""
+        condition = self._get_fallback_condition(error) if has_next else None
+        if condition is None:
+            logger.error(f"LLM provider '{provider.name}' call failed: {error}")
+            return False
+        logger.warning(f"LLM provider '{provider.name}' unavailable ({condition}), using fallback: {error}")
+        prepared.fallback_reason = condition
+        return True
+    
     def _generate_mock_response(self, language: Language) -> str:
         """Generate mock response for development/testing"""
         if language == Language.ES:
@@ -342,37 +1204,14 @@ class EnhancedLLMService:
             })
     
     def _parse_llm_response(self, response: str, language: Language) -> Dict[str, Any]:
-        """Parse and validate LLM response"""
+        """Parse and validate LLM response against the rubric's response model
+        
+        Raises:
+            ResponseParseError: If the response is invalid even after local repair
+        """
         try:
-            # Parse JSON response
-            parsed = json.loads(response)
-            
-            # Validate required fields
-            required_fields = ['overall_score', 'strengths', 'opportunities', 'rubric_scores', 'segment_feedback']
-            for field in required_fields:
-                if field not in parsed:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            # Validate rubric scores structure
-            expected_criteria = ['structure', 'arguments_and_evidence', 'strategic_alignment', 'implementation_and_risks']
-            for criterion in expected_criteria:
-                if criterion not in parsed['rubric_scores']:
-                    raise ValueError(f"Missing rubric criterion: {criterion}")
-                
-                score_data = parsed['rubric_scores'][criterion]
-                if 'score' not in score_data or 'justification' not in score_data:
-                    raise ValueError(f"Invalid score data for criterion: {criterion}")
-                
-                score = score_data['score']
-                if not isinstance(score, int) or score < 1 or score > 5:
-                    raise ValueError(f"Invalid score for {criterion}: {score}")
-            
-            return parsed
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing error: {e}")
-            raise ValueError(f"Invalid JSON response: {e}")
-        except Exception as e:
+            return parse_evaluation_response(response, self.response_models[language])
+        except ResponseParseError as e:
             logger.error(f"Response validation error: {e}")
             raise
     
@@ -410,6 +1249,10 @@ class EnhancedLLMService:
                     "jinja2_env": jinja_valid,
                     "claude_client": client_valid
                 },
+                "admission_control": get_admission_controller().get_stats(),
+                "response_cache": get_evaluation_cache().get_stats() if self._is_caching_enabled() else None,
+                "circuit_breakers": get_circuit_breaker_stats(),
+                "fallback_provider": self.fallback_provider.name if self.fallback_provider else None,
                 "supported_languages": [lang.value for lang in self.prompt_config.languages.keys()] if self.prompt_config else [],
                 "default_language": self.prompt_config.default_language.value if self.prompt_config else None,
                 "model": self.llm_config.provider.get('model', 'claude-3-haiku-20240307') if self.llm_config else 'unknown'
@@ -421,3 +1264,90 @@ class EnhancedLLMService:
                 "error": str(e),
                 "error_type": type(e).__name__
             }
+
+# Global LLM service instance (swapped atomically when configuration changes)
+_llm_service = None
+_llm_service_signature = None
+_llm_service_checked_at = 0.0
+_llm_service_lock = threading.Lock()
+
+def _get_config_signature(config_path: str) -> Tuple:
+    """Build a cheap change signature from config and template file stats"""
+    paths = [os.path.join(config_path, name) for name in CONFIG_FILES]
+    paths += [os.path.join(TEMPLATES_DIR, name) for name in TEMPLATE_FILES]
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def get_llm_service(config_path: str = None) -> EnhancedLLMService:
+    """
+    Get the global LLM service instance
+    
+    The instance is rebuilt when any of the prompt, LLM or response template
+    configuration files (or the prompt template) change on disk. The files are
+    checked at most once per CONFIG_CHECK_INTERVAL seconds, so most calls return
+    the current instance without touching the filesystem. The new
+    instance is built off to the side; only once it is complete are the shared
+    components reconfigured and the instance swapped in, under a lock, so
+    requests already holding the previous instance finish with a consistent
+    config. If a rebuild fails, the previous instance and settings keep serving.
+    
+    Args:
+        config_path: Optional path to config directory
+    """
+    global _llm_service, _llm_service_signature, _llm_service_checked_at
+    now = time.monotonic()
+    service = _llm_service
+    if (service is not None and config_path in (None, service.config_path)
+            and now - _llm_service_checked_at < CONFIG_CHECK_INTERVAL):
+        return service
+    
+    if config_path is None:
+        config_path = resolve_config_dir_with_fallback()
+    
+    signature = _get_config_signature(config_path)
+    if service is not None and _llm_service_signature == signature and service.config_path == config_path:
+        _llm_service_checked_at = now
+        return service
+    
+    with _llm_service_lock:
+        # Another thread may have completed the swap while we waited
+        service = _llm_service
+        if service is not None and _llm_service_signature == signature and service.config_path == config_path:
+            return service
+        
+        try:
+            new_service = EnhancedLLMService(
+                config_path,
+                client=service.client if service else None,
+                async_client=service.async_client if service else None,
+                client_settings=service.client_settings if service else None
+            )
+            new_service.apply_shared_settings()
+        except Exception as e:
+            if service is None:
+                raise
+            # Remember the failed signature so every request does not retry the rebuild
+            logger.error(f"LLM service reload failed, keeping previous configuration: {e}")
+            _llm_service_signature = signature
+            _llm_service_checked_at = now
+            return service
+        
+        _llm_service = new_service
+        _llm_service_signature = signature
+        _llm_service_checked_at = now
+        logger.info("LLM service instance (re)initialized")
+        return new_service
+
+def reset_llm_service() -> None:
+    """Drop the global LLM service instance (next access rebuilds it)"""
+    global _llm_service, _llm_service_signature, _llm_service_checked_at
+    with _llm_service_lock:
+        _llm_service = None
+        _llm_service_signature = None
+        _llm_service_checked_at = 0.0
@@ -0,0 +1,116 @@
+"""
+Model Router for Memo AI Coach
+Sends simple memos to a cheaper model and escalates to stronger models when results look unreliable
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Reasons recorded in routing metadata
+REASON_DEFAULT = "default"
+REASON_SHORT_TEXT = "short_text"
+REASON_LONG_TEXT = "long_text"
+REASON_PARSE_FAILURE = "parse_failure"
+REASON_SCORE_INCONSISTENCY = "score_inconsistency"
+
+class ModelTier:
+    """One routing tier: a model and the largest memo it is chosen for up front (None = any length)"""
+
+    def __init__(self, model: str, max_text_length: Optional[int] = None):
+        self.model = model
+        self.max_text_length = max_text_length
+
+class Route:
+    """Routing state of one evaluation: the current tier and any escalations so far"""
+
+    def __init__(self, tier: int, model: str, reason: str):
+        self.tier = tier
+        self.model = model
+        self.reason = reason
+        self.initial_model = model
+        self.escalations: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Routing decision and outcome for evaluation metadata"""
+        return {
+            "initial_model": self.initial_model,
+            "model": self.model,
+            "tier": self.tier,
+            "reason": self.reason,
+            "escalations": list(self.escalations)
+        }
+
+class ModelRouter:
+    """Tiered model routing policy
+
+    Tiers are ordered from cheapest to strongest. An evaluation starts on the
+    first tier whose `max_text_length` the memo fits (a tier without one takes
+    every memo; the last tier takes everything else) and moves up one tier when
+    its response cannot be parsed or its overall score disagrees with the
+    weighted rubric scores.
+    """
+
+    def __init__(self, tiers: List[ModelTier], escalate_on_parse_failure: bool = True,
+                 score_tolerance: Optional[float] = 0.5):
+        self.tiers = tiers
+        self.escalate_on_parse_failure = escalate_on_parse_failure
+        self.score_tolerance = score_tolerance
+
+    @classmethod
+    def from_config(cls, routing_config: Dict[str, Any], default_model: str) -> 'ModelRouter':
+        """Build the router from `model_routing` in llm.yaml (a single tier when disabled)"""
+        if not routing_config.get('enabled', False) or not routing_config.get('tiers'):
+            return cls([ModelTier(default_model)], escalate_on_parse_failure=False, score_tolerance=None)
+        tiers = [ModelTier(tier['model'], tier.get('max_text_length')) for tier in routing_config['tiers']]
+        logger.info(f"Model routing enabled: {' -> '.join(tier.model for tier in tiers)}")
+        return cls(
+            tiers,
+            escalate_on_parse_failure=routing_config.get('escalate_on_parse_failure', True),
+            score_tolerance=routing_config.get('score_tolerance', 0.5)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.tiers) > 1
+
+    def route(self, text_content: str) -> Route:
+        """Choose the starting tier for a memo"""
+        if not self.enabled:
+            return Route(0, self.tiers[0].model, REASON_DEFAULT)
+        for index, tier in enumerate(self.tiers[:-1]):
+            if tier.max_text_length is None:
+                return Route(index, tier.model, REASON_DEFAULT)
+            if len(text_content) <= tier.max_text_length:
+                return Route(index, tier.model, REASON_SHORT_TEXT)
+        return Route(len(self.tiers) - 1, self.tiers[-1].model, REASON_LONG_TEXT)
+
+    def escalate(self, route: Route, reason: str, detail: Optional[str] = None) -> bool:
+        """Move a route to the next tier; returns False if it is already on the strongest model"""
+        if route.tier + 1 >= len(self.tiers):
+            return False
+        next_model = self.tiers[route.tier + 1].model
+        route.escalations.append({"from": route.model, "to": next_model, "reason": reason, "detail": detail})
+        logger.info(f"Escalating evaluation from {route.model} to {next_model} ({reason})")
+        route.tier += 1
+        route.model = next_model
+        return True
+
+    def score_inconsistency(self, evaluation: Dict[str, Any], criterion_weights: Dict[str, int]) -> Optional[str]:
+        """Describe a disagreement between overall_score and the weighted rubric scores, if beyond tolerance"""
+        if self.score_tolerance is None:
+            return None
+        weighted = [
+            (data['score'], criterion_weights.get(criterion, 0))
+            for criterion, data in evaluation['rubric_scores'].items()
+        ]
+        weight_total = sum(weight for _, weight in weighted)
+        if not weight_total:
+            return None
+        expected = sum(score * weight for score, weight in weighted) / weight_total
+        difference = abs(evaluation['overall_score'] - expected)
+        if difference <= self.score_tolerance:
+            return None
+        return f"overall_score {evaluation['overall_score']} vs weighted rubric {expected:.2f}"
@@ -0,0 +1,148 @@
+"""
+Password Hasher for Memo AI Coach
+Runs bcrypt on a dedicated, bounded thread pool so login storms cannot starve the API
+"""
+
+import os
+import math
+import asyncio
+import time
+import bcrypt
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class PasswordHasherBusyError(Exception):
+    """Raised when every bcrypt worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool
+
+    At most `workers` hashes run at once (bcrypt releases the GIL, so threads
+    use separate cores). Up to `queue_size` further calls wait for a worker;
+    beyond that, calls are rejected immediately with `PasswordHasherBusyError`
+    so the API can answer 429 instead of queueing every request behind logins.
+    The API awaits `hash_async`/`verify_async`, so waiting logins hold no thread.
+    """
+
+    def __init__(self, workers: int = 0, queue_size: int = 32, rounds: int = 12):
+        self.workers = 0
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._avg_hash_time = 0.25  # seconds, seeded with a typical bcrypt cost
+        self.configure(workers, queue_size, rounds)
+
+    def configure(self, workers: int, queue_size: int, rounds: int = 12) -> None:
+        """Apply new limits; a changed worker count replaces the pool (0 = one per CPU)"""
+        workers = int(workers) or os.cpu_count() or 1
+        with self._lock:
+            self.queue_size = max(0, int(queue_size))
+            self.rounds = int(rounds)
+            if workers != self.workers:
+                if self._executor is not None:
+                    # Calls already submitted finish on the old pool
+                    self._executor.shutdown(wait=False)
+                self.workers = max(1, workers)
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def estimate_retry_after(self) -> int:
+        """Estimate seconds until a queue position frees up"""
+        backlog = max(0, self._pending - self.workers) + 1
+        return max(1, math.ceil(self._avg_hash_time * backlog / self.workers))
+
+    def _submit(self, func: Callable, *args) -> Future:
+        """Admit one bcrypt call onto the pool, or reject it if the pool is saturated
+
+        The check is cheap and never blocks, so async callers run it on the event loop.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self._rejected += 1
+                retry_after = self.estimate_retry_after()
+                logger.warning(f"Password hashing queue full ({self._pending} pending), rejecting; retry after {retry_after}s")
+                raise PasswordHasherBusyError(retry_after)
+            self._pending += 1
+            executor = self._executor
+        future = executor.submit(self._timed, func, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _run(self, func: Callable, *args) -> Any:
+        """Run one bcrypt call on the pool and wait for it"""
+        return self._submit(func, *args).result()
+
+    async def _run_async(self, func: Callable, *args) -> Any:
+        """Run one bcrypt call on the pool and await it without holding another thread"""
+        return await asyncio.wrap_future(self._submit(func, *args))
+
+    def _timed(self, func: Callable, *args) -> Any:
+        with self._lock:
+            self._active += 1
+        started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._avg_hash_time = 0.8 * self._avg_hash_time + 0.2 * elapsed
+
+    def hash(self, password: str) -> str:
+        """Hash a password with a fresh salt"""
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a stored hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def hash_async(self, password: str) -> str:
+        """Hash a password with a fresh salt, from the event loop"""
+        hashed = await self._run_async(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a stored hash, from the event loop"""
+        return await self._run_async(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return current pool statistics"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": max(0, self._pending - self._active),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_hash_time": round(self._avg_hash_time, 3)
+            }
+
+# Global password hasher instance (shared by every AuthService instance)
+password_hasher = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the global password hasher instance"""
+    global password_hasher
+    if password_hasher is None:
+        password_hasher = PasswordHasher()
+    return password_hasher
@@ -0,0 +1,143 @@
+"""
+Response Parser for Memo AI Coach
+Validates LLM evaluation responses against models generated from the active rubric
+"""
+
+import re
+import math
+import logging
+from typing import Dict, Any, List, Type, Annotated
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, ValidationError, create_model
+
+try:
+    from models.config_models import RubricConfig
+except ImportError:
+    from backend.models.config_models import RubricConfig
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+CODE_FENCE = re.compile(r'^```[\w-]*[ \t]*\n?|\n?[ \t]*```$')
+TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+# Most validation errors quoted back to the model in a correction request
+MAX_REPORTED_ERRORS = 10
+
+REPAIR_INSTRUCTION = (
+    "Your previous reply could not be used because it did not match the required JSON format:\n"
+    "{errors}\n"
+    "Reply again with only the corrected JSON object, keeping your evaluation the same."
+)
+
+class ResponseParseError(ValueError):
+    """Raised when an LLM response does not validate, even after local repair"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"Invalid LLM response: {'; '.join(errors)}")
+        self.errors = errors
+
+def _round_score(value: Any) -> Any:
+    """Coerce numeric scores given as floats or strings to the nearest integer"""
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return value
+    if isinstance(value, float) and math.isfinite(value):
+        return int(math.floor(value + 0.5))
+    return value
+
+class SegmentFeedback(BaseModel):
+    """Feedback on one segment of the evaluated text"""
+    model_config = ConfigDict(extra='ignore')
+
+    segment: str = ""
+    comment: str = ""
+    questions: List[str] = Field(default_factory=list)
+    suggestions: List[str] = Field(default_factory=list)
+
+def build_response_model(rubric: RubricConfig) -> Type[BaseModel]:
+    """
+    Generate the evaluation response model for a rubric
+
+    Every rubric criterion is a required field of `rubric_scores` with an
+    integer score in the rubric's range.
+
+    Args:
+        rubric: Rubric configuration of one language
+
+    Returns:
+        Pydantic model class for the full evaluation response
+    """
+    score_min, score_max = rubric.scores.min, rubric.scores.max
+
+    criterion_score = create_model(
+        'CriterionScore',
+        __config__=ConfigDict(extra='ignore'),
+        score=(Annotated[int, BeforeValidator(_round_score), Field(ge=score_min, le=score_max)], ...),
+        justification=(str, ...)
+    )
+    rubric_scores = create_model(
+        'RubricScores',
+        __config__=ConfigDict(extra='ignore'),
+        **{key: (criterion_score, ...) for key in rubric.criteria}
+    )
+    return create_model(
+        'EvaluationResponse',
+        __config__=ConfigDict(extra='ignore'),
+        overall_score=(float, Field(..., ge=score_min, le=score_max)),
+        strengths=(List[str], ...),
+        opportunities=(List[str], ...),
+        rubric_scores=(rubric_scores, ...),
+        segment_feedback=(List[SegmentFeedback], ...)
+    )
+
+def repair_json_text(text: str) -> str:
+    """Cheap textual fixes for common defects: code fences, surrounding prose and trailing commas"""
+    text = CODE_FENCE.sub('', text.strip().lstrip('\ufeff')).strip()
+    start, end = text.find('{'), text.rfind('}')
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    return TRAILING_COMMA.sub(r'\1', text)
+
+def _describe_errors(error: ValidationError) -> List[str]:
+    errors = []
+    for detail in error.errors()[:MAX_REPORTED_ERRORS]:
+        location = ".".join(str(part) for part in detail['loc'])
+        errors.append(f"{location}: {detail['msg']}" if location else detail['msg'])
+    return errors
+
+def parse_evaluation_response(response: str, model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Parse and validate an evaluation response in a single pass
+
+    The response is decoded and validated together by pydantic's native JSON
+    parser. If that fails, the text is repaired locally and validated once
+    more before giving up.
+
+    Args:
+        response: Raw model output
+        model: Model from `build_response_model`
+
+    Returns:
+        Validated evaluation as a plain dictionary
+
+    Raises:
+        ResponseParseError: If the response is still invalid after repair
+    """
+    try:
+        return model.model_validate_json(response).model_dump()
+    except ValidationError as e:
+        error = e
+
+    repaired = repair_json_text(response)
+    if repaired != response:
+        try:
+            parsed = model.model_validate_json(repaired).model_dump()
+            logger.info("LLM response repaired locally")
+            return parsed
+        except ValidationError as e:
+            error = e
+
+    raise ResponseParseError(_describe_errors(error))
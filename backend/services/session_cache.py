@@ -0,0 +1,114 @@
+"""
+Session Cache for Memo AI Coach
+Keeps validated sessions in memory so authenticated requests skip the database
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class SessionCache:
+    """Thread-safe LRU cache of validated session data keyed by session token
+
+    Entries live for `ttl` seconds, never past the session's own `expires_at`.
+    Logout and user deletion must invalidate entries explicitly; the short TTL
+    only bounds how long a change made outside the auth service goes unseen.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: int = 30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self.configure(max_size, ttl)
+
+    def configure(self, max_size: int, ttl: int) -> None:
+        """Apply new limits; a TTL of 0 disables caching"""
+        with self._lock:
+            self.max_size = max(1, int(max_size))
+            self.ttl = max(0, int(ttl))
+            if not self.ttl:
+                self._entries.clear()
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached session data, or None on miss or expiry"""
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                expires_at, session_data = entry
+                if expires_at > now:
+                    self._entries.move_to_end(token)
+                    self._hits += 1
+                    return copy.deepcopy(session_data)
+                del self._entries[token]
+            self._misses += 1
+            return None
+
+    def set(self, token: str, session_data: Dict[str, Any]) -> None:
+        """Cache validated session data until the TTL or the session expiry, whichever is first"""
+        if not self.ttl:
+            return
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+        session_expires_at = session_data.get('expires_at')
+        if isinstance(session_expires_at, datetime):
+            expires_at = min(expires_at, session_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, copy.deepcopy(session_data))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Drop one session"""
+        with self._lock:
+            if self._entries.pop(token, None) is not None:
+                self._invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached session of a user"""
+        with self._lock:
+            tokens = [token for token, (_, data) in self._entries.items() if data.get('user_id') == user_id]
+            for token in tokens:
+                del self._entries[token]
+            self._invalidations += len(tokens)
+
+    def clear(self) -> None:
+        """Drop all cached sessions"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+# Global session cache instance (shared by every AuthService instance)
+session_cache = None
+
+def get_session_cache() -> SessionCache:
+    """Get the global session cache instance"""
+    global session_cache
+    if session_cache is None:
+        session_cache = SessionCache()
+    return session_cache
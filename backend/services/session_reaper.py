@@ -0,0 +1,132 @@
+"""
+Session Reaper for Memo AI Coach
+Periodically deletes expired and inactive sessions in small batches and compacts the database
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+try:
+    from models.database import async_db_manager, db_manager
+    from models.entities import Session
+except ImportError:
+    from backend.models.database import async_db_manager, db_manager
+    from backend.models.entities import Session
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+class SessionReaper:
+    """Background task that keeps the sessions table and its indexes small
+
+    Every `interval` seconds it deletes expired or inactive sessions in batches
+    of `batch_size`, pausing `batch_pause` seconds between batches so request
+    writes are never held up behind a long delete, and stopping after
+    `max_batches` until the next run. After deleting rows it releases free
+    pages (with incremental auto_vacuum) and runs `PRAGMA optimize`.
+    """
+
+    def __init__(self, enabled: bool = True, interval: float = 300, batch_size: int = 500,
+                 batch_pause: float = 0.1, max_batches: int = 100, vacuum_pages: int = 1000):
+        self.enabled = enabled
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self.vacuum_pages = vacuum_pages
+        self._task: Optional[asyncio.Task] = None
+        self._runs = 0
+        self._sessions_deleted = 0
+        self._pages_released = 0
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def configure(self, enabled: bool, interval: float, batch_size: int, batch_pause: float,
+                  max_batches: int, vacuum_pages: int) -> None:
+        """Apply new settings (the interval applies after the current wait)"""
+        self.enabled = bool(enabled)
+        self.interval = max(1.0, float(interval))
+        self.batch_size = max(1, int(batch_size))
+        self.batch_pause = max(0.0, float(batch_pause))
+        self.max_batches = max(1, int(max_batches))
+        self.vacuum_pages = max(0, int(vacuum_pages))
+
+    def start(self) -> None:
+        """Start the background task on the running event loop if needed"""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Session reaper started (every {self.interval:g}s, enabled: {self.enabled})")
+
+    async def stop(self) -> None:
+        """Cancel the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.enabled:
+                continue
+            try:
+                await self.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session reaper run failed: {e}")
+
+    async def reap(self) -> Dict[str, Any]:
+        """Run one cleanup pass and return what it reclaimed"""
+        started = time.monotonic()
+        deleted = batches = 0
+        while batches < self.max_batches:
+            count = await async_db_manager.run(Session.delete_expired, self.batch_size)
+            batches += 1
+            deleted += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        pages = await async_db_manager.run(db_manager.compact, self.vacuum_pages) if deleted else 0
+
+        result = {
+            "sessions_deleted": deleted,
+            "batches": batches,
+            "pages_released": pages,
+            "duration": round(time.monotonic() - started, 3),
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        self._runs += 1
+        self._sessions_deleted += deleted
+        self._pages_released += pages
+        self._last_run = result
+        if deleted:
+            logger.info(f"Session reaper deleted {deleted} sessions in {batches} batches, released {pages} pages")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return reaper statistics"""
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "runs": self._runs,
+            "sessions_deleted": self._sessions_deleted,
+            "pages_released": self._pages_released,
+            "last_run": self._last_run
+        }
+
+# Global session reaper instance
+session_reaper = None
+
+def get_session_reaper() -> SessionReaper:
+    """Get the global session reaper instance"""
+    global session_reaper
+    if session_reaper is None:
+        session_reaper = SessionReaper()
+    return session_reaper
@@ -0,0 +1,183 @@
+"""
+Signed Session Tokens for Memo AI Coach
+HMAC-signed tokens that validate without a database read, plus an incrementally synced revocation list
+"""
+
+import os
+import json
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Environment variable holding the signing key (must be identical on every worker)
+SIGNING_KEY_ENV = "SESSION_SIGNING_KEY"
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+class TokenSigner:
+    """Issues and verifies `v1.<claims>.<signature>` session tokens
+
+    Claims carry the user id, username, admin flag, issue and expiry times and
+    a random token id (`jti`) used for revocation. The signature is
+    HMAC-SHA256 over the encoded claims.
+    """
+
+    PREFIX = "v1."
+
+    def __init__(self, secret: bytes):
+        self._secret = secret
+
+    @classmethod
+    def from_config(cls, signed_config: Dict[str, Any]) -> Optional['TokenSigner']:
+        """Build a signer from `session_management.signed_tokens`, or None when disabled"""
+        if not signed_config.get('enabled', False):
+            return None
+        secret = os.getenv(signed_config.get('signing_key_env', SIGNING_KEY_ENV), '')
+        if len(secret) < 32:
+            logger.error("Signed session tokens enabled but the signing key is missing or shorter than 32 characters; "
+                         "issuing database-backed tokens instead")
+            return None
+        return cls(secret.encode('utf-8'))
+
+    @classmethod
+    def is_signed(cls, token: str) -> bool:
+        return token.startswith(cls.PREFIX)
+
+    @classmethod
+    def label(cls, token: str) -> str:
+        """Short identifier for logs and listings (signed tokens share their first characters)"""
+        return (token.rpartition('.')[2] if cls.is_signed(token) else token)[:8]
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self._secret, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, user_id: int, username: str, is_admin: bool, expires_at: datetime) -> str:
+        """Create a signed token for a user, valid until `expires_at` (UTC)"""
+        claims = {
+            "sub": user_id,
+            "usr": username,
+            "adm": bool(is_admin),
+            "iat": time.time(),
+            "exp": (expires_at - datetime(1970, 1, 1)).total_seconds(),
+            "jti": secrets.token_hex(16)
+        }
+        payload = self.PREFIX + _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the token's claims if the signature is valid, otherwise None (expiry is not checked)"""
+        payload, _, signature = token.rpartition('.')
+        try:
+            if not payload.startswith(self.PREFIX) or \
+                    not hmac.compare_digest(signature.encode('utf-8'), self._sign(payload).encode('ascii')):
+                return None
+            return json.loads(_b64decode(payload[len(self.PREFIX):]))
+        except ValueError:
+            # Includes non-ASCII input and malformed base64 or JSON
+            return None
+
+class RevocationList:
+    """In-memory denylist of signed tokens, synced incrementally from `revoked_tokens`
+
+    Every worker pulls only rows newer than the last one it has seen, at most
+    once per `sync_interval` seconds. If the database cannot be read, the last
+    known list keeps being used so validation does not depend on it.
+    """
+
+    def __init__(self, sync_interval: float = 5.0):
+        self.sync_interval = sync_interval
+        self._tokens: Dict[str, float] = {}  # jti -> token expiry
+        self._users: Dict[int, tuple] = {}  # user id -> (revoked_at, entry expiry)
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._sync_failures = 0
+        self._lock = threading.Lock()
+
+    def configure(self, sync_interval: float) -> None:
+        self.sync_interval = max(0.0, float(sync_interval))
+
+    def _add(self, row: Dict[str, Any]) -> None:
+        if row['token_id']:
+            self._tokens[row['token_id']] = row['expires_at']
+        elif row['user_id'] is not None:
+            self._users[row['user_id']] = (row['revoked_at'], row['expires_at'])
+
+    def sync(self, force: bool = False) -> None:
+        """Pull revocations recorded since the last sync (by any worker)"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = now
+            last_id = self._last_id
+        try:
+            from models.entities import RevokedToken
+            rows = RevokedToken.get_since(last_id)
+        except Exception as e:
+            with self._lock:
+                self._sync_failures += 1
+            logger.warning(f"Revocation list sync failed, using last known list: {e}")
+            return
+        with self._lock:
+            for row in rows:
+                self._add(row)
+                self._last_id = max(self._last_id, row['id'])
+            self._tokens = {jti: expiry for jti, expiry in self._tokens.items() if expiry > now}
+            self._users = {user: entry for user, entry in self._users.items() if entry[1] > now}
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """Check a verified token's claims against the denylist"""
+        with self._lock:
+            if claims.get('jti') in self._tokens:
+                return True
+            user_entry = self._users.get(claims.get('sub'))
+            return user_entry is not None and claims.get('iat', 0) <= user_entry[0]
+
+    def revoke_token(self, claims: Dict[str, Any]) -> None:
+        """Revoke one token here and, through the database, on every worker"""
+        from models.entities import RevokedToken
+        row = RevokedToken.revoke_token(claims['jti'], claims['exp'])
+        with self._lock:
+            self._add(row)
+
+    def revoke_user(self, user_id: int, until: float) -> None:
+        """Revoke every token a user was issued so far; `until` is when the last of them expires"""
+        from models.entities import RevokedToken
+        row = RevokedToken.revoke_user(user_id, until)
+        with self._lock:
+            self._add(row)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return denylist statistics"""
+        with self._lock:
+            return {
+                "revoked_tokens": len(self._tokens),
+                "revoked_users": len(self._users),
+                "last_id": self._last_id,
+                "seconds_since_sync": round(time.time() - self._last_sync, 1) if self._last_sync else None,
+                "sync_interval": self.sync_interval,
+                "sync_failures": self._sync_failures
+            }
+
+# Global revocation list instance (shared by every AuthService instance)
+revocation_list = None
+
+def get_revocation_list() -> RevocationList:
+    """Get the global revocation list instance"""
+    global revocation_list
+    if revocation_list is None:
+        revocation_list = RevocationList()
+    return revocation_list
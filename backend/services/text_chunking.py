@@ -0,0 +1,185 @@
+"""
+Text Chunking for Memo AI Coach
+Splits long memos into overlapping chunks and merges the per-chunk evaluations
+"""
+
+import re
+import math
+import logging
+from typing import Dict, Any, List, Optional
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+# Upper bound for merged strengths/opportunities lists
+MAX_MERGED_LIST_ITEMS = 6
+
+class TextChunk:
+    """A slice of the original text, by character offsets"""
+
+    def __init__(self, text: str, start: int, end: int):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+def _split_spans(text: str, start: int, end: int, pattern: re.Pattern) -> List[tuple]:
+    """Split text[start:end] at pattern matches, dropping the separators"""
+    spans = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        if match.start() > position:
+            spans.append((position, match.start()))
+        position = match.end()
+    if end > position:
+        spans.append((position, end))
+    return spans
+
+def _hard_split(text: str, start: int, end: int, size: int) -> List[tuple]:
+    """Split a span with no usable boundary into pieces of at most `size`, preferring whitespace"""
+    spans = []
+    while end - start > size:
+        cut = text.rfind(' ', start + 1, start + size)
+        if cut == -1:
+            cut = start + size
+        spans.append((start, cut))
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    if end > start:
+        spans.append((start, end))
+    return spans
+
+def _units(text: str, chunk_size: int) -> List[tuple]:
+    """Paragraph spans, with oversized paragraphs broken into sentences (and then words)"""
+    units = []
+    for start, end in _split_spans(text, 0, len(text), PARAGRAPH_BREAK):
+        if end - start <= chunk_size:
+            units.append((start, end))
+            continue
+        for sentence_start, sentence_end in _split_spans(text, start, end, SENTENCE_BREAK):
+            units.extend(_hard_split(text, sentence_start, sentence_end, chunk_size))
+    return units
+
+def split_into_chunks(text: str, chunk_size: int, overlap_size: int,
+                      max_chunks: Optional[int] = None) -> List[TextChunk]:
+    """
+    Split text on paragraph boundaries into chunks that overlap by whole paragraphs
+
+    Args:
+        text: Text to split
+        chunk_size: Target maximum chunk length in characters
+        overlap_size: Maximum length of trailing paragraphs repeated at the start of the next chunk
+        max_chunks: Optional cap; the chunk size is raised so the text fits in about this many chunks
+
+    Returns:
+        Chunks in document order (a single chunk if the text fits)
+    """
+    overlap_size = max(0, min(overlap_size, chunk_size // 2))
+    if max_chunks and len(text) > chunk_size * max_chunks:
+        chunk_size = math.ceil(len(text) / max_chunks) + overlap_size
+
+    spans = []
+    current: List[tuple] = []
+    for unit in _units(text, chunk_size):
+        if current and unit[1] - current[0][0] > chunk_size:
+            spans.append((current[0][0], current[-1][1]))
+            # Carry the trailing paragraphs that fit in the overlap into the next chunk
+            overlap = []
+            for previous in reversed(current):
+                if current[-1][1] - previous[0] > overlap_size:
+                    break
+                overlap.insert(0, previous)
+            if overlap and unit[1] - overlap[0][0] > chunk_size:
+                overlap = []
+            current = overlap
+        current.append(unit)
+    if current:
+        spans.append((current[0][0], current[-1][1]))
+
+    return [TextChunk(text[start:end], start, end) for start, end in spans]
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value).lower().split())
+
+def _interleave_unique(lists: List[List[Any]], limit: int) -> List[Any]:
+    """Take items round-robin across lists, skipping duplicates, up to `limit`"""
+    merged = []
+    seen = set()
+    for index in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if index < len(items) and _normalize(items[index]) not in seen:
+                seen.add(_normalize(items[index]))
+                merged.append(items[index])
+                if len(merged) >= limit:
+                    return merged
+    return merged
+
+def merge_chunk_evaluations(evaluations: List[Dict[str, Any]], chunk_lengths: List[int],
+                            criterion_weights: Dict[str, int], score_min: int = 1,
+                            score_max: int = 5) -> Dict[str, Any]:
+    """
+    Merge validated per-chunk evaluations into one evaluation of the whole text
+
+    Rubric scores are averaged across chunks weighted by chunk length and
+    rounded to the integer scale; the overall score is the average of the
+    merged rubric scores weighted by the configured criterion weights.
+    Strengths and opportunities are interleaved across chunks without
+    duplicates, and segment feedback is concatenated in document order with
+    segments repeated by chunk overlap dropped.
+
+    Args:
+        evaluations: Parsed evaluations, one per chunk in document order
+        chunk_lengths: Length of each chunk in characters
+        criterion_weights: Rubric criterion key -> weight from prompt.yaml
+        score_min: Lowest rubric score
+        score_max: Highest rubric score
+
+    Returns:
+        Evaluation with the same fields as a single-prompt evaluation
+    """
+    total_length = sum(chunk_lengths) or 1
+
+    rubric_scores = {}
+    for criterion in evaluations[0]['rubric_scores']:
+        scored = [
+            (evaluation['rubric_scores'][criterion], length)
+            for evaluation, length in zip(evaluations, chunk_lengths)
+            if criterion in evaluation['rubric_scores']
+        ]
+        weight = sum(length for _, length in scored) or total_length
+        average = sum(data['score'] * length for data, length in scored) / weight
+        score = min(score_max, max(score_min, int(math.floor(average + 0.5))))
+        # Justification from the chunk that agrees most with the merged score (longest on ties)
+        closest, _ = min(scored, key=lambda item: (abs(item[0]['score'] - average), -item[1]))
+        rubric_scores[criterion] = {"score": score, "justification": closest['justification']}
+
+    weighted = [(data['score'], criterion_weights.get(criterion, 0)) for criterion, data in rubric_scores.items()]
+    weight_total = sum(weight for _, weight in weighted)
+    if weight_total:
+        overall_score = sum(score * weight for score, weight in weighted) / weight_total
+    else:
+        overall_score = sum(score for score, _ in weighted) / len(weighted)
+
+    segment_feedback = []
+    seen_segments = set()
+    for evaluation in evaluations:
+        for feedback in evaluation['segment_feedback']:
+            key = _normalize(feedback.get('segment', '')) if isinstance(feedback, dict) else _normalize(feedback)
+            if key and key in seen_segments:
+                continue
+            seen_segments.add(key)
+            segment_feedback.append(feedback)
+
+    return {
+        "overall_score": round(overall_score, 1),
+        "strengths": _interleave_unique([e['strengths'] for e in evaluations], MAX_MERGED_LIST_ITEMS),
+        "opportunities": _interleave_unique([e['opportunities'] for e in evaluations], MAX_MERGED_LIST_ITEMS),
+        "rubric_scores": rubric_scores,
+        "segment_feedback": segment_feedback
+    }
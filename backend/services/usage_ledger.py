@@ -0,0 +1,133 @@
+"""
+Usage Ledger for Memo AI Coach
+Prices token usage per model and enforces the cost limits from llm.yaml
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+try:
+    from models.entities import UsageRollup
+except ImportError:
+    from backend.models.entities import UsageRollup
+
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Pricing keys (USD per million tokens) for each usage counter reported by providers
+PRICE_KEYS = {
+    'input_tokens': 'input',
+    'output_tokens': 'output',
+    'cache_read_input_tokens': 'cache_read',
+    'cache_creation_input_tokens': 'cache_write'
+}
+
+class CostLimitExceededError(Exception):
+    """Raised when the daily or monthly LLM spending limit has been reached"""
+
+    def __init__(self, period: str, limit: float, spent: float, retry_after: int):
+        super().__init__(f"{period.capitalize()} cost limit of ${limit:.2f} reached (${spent:.2f} spent)")
+        self.period = period
+        self.limit = limit
+        self.spent = spent
+        self.retry_after = retry_after
+
+class UsageLedger:
+    """Cost accounting over the `usage_ledger` rollups
+
+    Evaluations are priced from their token usage with the per-model pricing
+    table. Their tokens and cost are added to the day and month rollups when
+    the evaluation is stored (see `Evaluation.create`), so checking a limit
+    reads a single rollup row by key.
+    """
+
+    def __init__(self):
+        self.pricing: Dict[str, Dict[str, float]] = {}
+        self.track_cost_metrics = True
+        self.enforce_limits = False
+        self.limit_per_request: Optional[float] = None
+        self.limit_per_day: Optional[float] = None
+        self.limit_per_month: Optional[float] = None
+        self._unpriced_models = set()
+
+    def configure(self, pricing: Dict[str, Dict[str, float]], track_cost_metrics: bool, enforce_limits: bool,
+                  limit_per_request: Optional[float], limit_per_day: Optional[float],
+                  limit_per_month: Optional[float]) -> None:
+        """Apply pricing and limits from configuration"""
+        self.pricing = dict(pricing or {})
+        self.track_cost_metrics = bool(track_cost_metrics)
+        self.enforce_limits = bool(enforce_limits)
+        self.limit_per_request = limit_per_request
+        self.limit_per_day = limit_per_day
+        self.limit_per_month = limit_per_month
+
+    def cost_of(self, model: Optional[str], usage: Dict[str, int]) -> float:
+        """Price the token usage of one evaluation in USD"""
+        if not usage or not self.track_cost_metrics:
+            return 0.0
+        prices = self.pricing.get(model or "")
+        if prices is None:
+            if model not in self._unpriced_models:
+                self._unpriced_models.add(model)
+                logger.warning(f"No pricing configured for model '{model}' - cost recorded as 0")
+            return 0.0
+        cost = sum(
+            usage.get(field, 0) * prices.get(price_key, 0) for field, price_key in PRICE_KEYS.items()
+        ) / 1_000_000
+        if self.limit_per_request and cost > self.limit_per_request:
+            logger.warning(f"Evaluation cost ${cost:.4f} exceeds the per-request limit of ${self.limit_per_request:.2f}")
+        return round(cost, 6)
+
+    def check_limits(self, now: Optional[datetime] = None) -> None:
+        """Raise `CostLimitExceededError` if today's or this month's spending has reached its limit
+        
+        Evaluations are allowed if the ledger cannot be read.
+        """
+        if not self.enforce_limits:
+            return
+        now = now or datetime.utcnow()
+        day_key, month_key = UsageRollup.period_starts(now)
+        for (period, period_start), limit in ((day_key, self.limit_per_day), (month_key, self.limit_per_month)):
+            if not limit:
+                continue
+            try:
+                rollup = UsageRollup.get(period, period_start)
+            except Exception as e:
+                logger.error(f"Cost limit check skipped: {e}")
+                return
+            if rollup is not None and rollup.cost_usd >= limit:
+                raise CostLimitExceededError(period, limit, rollup.cost_usd, self._seconds_until_next(period, now))
+
+    @staticmethod
+    def _seconds_until_next(period: str, now: datetime) -> int:
+        if period == UsageRollup.PERIOD_DAY:
+            next_start = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        else:
+            next_start = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+        return max(1, int((next_start - now).total_seconds()))
+
+    def get_summary(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Return current day and month spending against the configured limits"""
+        now = now or datetime.utcnow()
+        summary = {}
+        for (period, period_start), limit in zip(UsageRollup.period_starts(now), (self.limit_per_day, self.limit_per_month)):
+            rollup = UsageRollup.get(period, period_start)
+            summary[period] = {
+                "period_start": period_start,
+                "cost_usd": round(rollup.cost_usd, 6) if rollup else 0.0,
+                "evaluations": rollup.evaluations if rollup else 0,
+                "limit_usd": limit,
+                "limit_enforced": self.enforce_limits and bool(limit)
+            }
+        return summary
+
+# Global usage ledger instance
+usage_ledger = None
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the global usage ledger instance"""
+    global usage_ledger
+    if usage_ledger is None:
+        usage_ledger = UsageLedger()
+    return usage_ledger
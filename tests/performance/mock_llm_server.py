@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+Local stand-in for the Anthropic Messages API with configurable latency and error injection
+
+Point the backend at it with `CLAUDE_API_BASE_URL=http://localhost:8089` (or
+`provider.api_base_url` in llm.yaml) and any non-empty `CLAUDE_API_KEY`:
+
+    python3 tests/performance/mock_llm_server.py --latency lognormal --latency-mean 8 \
+        --rate-limit-rate 0.05 --overloaded-rate 0.02 --seed 42
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+import yaml
+
+PROMPT_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'prompt.yaml')
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# Prompt cache entries expire after five minutes without a hit, like the provider's ephemeral cache
+CACHE_TTL = 300
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+def load_criteria(path: str = PROMPT_CONFIG) -> List[str]:
+    """Rubric criterion keys from prompt.yaml, so responses pass the service's validation"""
+    try:
+        with open(path, 'r') as f:
+            prompt_data = yaml.safe_load(f) or {}
+        languages = prompt_data.get('languages', {})
+        for language_config in languages.values():
+            criteria = language_config.get('rubric', {}).get('criteria', {})
+            if criteria:
+                return list(criteria)
+    except (OSError, yaml.YAMLError):
+        pass
+    return ['structure', 'arguments_and_evidence', 'strategic_alignment', 'implementation_and_risks']
+
+class MockLLMSettings:
+    """Latency and fault injection settings"""
+
+    def __init__(self, latency: str = "fixed", latency_mean: float = 1.0, latency_stddev: float = 0.0,
+                 latency_min: float = 0.0, latency_max: float = 60.0, first_token_ratio: float = 0.1,
+                 rate_limit_rate: float = 0.0, overloaded_rate: float = 0.0, timeout_rate: float = 0.0,
+                 timeout_hang: float = 60.0, retry_after: int = 1, time_scale: float = 1.0,
+                 seed: Optional[int] = None):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_stddev = latency_stddev
+        self.latency_min = latency_min
+        self.latency_max = latency_max
+        self.first_token_ratio = first_token_ratio
+        self.rate_limit_rate = rate_limit_rate
+        self.overloaded_rate = overloaded_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_hang = timeout_hang
+        self.retry_after = retry_after
+        self.time_scale = time_scale
+        self.seed = seed
+
+class MockLLMState:
+    """Shared server state: random source, prompt cache and request statistics"""
+
+    def __init__(self, settings: MockLLMSettings):
+        self.settings = settings
+        self.criteria = load_criteria()
+        self._random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._cache: Dict[str, float] = {}
+        self.stats = {
+            "requests": 0,
+            "streamed": 0,
+            "completed": 0,
+            "rate_limited": 0,
+            "overloaded": 0,
+            "timed_out": 0,
+            "in_flight": 0,
+            "max_in_flight": 0
+        }
+
+    def count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += delta
+            if key == "in_flight":
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+    def draw(self) -> Tuple[Optional[str], float]:
+        """Pick the injected fault (if any) and the response latency for one request"""
+        settings = self.settings
+        with self._lock:
+            roll = self._random.random()
+            if settings.latency == "uniform":
+                latency = self._random.uniform(settings.latency_min, settings.latency_max)
+            elif settings.latency == "normal":
+                latency = self._random.gauss(settings.latency_mean, settings.latency_stddev)
+            elif settings.latency == "lognormal" and settings.latency_mean > 0:
+                # Parameterized by the mean and standard deviation of the latency itself
+                variance = math.log(1 + (settings.latency_stddev / settings.latency_mean) ** 2)
+                mu = math.log(settings.latency_mean) - variance / 2
+                latency = self._random.lognormvariate(mu, math.sqrt(variance))
+            else:
+                latency = settings.latency_mean
+        latency = min(settings.latency_max, max(settings.latency_min, latency)) * settings.time_scale
+
+        fault = None
+        for name, rate in (("rate_limit", settings.rate_limit_rate), ("overloaded", settings.overloaded_rate),
+                           ("timeout", settings.timeout_rate)):
+            if roll < rate:
+                fault = name
+                break
+            roll -= rate
+        return fault, latency
+
+    def usage_for(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Token usage for a request, with cache reads for prefixes marked `cache_control` seen before"""
+        blocks = []
+        system = body.get('system') or []
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        blocks.extend(system)
+        for message in body.get('messages', []):
+            content = message.get('content', '')
+            blocks.extend([{"type": "text", "text": content}] if isinstance(content, str) else content)
+
+        # The cacheable prefix runs through the last block marked for caching
+        marked = [index for index, block in enumerate(blocks) if block.get('cache_control')]
+        prefix = blocks[:marked[-1] + 1] if marked else []
+        prefix_tokens = sum(estimate_tokens(block.get('text', '')) for block in prefix)
+        total_tokens = sum(estimate_tokens(block.get('text', '')) for block in blocks)
+
+        usage = {"input_tokens": total_tokens - prefix_tokens, "cache_creation_input_tokens": 0,
+                 "cache_read_input_tokens": 0}
+        if prefix:
+            key = hashlib.sha256(json.dumps([body.get('model'), prefix], sort_keys=True).encode('utf-8')).hexdigest()
+            now = time.monotonic()
+            with self._lock:
+                hit = self._cache.get(key, 0) > now
+                self._cache[key] = now + CACHE_TTL
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = prefix_tokens
+        return usage
+
+    def evaluation_for(self, body: Dict[str, Any]) -> str:
+        """Evaluation JSON for a request, deterministic for the same memo text"""
+        messages = body.get('messages') or [{}]
+        content = messages[-1].get('content', '')
+        memo = content if isinstance(content, str) else (content[-1].get('text', '') if content else '')
+        rng = random.Random(hashlib.sha256(memo.encode('utf-8')).hexdigest())
+        scores = {criterion: rng.randint(2, 5) for criterion in self.criteria}
+        return json.dumps({
+            "overall_score": round(sum(scores.values()) / len(scores), 1),
+            "strengths": ["Clear statement of the opportunity", "Relevant supporting metrics"],
+            "opportunities": ["Quantify the main risks", "Add an implementation timeline"],
+            "rubric_scores": {
+                criterion: {"score": score, "justification": f"Mock assessment of {criterion.replace('_', ' ')}"}
+                for criterion, score in scores.items()
+            },
+            "segment_feedback": [
+                {
+                    "segment": memo[:60],
+                    "comment": "Opening states the purpose of the memo",
+                    "questions": ["What decision is requested?"],
+                    "suggestions": ["Lead with the recommendation"]
+                }
+            ]
+        })
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Request handler implementing `POST /v1/messages` and `GET /stats`"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockLLM/1.0"
+
+    @property
+    def state(self) -> MockLLMState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, dict(self.state.stats))
+        else:
+            self._send_error(404, "not_found_error", f"No route for {self.path}")
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_error(400, "invalid_request_error", "Request body is not valid JSON")
+            return
+        if self.path.split('?')[0].rstrip('/') != '/v1/messages':
+            self._send_error(404, "not_found_error", f"No route for {self.path}")
+            return
+
+        state = self.state
+        state.count("requests")
+        state.count("in_flight")
+        try:
+            fault, latency = state.draw()
+            if fault == "rate_limit":
+                state.count("rate_limited")
+                self._send_error(429, "rate_limit_error", "Rate limit exceeded",
+                                 {"retry-after": str(state.settings.retry_after)})
+            elif fault == "overloaded":
+                state.count("overloaded")
+                time.sleep(latency * state.settings.first_token_ratio)
+                self._send_error(529, "overloaded_error", "Overloaded")
+            elif fault == "timeout":
+                # Hold the connection open without answering, then drop it
+                state.count("timed_out")
+                time.sleep(state.settings.timeout_hang * state.settings.time_scale)
+                self.close_connection = True
+            elif body.get('stream'):
+                state.count("streamed")
+                self._stream_message(body, latency)
+                state.count("completed")
+            else:
+                time.sleep(latency)
+                self._send_json(200, self._message(body, state.evaluation_for(body), state.usage_for(body)))
+                state.count("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            state.count("in_flight", -1)
+
+    def _message(self, body: Dict[str, Any], text: str, usage: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            "id": f"msg_mock_{self.state.stats['requests']:08d}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get('model', 'mock'),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": dict(usage, output_tokens=estimate_tokens(text))
+        }
+
+    def _stream_message(self, body: Dict[str, Any], latency: float) -> None:
+        """Send the evaluation as server-sent events spread over the latency"""
+        text = self.state.evaluation_for(body)
+        usage = self.state.usage_for(body)
+        message = self._message(body, "", usage)
+        message["content"] = []
+        message["stop_reason"] = None
+        message["usage"]["output_tokens"] = 1
+
+        first_token = latency * self.state.settings.first_token_ratio
+        pieces = [text[index:index + 40] for index in range(0, len(text), 40)]
+        interval = (latency - first_token) / max(1, len(pieces))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        self._send_event("message_start", {"type": "message_start", "message": message})
+        time.sleep(first_token)
+        self._send_event("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+        })
+        for piece in pieces:
+            self._send_event("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}
+            })
+            time.sleep(interval)
+        self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._send_event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": estimate_tokens(text)}
+        })
+        self._send_event("message_stop", {"type": "message_stop"})
+
+    def _send_event(self, event: str, data: Dict[str, Any]) -> None:
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, error_type: str, message: str,
+                    headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock state"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], settings: MockLLMSettings, verbose: bool = False):
+        super().__init__(address, MockLLMHandler)
+        self.state = MockLLMState(settings)
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_in_thread(settings: Optional[MockLLMSettings] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> MockLLMServer:
+    """Start a server on a background thread (port 0 picks a free port); stop it with `shutdown()`"""
+    server = MockLLMServer((host, port), settings or MockLLMSettings())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Anthropic Messages API for load and latency testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Distribution of the total response time")
+    parser.add_argument("--latency-mean", type=float, default=8.0, help="Mean response time in seconds")
+    parser.add_argument("--latency-stddev", type=float, default=2.5, help="Standard deviation in seconds")
+    parser.add_argument("--latency-min", type=float, default=0.5, help="Lower bound (and uniform minimum)")
+    parser.add_argument("--latency-max", type=float, default=15.0, help="Upper bound (and uniform maximum)")
+    parser.add_argument("--first-token-ratio", type=float, default=0.1,
+                        help="Share of the response time before the first streamed token")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--overloaded-rate", type=float, default=0.0, help="Share of requests answered 529")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that never answer")
+    parser.add_argument("--timeout-hang", type=float, default=60.0, help="Seconds a timed-out request is held")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier applied to all delays")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    settings = MockLLMSettings(
+        latency=args.latency, latency_mean=args.latency_mean, latency_stddev=args.latency_stddev,
+        latency_min=args.latency_min, latency_max=args.latency_max, first_token_ratio=args.first_token_ratio,
+        rate_limit_rate=args.rate_limit_rate, overloaded_rate=args.overloaded_rate,
+        timeout_rate=args.timeout_rate, timeout_hang=args.timeout_hang, retry_after=args.retry_after,
+        time_scale=args.time_scale, seed=args.seed
+    )
+    server = MockLLMServer((args.host, args.port), settings, verbose=args.verbose)
+    print(f"Mock LLM server listening on {server.base_url} ({args.latency} latency, mean {args.latency_mean}s)")
+    print(f"Start the backend with CLAUDE_API_BASE_URL={server.base_url} and any CLAUDE_API_KEY")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStats:", json.dumps(server.state.stats))
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Unit tests for the pooled database manager
+"""
+
+import time
+import asyncio
+import sqlite3
+import threading
+import pytest
+
+from backend.models.database import DatabaseManager, AsyncDatabaseManager
+
+@pytest.fixture
+def manager(tmp_path):
+    """Database manager on a scratch database with one table"""
+    db = DatabaseManager(str(tmp_path / "memoai.db"), pool_size=2, pool_timeout=0.2)
+    db.execute_update("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    yield db
+    db.close()
+
+class TestConnectionPool:
+    """Test cases for connection reuse and bounds"""
+
+    def test_connections_are_reused(self, manager):
+        """Test that sequential queries share one pooled connection"""
+        for _ in range(5):
+            manager.execute_query("SELECT COUNT(*) FROM items")
+
+        stats = manager.pool_stats()
+        assert stats["created"] == 1
+        assert stats["reused"] == 4
+        assert stats["idle"] == 1 and stats["in_use"] == 0
+
+    def test_pragmas_apply_to_runtime_connections(self, manager):
+        """Test that every pooled connection gets the runtime PRAGMAs"""
+        with manager.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == manager.busy_timeout_ms
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == 10000
+
+    def test_pool_is_bounded(self, manager):
+        """Test that callers beyond the pool size wait and then time out"""
+        release = threading.Event()
+        acquired = threading.Barrier(3)
+
+        def hold():
+            with manager.get_connection():
+                acquired.wait()
+                release.wait()
+
+        holders = [threading.Thread(target=hold) for _ in range(2)]
+        for holder in holders:
+            holder.start()
+        acquired.wait()
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="No database connection available"):
+                manager.execute_query("SELECT 1")
+        finally:
+            release.set()
+            for holder in holders:
+                holder.join()
+
+        stats = manager.pool_stats()
+        assert stats["created"] == 2 and stats["timeouts"] == 1
+        assert manager.execute_query("SELECT 1")[0][0] == 1
+
+    def test_uncommitted_work_is_rolled_back_before_reuse(self, manager):
+        """Test that a connection returns to the pool without an open transaction"""
+        with pytest.raises(RuntimeError):
+            with manager.get_connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('failed')")
+                raise RuntimeError("handler failed")
+        with manager.get_connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('never committed')")
+
+        assert manager.execute_query("SELECT COUNT(*) FROM items")[0][0] == 0
+        assert manager.pool_stats()["created"] == 1
+
+    def test_health_check_reports_pool(self, manager):
+        """Test that pool counters are part of the health check"""
+        for table in ('users', 'sessions', 'submissions', 'evaluations', 'schema_migrations'):
+            manager.execute_update(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY)")
+
+        health = manager.health_check()
+
+        assert health["status"] == "healthy"
+        assert health["pool"]["size"] == 2
+        assert health["pool"]["open"] == 1
+
+    def test_pool_exhaustion_is_reported_unhealthy(self, manager):
+        """Test that a health check that cannot get a connection still reports the pool"""
+        with manager.get_connection(), manager.get_connection():
+            health = manager.health_check()
+
+        assert health["status"] == "unhealthy"
+        assert health["pool"]["timeouts"] == 1
+
+class TestWriter:
+    """Test cases for the group-commit writer thread"""
+
+    def test_insert_future_resolves_to_row_id(self, manager):
+        """Test that a queued insert resolves to its lastrowid after commit"""
+        first = manager.submit_insert("INSERT INTO items (name) VALUES (?)", ("first",))
+        second = manager.submit_insert("INSERT INTO items (name) VALUES (?)", ("second",))
+
+        assert (first.result(timeout=5), second.result(timeout=5)) == (1, 2)
+        assert manager.execute_query("SELECT name FROM items WHERE id = 2")[0]["name"] == "second"
+
+    def test_concurrent_writes_share_commits(self, tmp_path):
+        """Test that a burst of writers is committed in groups without lock errors"""
+        manager = DatabaseManager(str(tmp_path / "burst.db"), write_batch_delay=0.05)
+        manager.execute_update("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        start = threading.Barrier(40)
+        errors = []
+
+        def write(index):
+            start.wait()
+            try:
+                manager.execute_insert("INSERT INTO items (name) VALUES (?)", (f"item-{index}",))
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=write, args=(index,)) for index in range(40)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        stats = manager.write_stats()
+        manager.close()
+
+        assert errors == []
+        assert manager.execute_query("SELECT COUNT(*) FROM items")[0][0] == 40
+        assert stats["writes"] == 41
+        assert stats["largest_group"] > 1 and stats["groups"] < 41
+
+    def test_failed_write_does_not_affect_its_group(self, tmp_path):
+        """Test that one failing write is rolled back alone"""
+        manager = DatabaseManager(str(tmp_path / "group.db"), write_batch_delay=0.05)
+        manager.execute_update("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        manager.execute_insert("INSERT INTO items (name) VALUES ('taken')")
+
+        before = manager.submit_insert("INSERT INTO items (name) VALUES ('before')")
+        duplicate = manager.submit_write(lambda cursor: [
+            cursor.execute("INSERT INTO items (name) VALUES ('partial')"),
+            cursor.execute("INSERT INTO items (name) VALUES ('taken')")
+        ])
+        after = manager.submit_insert("INSERT INTO items (name) VALUES ('after')")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            duplicate.result(timeout=5)
+        assert before.result(timeout=5) and after.result(timeout=5)
+        names = {row["name"] for row in manager.execute_query("SELECT name FROM items")}
+        manager.close()
+        assert names == {"taken", "before", "after"}
+
+    def test_close_commits_queued_writes(self, manager):
+        """Test that closing the manager waits for queued writes"""
+        futures = [manager.submit_insert("INSERT INTO items (name) VALUES (?)", (str(index),)) for index in range(10)]
+        manager.close()
+
+        assert all(future.done() for future in futures)
+        assert manager.execute_query("SELECT COUNT(*) FROM items")[0][0] == 10
+
+    def test_cancelled_write_does_not_stop_writer(self, tmp_path):
+        """Test that a write cancelled while queued is skipped and its group still commits"""
+        manager = DatabaseManager(str(tmp_path / "cancel.db"), write_batch_delay=0.05)
+        manager.execute_update("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+
+        kept = manager.submit_insert("INSERT INTO items (name) VALUES ('kept')")
+        cancelled = manager.submit_insert("INSERT INTO items (name) VALUES ('cancelled')")
+        assert cancelled.cancel()
+
+        assert kept.result(timeout=5)
+        assert manager.execute_insert("INSERT INTO items (name) VALUES ('later')")
+        names = {row["name"] for row in manager.execute_query("SELECT name FROM items")}
+        running = manager.write_stats()["running"]
+        manager.close()
+        assert running
+        assert names == {"kept", "later"}
+
+class TestAsyncDatabaseManager:
+    """Test cases for awaitable database access"""
+
+    def test_queries_run_on_database_threads(self, manager):
+        """Test that async calls return results computed off the event loop thread"""
+        async_manager = AsyncDatabaseManager(manager)
+
+        async def run():
+            await async_manager.execute_insert("INSERT INTO items (name) VALUES (?)", ("memo",))
+            rows = await async_manager.execute_query("SELECT name FROM items")
+            thread_name = await async_manager.run(lambda: threading.current_thread().name)
+            return rows, thread_name
+
+        try:
+            rows, thread_name = asyncio.run(run())
+        finally:
+            async_manager.shutdown()
+
+        assert [row["name"] for row in rows] == ["memo"]
+        assert thread_name.startswith("db")
+
+    def test_cancelled_caller_still_commits(self, tmp_path):
+        """Test that a caller timing out does not cancel its queued write"""
+        manager = DatabaseManager(str(tmp_path / "shield.db"), write_batch_delay=0.2)
+        manager.execute_update("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        async_manager = AsyncDatabaseManager(manager)
+
+        async def run():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(async_manager.execute_insert("INSERT INTO items (name) VALUES ('memo')"), 0.01)
+
+        try:
+            asyncio.run(run())
+        finally:
+            async_manager.shutdown()
+        manager.close()
+
+        assert manager.execute_query("SELECT name FROM items")[0]["name"] == "memo"
+
+    def test_blocking_call_does_not_stall_event_loop(self, manager):
+        """Test that other coroutines keep running while a database call blocks"""
+        async_manager = AsyncDatabaseManager(manager)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            await asyncio.gather(async_manager.run(time.sleep, 0.2), ticker())
+
+        try:
+            asyncio.run(run())
+        finally:
+            async_manager.shutdown()
+
+        assert len(ticks) == 5
+        assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < 0.15
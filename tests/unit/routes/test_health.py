@@ -312,7 +312,7 @@ class TestHealthHelperFunctions:
     
     def test_check_llm_health_success(self):
         """Test LLM health check when successful"""
-        with patch('backend.routes.health.EnhancedLLMService') as mock_llm_class:
+        with patch('backend.routes.health.get_shared_llm_service') as mock_get_llm_service:
             mock_llm_service = Mock()
             mock_llm_service.validate_configuration.return_value = {
                 "valid": True,
@@ -320,7 +320,7 @@ class TestHealthHelperFunctions:
                 "model": "claude-3-sonnet",
                 "provider": "anthropic"
             }
-            mock_llm_class.return_value = mock_llm_service
+            mock_get_llm_service.return_value = mock_llm_service
             
             result = check_llm_health()
             
@@ -331,8 +331,8 @@ class TestHealthHelperFunctions:
     
     def test_check_llm_health_failure(self):
         """Test LLM health check when it fails"""
-        with patch('backend.routes.health.EnhancedLLMService') as mock_llm_class:
-            mock_llm_class.side_effect = Exception("LLM service error")
+        with patch('backend.routes.health.get_shared_llm_service') as mock_get_llm_service:
+            mock_get_llm_service.side_effect = Exception("LLM service error")
             
             result = check_llm_health()
             
@@ -380,15 +380,21 @@ class TestServiceInstantiation:
         assert isinstance(backend.routes.health.config_service, ConfigService)
         assert isinstance(backend.routes.health.auth_service, AuthService)
     
+    def test_auth_service_is_shared(self):
+        """Test that the health router reuses the global authentication service"""
+        import backend.routes.health
+        
+        assert backend.routes.health.auth_service is backend.routes.health.get_auth_service()
+    
     def test_llm_service_lazy_instantiation(self):
         """Test that LLM service is instantiated only when needed"""
-        with patch('backend.routes.health.EnhancedLLMService') as mock_llm_class:
+        with patch('backend.routes.health.get_shared_llm_service') as mock_get_llm_service:
             mock_llm_service = Mock()
-            mock_llm_class.return_value = mock_llm_service
+            mock_get_llm_service.return_value = mock_llm_service
             
             # Call the function that instantiates LLM service
             result = check_llm_health()
             
             # Verify LLM service was instantiated
-            mock_llm_class.assert_called_once()
+            mock_get_llm_service.assert_called_once()
             mock_llm_service.validate_configuration.assert_called_once()
@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the service unit tests
+"""
+
+import os
+import sys
+import pytest
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from backend.init_db import init_database
+from backend.models import entities
+from backend.models.database import DatabaseManager
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """Point the entity models at a freshly initialized database and yield its manager
+
+    Services import the entities as `models.entities` when backend/ is on the
+    path, so every loaded copy of the module is patched. The manager (and its
+    writer thread) is closed on teardown.
+    """
+    db_path = str(tmp_path / "memoai.db")
+    with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{db_path}", 'CLAUDE_API_KEY': '', 'ADMIN_PASSWORD': ''}):
+        assert init_database()
+        manager = DatabaseManager(db_path)
+        try:
+            with ExitStack() as stack:
+                for module in {entities, sys.modules.get('models.entities', entities)}:
+                    stack.enter_context(patch.object(module, 'db_manager', manager))
+                yield manager
+        finally:
+            manager.close()
@@ -0,0 +1,100 @@
+"""
+Unit tests for the authentication service singleton and brute force tracking
+"""
+
+import sys
+import time
+import asyncio
+import bcrypt
+import pytest
+from unittest.mock import Mock, patch
+
+from backend.models import entities
+from backend.services import auth_service as auth_module
+from backend.services.auth_service import AuthService, get_auth_service
+
+@pytest.fixture
+def temp_db(temp_db):
+    """Scratch database, also reachable through the service's lazy `models.entities` imports"""
+    with patch.dict(sys.modules, {'models.entities': entities}):
+        yield temp_db
+
+class TestGetAuthService:
+    """Test cases for the shared auth service instance"""
+
+    def test_config_service_does_not_create_new_instance(self):
+        """Test that passing a config service reuses the singleton"""
+        config_service = object()
+        with patch.object(auth_module, 'auth_service', None):
+            first = get_auth_service()
+            second = get_auth_service(config_service=config_service)
+
+            assert first is second
+            assert second.config_service is config_service
+
+    def test_changed_auth_yaml_is_reloaded(self):
+        """Test that the singleton reloads auth.yaml when its modification time changes"""
+        with patch.object(auth_module, 'auth_service', None):
+            service = get_auth_service()
+            service.auth_config = {}
+            get_auth_service()
+            assert service.auth_config == {}
+
+            service._config_mtime = 0
+            get_auth_service()
+            assert 'session_management' in service.auth_config
+
+class TestBruteForceTracking:
+    """Test cases for brute force detection backed by the database"""
+
+    def test_failures_are_shared_between_instances(self, temp_db):
+        """Test that a lockout recorded by one instance holds in another (as in another worker)"""
+        first, second = AuthService(), AuthService()
+        for _ in range(3):
+            first._record_login_attempt("mallory", False)
+
+        assert second._is_brute_force_attempt("mallory")
+        assert second.authenticate("mallory", "guess")[2] == "Account temporarily locked due to too many failed attempts"
+        assert not second._is_brute_force_attempt("alice")
+
+    def test_success_clears_failures(self, temp_db):
+        """Test that a successful login resets the count"""
+        service = AuthService()
+        for _ in range(3):
+            service._record_login_attempt("alice", False)
+        service._record_login_attempt("alice", True)
+
+        assert not service._is_brute_force_attempt("alice")
+
+    def test_window_slides_and_table_is_bounded(self, temp_db):
+        """Test that failures outside the window are ignored and pruned, and old rows are capped"""
+        entities.LoginAttempt.record_failure("mallory", window=300)
+        with patch.object(entities.time, 'time', return_value=time.time() + 301):
+            assert entities.LoginAttempt.count_recent("mallory", window=300) == 0
+            for name in ("a", "b", "c"):
+                entities.LoginAttempt.record_failure(name, window=300, max_tracked=2)
+
+        rows = entities.db_manager.execute_query("SELECT username FROM login_attempts ORDER BY id")
+        assert [row['username'] for row in rows] == ["b", "c"]
+
+class TestAsyncAuthentication:
+    """Test cases for the event loop login and user creation paths"""
+
+    def test_create_user_and_login(self, temp_db):
+        """Test that users created asynchronously can log in asynchronously"""
+        config_service = Mock(get_auth_config=Mock(return_value={"session_management": {"session_timeout": 600}}))
+        service = AuthService(config_service=config_service)
+
+        async def run():
+            created = await service.create_user_async("alice", "secret")
+            duplicate = await service.create_user_async("alice", "other")
+            login = await service.authenticate_async("alice", "secret")
+            wrong = await service.authenticate_async("alice", "guess")
+            return created, duplicate, login, wrong
+
+        created, duplicate, login, wrong = asyncio.run(run())
+
+        assert created[0] and duplicate == (False, None, "Username 'alice' already exists")
+        assert login[0] and entities.Session.get_by_session_id(login[1]) is not None
+        assert wrong == (False, None, "Invalid credentials")
+        assert entities.LoginAttempt.count_recent("alice", window=300) == 1
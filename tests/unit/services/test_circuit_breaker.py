@@ -0,0 +1,122 @@
+"""
+Unit tests for the provider circuit breaker
+"""
+
+import time
+import asyncio
+import pytest
+
+from backend.services.circuit_breaker import (
+    CircuitBreaker, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+)
+from backend.services.llm_providers import LLMProvider, ProviderError, ProviderResponse
+from backend.services.llm_retry import RetryPolicy, call_with_retry_async
+
+class _Provider(LLMProvider):
+    """Provider whose async calls run a given coroutine function"""
+
+    name = "test"
+
+    def __init__(self, call):
+        super().__init__("model")
+        self.breaker = CircuitBreaker("test", window_size=4, minimum_calls=4)
+        self.call = call
+
+    async def _complete_async(self, params, timeout):
+        return await self.call()
+
+class TestCircuitBreaker:
+    """Test cases for circuit state transitions"""
+
+    def test_opens_on_failure_rate(self):
+        """Test that the circuit opens once enough recent calls fail"""
+        breaker = CircuitBreaker("test", failure_rate_threshold=0.5, window_size=4, minimum_calls=4)
+        for failed in (False, True, False):
+            assert breaker.allow_request()
+            if failed:
+                breaker.record_failure(0.1)
+            else:
+                breaker.record_success(0.1)
+        assert breaker.state == STATE_CLOSED
+
+        breaker.record_failure(0.1)
+        assert breaker.state == STATE_OPEN
+        assert breaker.allow_request() is False
+        assert breaker.get_stats()["rejected"] == 1
+
+    def test_opens_on_slow_calls(self):
+        """Test that successful but slow calls also open the circuit"""
+        breaker = CircuitBreaker("test", slow_call_threshold=1.0, slow_call_rate_threshold=0.5,
+                                 window_size=2, minimum_calls=2)
+        breaker.record_success(2.0)
+        breaker.record_success(3.0)
+        assert breaker.state == STATE_OPEN
+
+    def test_half_open_trial_closes_circuit(self):
+        """Test that a successful trial call after the open period closes the circuit"""
+        breaker = CircuitBreaker("test", window_size=1, minimum_calls=1, open_duration=0.05)
+        breaker.record_failure(0.1)
+        assert breaker.state == STATE_OPEN
+
+        time.sleep(0.06)
+        assert breaker.state == STATE_HALF_OPEN
+        assert breaker.allow_request() is True
+        # Only one trial call at a time
+        assert breaker.allow_request() is False
+        breaker.record_success(0.1)
+        assert breaker.state == STATE_CLOSED
+
+    def test_half_open_failure_reopens_circuit(self):
+        """Test that a failed trial call reopens the circuit"""
+        breaker = CircuitBreaker("test", window_size=1, minimum_calls=1, open_duration=0.05)
+        breaker.record_failure(0.1)
+        time.sleep(0.06)
+        assert breaker.allow_request() is True
+        breaker.record_failure(0.1)
+        assert breaker.state == STATE_OPEN
+        assert breaker.get_stats()["times_opened"] == 2
+        assert breaker.retry_after() >= 1
+
+class TestProviderOutcomes:
+    """Test cases for which provider errors count against the circuit"""
+
+    def test_cancelled_calls_leave_circuit_closed(self):
+        """Test that calls cancelled by their caller are not recorded as failures"""
+        provider = _Provider(lambda: asyncio.sleep(10))
+
+        async def run():
+            tasks = [asyncio.create_task(provider.complete_async({}, 10)) for _ in range(6)]
+            await asyncio.sleep(0.01)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(run())
+        assert provider.breaker.state == STATE_CLOSED
+        assert provider.breaker.allow_request()
+
+    @pytest.mark.parametrize("status_code, counted", [(400, False), (401, False), (429, True), (503, True), (None, True)])
+    def test_only_provider_errors_count(self, status_code, counted):
+        """Test that bad requests are not failures while 429, 5xx and transport errors are"""
+        async def fail():
+            raise ProviderError("error", status_code=status_code)
+        provider = _Provider(fail)
+
+        async def run():
+            for _ in range(4):
+                with pytest.raises(ProviderError):
+                    await provider.complete_async({}, 10)
+
+        asyncio.run(run())
+        assert provider.breaker.state == (STATE_OPEN if counted else STATE_CLOSED)
+
+    def test_attempt_timeout_counts_as_failure(self):
+        """Test that the retry layer's per-attempt timeout is recorded against the provider"""
+        provider = _Provider(lambda: asyncio.sleep(10))
+        policy = RetryPolicy(request_timeout=0.01, deadline=0.2, max_timeout_retries=3, retry_delay=0.001, max_backoff=0.001)
+
+        with pytest.raises(Exception):
+            asyncio.run(call_with_retry_async(lambda timeout: provider.complete_async({}, timeout), policy,
+                                              on_timeout=provider.record_timeout))
+
+        assert provider.breaker.state == STATE_OPEN
@@ -0,0 +1,196 @@
+"""
+Unit tests for batch evaluation dispatch
+"""
+
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, Mock, AsyncMock
+
+from backend.services.evaluation_batches import BatchDispatcher, EvaluationJob, Submission
+from backend.services.llm_service import get_llm_service, reset_llm_service
+from backend.services.llm_cache import get_evaluation_cache
+from backend.services.llm_retry import LLMDeadlineExceededError
+
+SAMPLE_TEXTS = [
+    "This memo proposes moving our quarterly planning to a rolling forecast. "
+    "The current process takes six weeks and is outdated by the time it is approved.",
+    "We recommend consolidating our three vendor contracts into one agreement. "
+    "This reduces overhead and gives us leverage in the next renewal cycle.",
+    "Este memorando propone trasladar la planificación trimestral a un pronóstico continuo. "
+    "El proceso actual tarda seis semanas y queda obsoleto antes de aprobarse."
+]
+
+@pytest.fixture
+def temp_db(temp_db):
+    """Scratch database with a fresh LLM service and an empty evaluation cache"""
+    reset_llm_service()
+    get_evaluation_cache().clear()
+    yield temp_db
+    reset_llm_service()
+
+def _create_batch(texts, batch_id="batch-1"):
+    submissions = Submission.create_many(texts, "session-1")
+    jobs = EvaluationJob.create_many([submission.id for submission in submissions], batch_id, user_id=1)
+    return list(zip(jobs, submissions))
+
+class _AsyncResults:
+    """Async iterable standing in for the SDK's batch results stream"""
+
+    def __init__(self, entries):
+        self._entries = list(entries)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._entries:
+            raise StopAsyncIteration
+        return self._entries.pop(0)
+
+def _succeeded(custom_id, text):
+    message = SimpleNamespace(content=[SimpleNamespace(text=text)])
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message))
+
+class TestBulkCreation:
+    """Test cases for the bulk entity helpers"""
+
+    def test_create_many_submissions_in_order(self, temp_db):
+        """Test that bulk-created submissions get consecutive IDs and keep their text"""
+        submissions = Submission.create_many(SAMPLE_TEXTS, "session-1")
+
+        assert [submission.id for submission in submissions] == list(
+            range(submissions[0].id, submissions[0].id + len(SAMPLE_TEXTS))
+        )
+        assert Submission.get_by_id(submissions[2].id).text_content == SAMPLE_TEXTS[2]
+
+    def test_batch_jobs_are_listed_in_submission_order(self, temp_db):
+        """Test that a batch's jobs can be read back for progress reporting"""
+        items = _create_batch(SAMPLE_TEXTS)
+
+        jobs = EvaluationJob.get_by_batch("batch-1")
+        assert [job.id for job in jobs] == [job.id for job, _ in items]
+        assert all(job.status == EvaluationJob.STATUS_QUEUED for job in jobs)
+
+class TestLocalDispatch:
+    """Test cases for the local stand-in used in mock mode"""
+
+    def test_completes_every_item(self, temp_db):
+        """Test that every item is evaluated and bulk-stored"""
+        items = _create_batch(SAMPLE_TEXTS)
+        dispatcher = BatchDispatcher(concurrency=2, flush_size=2, use_provider_batch_api=False)
+
+        asyncio.run(dispatcher.run("batch-1", items))
+
+        jobs = EvaluationJob.get_by_batch("batch-1")
+        assert all(job.status == EvaluationJob.STATUS_COMPLETED for job in jobs)
+        assert len({job.evaluation_id for job in jobs}) == len(SAMPLE_TEXTS)
+
+    def test_failed_item_does_not_affect_others(self, temp_db):
+        """Test that an LLM error is recorded on its own item only"""
+        items = _create_batch(SAMPLE_TEXTS[:2])
+        service = get_llm_service()
+        original = service.evaluate_prepared_async
+        failing_text = SAMPLE_TEXTS[1]
+
+        async def evaluate(prepared, *args, **kwargs):
+            if failing_text in prepared.prompt:
+                raise LLMDeadlineExceededError(15)
+            return await original(prepared, *args, **kwargs)
+
+        with patch.object(service, 'evaluate_prepared_async', side_effect=evaluate):
+            asyncio.run(BatchDispatcher(use_provider_batch_api=False).run("batch-1", items))
+
+        first, second = EvaluationJob.get_by_batch("batch-1")
+        assert first.status == EvaluationJob.STATUS_COMPLETED
+        assert second.status == EvaluationJob.STATUS_FAILED
+        assert json.loads(second.error)["code"] == "LLM_TIMEOUT"
+
+    def test_failed_preparation_fails_every_item(self, temp_db):
+        """Test that a batch that cannot be prepared leaves no item running"""
+        items = _create_batch(SAMPLE_TEXTS[:2])
+        service = get_llm_service()
+
+        with patch.object(service, 'prepare_evaluation', side_effect=RuntimeError("template missing")):
+            with pytest.raises(RuntimeError):
+                asyncio.run(BatchDispatcher(use_provider_batch_api=False).run("batch-1", items))
+
+        jobs = EvaluationJob.get_by_batch("batch-1")
+        assert all(job.status == EvaluationJob.STATUS_FAILED for job in jobs)
+        assert all(json.loads(job.error)["details"] == "template missing" for job in jobs)
+
+    def test_failed_dispatch_keeps_finished_items(self, temp_db):
+        """Test that items buffered before a dispatch failure are stored and the rest are failed"""
+        items = _create_batch(SAMPLE_TEXTS[:2])
+        dispatcher = BatchDispatcher(use_provider_batch_api=False)
+
+        async def run_local(llm_service, group, buffer):
+            job, prepared = group[0]
+            await buffer.add(job, await llm_service.evaluate_prepared_async(prepared, job.priority))
+            raise RuntimeError("boom")
+
+        with patch.object(dispatcher, '_run_local', side_effect=run_local):
+            with pytest.raises(RuntimeError):
+                asyncio.run(dispatcher.run("batch-1", items))
+
+        finished, pending = EvaluationJob.get_by_batch("batch-1")
+        assert finished.status == EvaluationJob.STATUS_COMPLETED
+        assert pending.status == EvaluationJob.STATUS_FAILED
+        assert json.loads(pending.error)["code"] == "LLM_ERROR"
+
+class TestProviderBatchDispatch:
+    """Test cases for dispatch through the provider's Message Batches API"""
+
+    def _mock_batches(self, service, results):
+        batches = Mock()
+        batches.create = AsyncMock(return_value=SimpleNamespace(id="msgbatch_1", processing_status="in_progress"))
+        batches.retrieve = AsyncMock(return_value=SimpleNamespace(id="msgbatch_1", processing_status="ended"))
+        batches.results = AsyncMock(side_effect=lambda batch_id: _AsyncResults(results()))
+        service.async_client = Mock()
+        service.async_client.messages.batches = batches
+        return batches
+
+    def test_groups_by_language_and_stores_results(self, temp_db):
+        """Test that one provider batch is created per language and results are stored"""
+        items = _create_batch(SAMPLE_TEXTS)
+        service = get_llm_service()
+        submitted = []
+
+        def results():
+            request = submitted.pop(0)
+            return [_succeeded(entry["custom_id"], service._generate_mock_response(language))
+                    for entry, language in request]
+
+        batches = self._mock_batches(service, results)
+
+        async def create(requests):
+            prepared_by_id = {job.id: service.prepare_evaluation(submission.text_content) for job, submission in items}
+            submitted.append([(entry, prepared_by_id[entry["custom_id"]].language) for entry in requests])
+            return SimpleNamespace(id="msgbatch_1", processing_status="in_progress")
+
+        batches.create.side_effect = create
+
+        asyncio.run(BatchDispatcher(poll_interval=0).run("batch-1", items))
+
+        assert batches.create.await_count == 2
+        jobs = EvaluationJob.get_by_batch("batch-1")
+        assert all(job.status == EvaluationJob.STATUS_COMPLETED for job in jobs)
+
+    def test_falls_back_to_local_when_batch_creation_fails(self, temp_db):
+        """Test that items are evaluated locally if the provider batch cannot be created"""
+        items = _create_batch(SAMPLE_TEXTS[:2])
+        service = get_llm_service()
+        batches = self._mock_batches(service, lambda: [])
+        batches.create.side_effect = RuntimeError("batches unavailable")
+        message = SimpleNamespace(content=[SimpleNamespace(text=service._generate_mock_response(
+            service.prepare_evaluation(SAMPLE_TEXTS[0]).language
+        ))], usage=None)
+        service.async_client.messages.create = AsyncMock(return_value=message)
+
+        asyncio.run(BatchDispatcher(poll_interval=0).run("batch-1", items))
+
+        batches.create.assert_awaited_once()
+        assert service.async_client.messages.create.await_count == 2
+        jobs = EvaluationJob.get_by_batch("batch-1")
+        assert all(job.status == EvaluationJob.STATUS_COMPLETED for job in jobs)
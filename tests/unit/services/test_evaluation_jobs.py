@@ -0,0 +1,222 @@
+"""
+Unit tests for asynchronous evaluation jobs
+"""
+
+import sys
+import json
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock, Mock
+
+from backend.services.evaluation_jobs import (
+    EvaluationJobWorker, EvaluationJob, Evaluation, Submission, store_evaluation, load_raw_prompt,
+    validate_callback_url, CallbackURLError
+)
+from backend.services.llm_service import get_llm_service, reset_llm_service
+from backend.services.llm_cache import get_evaluation_cache
+from backend.services.llm_retry import LLMDeadlineExceededError
+
+SAMPLE_TEXT = (
+    "This memo proposes moving our quarterly planning to a rolling forecast. "
+    "The current process takes six weeks and is outdated by the time it is approved."
+)
+
+LONG_TEXT = "\n\n".join(
+    f"Section {index}. This memo proposes that we invest in a second production line to expand capacity. " * 6
+    for index in range(30)
+)
+
+@pytest.fixture
+def temp_db(temp_db):
+    """Scratch database with a fresh LLM service and an empty evaluation cache"""
+    reset_llm_service()
+    get_evaluation_cache().clear()
+    yield temp_db
+    reset_llm_service()
+
+def _run_jobs(worker, jobs):
+    async def run():
+        for job in jobs:
+            worker.submit(job)
+        await worker.join()
+        await worker.stop()
+    asyncio.run(run())
+
+class TestEvaluationJobWorker:
+    """Test cases for the background evaluation worker pool"""
+
+    def test_completes_job_and_stores_evaluation(self, temp_db):
+        """Test that a queued job is evaluated and linked to its stored evaluation"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1)
+        worker = EvaluationJobWorker(num_workers=2)
+
+        _run_jobs(worker, [job])
+
+        stored = EvaluationJob.get_by_id(job.id)
+        assert stored.status == EvaluationJob.STATUS_COMPLETED
+        assert stored.evaluation_id is not None
+        assert stored.completed_at is not None
+        assert worker.get_stats()["completed"] == 1
+
+    def test_failed_job_records_error(self, temp_db):
+        """Test that LLM failures are stored as a structured error"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1)
+        worker = EvaluationJobWorker(num_workers=1)
+
+        with patch('backend.services.llm_service.EnhancedLLMService.evaluate_text_with_llm_async',
+                   AsyncMock(side_effect=LLMDeadlineExceededError(15))):
+            _run_jobs(worker, [job])
+
+        stored = EvaluationJob.get_by_id(job.id)
+        assert stored.status == EvaluationJob.STATUS_FAILED
+        assert json.loads(stored.error)["code"] == "LLM_TIMEOUT"
+
+    def test_callback_receives_result_without_raw_data(self, temp_db):
+        """Test that the callback URL is notified with the job outcome"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1, callback_url="http://example.test/hook")
+        worker = EvaluationJobWorker(num_workers=1)
+        delivered = []
+
+        with patch.object(worker, '_post_callback', side_effect=lambda url, body: delivered.append((url, body)) or 200):
+            _run_jobs(worker, [job])
+
+        assert len(delivered) == 1
+        url, body = delivered[0]
+        payload = json.loads(body)
+        assert url == "http://example.test/hook"
+        assert payload["status"] == "completed"
+        assert payload["evaluation_id"] == EvaluationJob.get_by_id(job.id).evaluation_id
+        assert "raw_prompt" not in payload["evaluation"]["metadata"]
+
+    def test_claimed_job_is_not_run_twice(self, temp_db):
+        """Test that only one worker can claim a job"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1)
+        duplicate = EvaluationJob.get_by_id(job.id)
+
+        assert job.claim() is True
+        assert duplicate.claim() is False
+
+    def test_recover_requeues_pending_jobs(self, temp_db):
+        """Test that queued jobs left by a previous process are picked up"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1)
+        worker = EvaluationJobWorker(num_workers=1)
+
+        async def run():
+            assert worker.recover() == 1
+            await worker.join()
+            await worker.stop()
+        asyncio.run(run())
+
+        assert EvaluationJob.get_by_id(job.id).status == EvaluationJob.STATUS_COMPLETED
+
+class TestCallbackURLValidation:
+    """Test cases for rejecting callback URLs that reach internal services"""
+
+    @pytest.mark.parametrize("url", [
+        "http://127.0.0.1/hook", "http://10.0.0.5/hook", "http://192.168.1.1:8080/hook",
+        "http://169.254.169.254/latest/meta-data", "http://[::1]/hook", "http://0.0.0.0/hook",
+        "http://224.0.0.1/hook", "ftp://93.184.216.34/hook", "http:///hook"
+    ])
+    def test_internal_and_invalid_urls_are_rejected(self, url):
+        """Test that non-public addresses and non-http(s) URLs are refused"""
+        with pytest.raises(CallbackURLError):
+            validate_callback_url(url)
+
+    def test_public_address_is_accepted(self):
+        """Test that a URL resolving to a public address passes"""
+        validate_callback_url("https://93.184.216.34/hook")
+
+    def test_allowed_hosts_restrict_targets(self):
+        """Test that a configured allowlist accepts only listed hosts and their subdomains"""
+        allowed = ["hooks.internal"]
+        validate_callback_url("http://hooks.internal/done", allowed)
+        validate_callback_url("http://eu.hooks.internal/done", allowed)
+        with pytest.raises(CallbackURLError):
+            validate_callback_url("http://93.184.216.34/hook", allowed)
+
+    def test_refused_callback_is_not_sent(self, temp_db):
+        """Test that a job whose callback points inside the network is never POSTed"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        job = EvaluationJob.create(submission.id, user_id=1, callback_url="http://127.0.0.1:8000/admin")
+        worker = EvaluationJobWorker(num_workers=1)
+        worker._opener = Mock()
+
+        _run_jobs(worker, [job])
+
+        worker._opener.open.assert_not_called()
+        assert EvaluationJob.get_by_id(job.id).status == EvaluationJob.STATUS_COMPLETED
+
+class TestRawDataStorage:
+    """Test cases for storing prompts as template references and compressed responses"""
+
+    def _evaluate_and_store(self, text):
+        submission = Submission.create(text, "session-1")
+        result = get_llm_service().evaluate_text_with_llm(text)
+        return store_evaluation(submission.id, result, 1), result['metadata']
+
+    def _row(self, evaluation_id):
+        entities = sys.modules[Evaluation.__module__]
+        return entities.db_manager.execute_query(
+            "SELECT raw_prompt, raw_response, response_encoding FROM evaluations WHERE id = ?", (evaluation_id,)
+        )[0]
+
+    def test_prompt_is_rebuilt_from_template(self, temp_db):
+        """Test that the stored template reference rebuilds the exact prompt"""
+        evaluation, metadata = self._evaluate_and_store(SAMPLE_TEXT)
+
+        assert evaluation.raw_prompt is None
+        assert evaluation.prompt_template_hash == metadata['prompt_template']
+        assert evaluation.debug_enabled is True
+        assert load_raw_prompt(evaluation, SAMPLE_TEXT) == metadata['raw_prompt']
+
+    def test_chunked_prompt_is_rebuilt_from_spans(self, temp_db):
+        """Test that chunk offsets rebuild the prompts of every chunk"""
+        evaluation, metadata = self._evaluate_and_store(LONG_TEXT)
+
+        assert len(evaluation.prompt_parts) == metadata['chunk_count'] > 1
+        assert load_raw_prompt(evaluation, LONG_TEXT) == metadata['raw_prompt']
+
+    def test_templates_are_deduplicated_and_responses_compressed(self, temp_db):
+        """Test that evaluations share one template row and store the response compressed"""
+        first, metadata = self._evaluate_and_store(SAMPLE_TEXT)
+        second, _ = self._evaluate_and_store(SAMPLE_TEXT + " It also covers hiring.")
+        entities = sys.modules[Evaluation.__module__]
+        templates = entities.db_manager.execute_query("SELECT template_hash FROM prompt_templates")
+
+        assert [row['template_hash'] for row in templates] == [first.prompt_template_hash]
+        assert second.prompt_template_hash == first.prompt_template_hash
+        row = self._row(first.id)
+        assert row['response_encoding'] == "zlib"
+        assert isinstance(row['raw_response'], bytes)
+        assert Evaluation.get_by_id(first.id).raw_response == metadata['raw_response']
+
+    def test_raw_data_follows_debug_settings(self, temp_db):
+        """Test that nothing raw is stored when debug storage is turned off"""
+        debug_settings = get_llm_service().llm_config.debug_settings
+        with patch.dict(debug_settings, {'store_raw_prompts': False, 'store_raw_responses': False}):
+            evaluation, _ = self._evaluate_and_store(SAMPLE_TEXT)
+
+        assert evaluation.prompt_template_hash is None
+        assert evaluation.raw_response is None
+        assert evaluation.debug_enabled is False
+        assert load_raw_prompt(evaluation, SAMPLE_TEXT) is None
+
+    def test_legacy_rows_are_read_unchanged(self, temp_db):
+        """Test that rows written before compression keep their text prompt and response"""
+        submission = Submission.create(SAMPLE_TEXT, "session-1")
+        evaluation = Evaluation.create(submission.id, 4.0, "[]", "[]", "{}", "[]",
+                                       raw_prompt="Full prompt", raw_response="Full response")
+        entities = sys.modules[Evaluation.__module__]
+        entities.db_manager.execute_update(
+            "UPDATE evaluations SET raw_response = ?, response_encoding = NULL WHERE id = ?",
+            ("Full response", evaluation.id)
+        )
+
+        stored = Evaluation.get_by_id(evaluation.id)
+        assert stored.raw_response == "Full response"
+        assert load_raw_prompt(stored, SAMPLE_TEXT) == "Full prompt"
@@ -0,0 +1,44 @@
+"""
+Unit tests for the incremental JSON parser
+"""
+
+import json
+
+from backend.services.incremental_json import IncrementalJSONParser
+
+DOCUMENT = {
+    "overall_score": 4.2,
+    "strengths": ["Clear {structure}", "Uses \"quoted\" evidence, well"],
+    "rubric_scores": {"structure": {"score": 4, "justification": "Good, [mostly]"}},
+    "segment_feedback": [{"segment": "Intro", "comment": "Strong"}]
+}
+
+class TestIncrementalJSONParser:
+    """Test cases for streaming member extraction"""
+
+    def test_emits_members_as_they_complete(self):
+        """Test that each top-level member is emitted once its terminator arrives"""
+        text = json.dumps(DOCUMENT)
+        parser = IncrementalJSONParser()
+        emitted = []
+        for i in range(len(text)):
+            for key, value in parser.feed(text[i]):
+                emitted.append((key, value, i))
+
+        assert [key for key, _, _ in emitted] == list(DOCUMENT.keys())
+        assert dict((key, value) for key, value, _ in emitted) == DOCUMENT
+        # overall_score is available long before the document ends
+        assert emitted[0][2] < len(text) // 10
+        assert parser.done
+
+    def test_ignores_leading_text_and_code_fences(self):
+        """Test that text before the opening brace is skipped"""
+        parser = IncrementalJSONParser()
+        events = parser.feed("Here is the evaluation:\n```json\n" + json.dumps({"overall_score": 3}) + "\n```")
+        assert events == [("overall_score", 3)]
+
+    def test_incomplete_member_is_not_emitted(self):
+        """Test that a partially received member is held back"""
+        parser = IncrementalJSONParser()
+        assert parser.feed('{"overall_score": 4, "strengths": ["Clear') == [("overall_score", 4)]
+        assert parser.feed('"]}') == [("strengths", ["Clear"])]
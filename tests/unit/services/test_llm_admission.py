@@ -0,0 +1,117 @@
+"""
+Unit tests for LLM admission control
+"""
+
+import asyncio
+import pytest
+
+from backend.services.llm_admission import (
+    AdmissionController, LLMQueueFullError,
+    PRIORITY_ADMIN, PRIORITY_SHORT_TEXT, PRIORITY_NORMAL
+)
+
+class TestAdmissionController:
+    """Test cases for the bounded priority limiter"""
+
+    def test_limits_concurrency(self):
+        """Test that no more than max_concurrent callers hold a slot"""
+        controller = AdmissionController(max_concurrent=2, queue_size=10)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.get_stats()["active"])
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(6)))
+
+        asyncio.run(run())
+        assert peak == 2
+        stats = controller.get_stats()
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+        assert stats["admitted"] == 6
+
+    def test_rejects_when_queue_full(self):
+        """Test that overflow beyond the queue fails fast with a retry hint"""
+        controller = AdmissionController(max_concurrent=1, queue_size=1)
+
+        async def run():
+            release = asyncio.Event()
+
+            async def holder():
+                async with controller.slot():
+                    await release.wait()
+
+            tasks = [asyncio.create_task(holder()) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(LLMQueueFullError) as exc_info:
+                await controller.acquire()
+            release.set()
+            await asyncio.gather(*tasks)
+            return exc_info.value
+
+        error = asyncio.run(run())
+        assert error.retry_after >= 1
+        assert controller.get_stats()["rejected"] == 1
+
+    def test_priority_order(self):
+        """Test that waiting admins and short texts are admitted before normal requests"""
+        controller = AdmissionController(max_concurrent=1, queue_size=10)
+        order = []
+
+        async def run():
+            await controller.acquire()
+
+            async def waiter(name, priority):
+                async with controller.slot(priority):
+                    order.append(name)
+
+            tasks = [
+                asyncio.create_task(waiter("normal", PRIORITY_NORMAL)),
+                asyncio.create_task(waiter("short", PRIORITY_SHORT_TEXT)),
+                asyncio.create_task(waiter("admin", PRIORITY_ADMIN)),
+            ]
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == ["admin", "short", "normal"]
+
+    def test_cancelled_waiter_frees_queue_position(self):
+        """Test that a cancelled waiter does not leak a slot or queue entry"""
+        controller = AdmissionController(max_concurrent=1, queue_size=1)
+
+        async def run():
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            controller.release()
+
+        asyncio.run(run())
+        stats = controller.get_stats()
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+
+    def test_configure_off_loop_wakes_waiters_on_loop(self):
+        """Test that raised limits from another thread admit waiters only from the event loop"""
+        controller = AdmissionController(max_concurrent=1, queue_size=10)
+
+        async def run():
+            await controller.acquire()
+            waiters = [asyncio.create_task(controller.acquire()) for _ in range(2)]
+            await asyncio.sleep(0)
+            await asyncio.to_thread(controller.configure, 3, 10, True)
+            woken_off_loop = any(waiter.done() for waiter in waiters)
+            controller.release()
+            await asyncio.gather(*waiters)
+            return woken_off_loop
+
+        assert asyncio.run(run()) is False
+        assert controller.get_stats()["active"] == 2
@@ -0,0 +1,97 @@
+"""
+Unit tests for the evaluation result cache
+"""
+
+import pytest
+from unittest.mock import patch
+
+from backend.services.llm_cache import EvaluationCache, make_cache_key, normalize_text
+
+class TestCacheKey:
+    """Test cases for content-addressed cache keys"""
+
+    def test_whitespace_insensitive(self):
+        """Test that whitespace-only differences map to the same key"""
+        first = make_cache_key("Hello   world\n", "en", "v1", "model", 0.1)
+        second = make_cache_key("  Hello world", "en", "v1", "model", 0.1)
+        assert first == second
+
+    def test_key_components(self):
+        """Test that language, template version, model and temperature all change the key"""
+        base = make_cache_key("text", "en", "v1", "model", 0.1)
+        assert base != make_cache_key("text", "es", "v1", "model", 0.1)
+        assert base != make_cache_key("text", "en", "v2", "model", 0.1)
+        assert base != make_cache_key("text", "en", "v1", "other", 0.1)
+        assert base != make_cache_key("text", "en", "v1", "model", 0.2)
+
+    def test_normalize_text(self):
+        """Test text normalization"""
+        assert normalize_text(" a\tb\n\nc ") == "a b c"
+
+class TestEvaluationCache:
+    """Test cases for the LRU+TTL cache"""
+
+    def test_hit_and_miss(self):
+        """Test basic get/set with hit and miss counters"""
+        cache = EvaluationCache(max_size=10, ttl=60)
+        assert cache.get("k") is None
+        cache.set("k", {"parsed": {"overall_score": 4}})
+        assert cache.get("k") == {"parsed": {"overall_score": 4}}
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = EvaluationCache(max_size=2, ttl=60)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")
+        cache.set("c", {"v": 3})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned"""
+        cache = EvaluationCache(max_size=10, ttl=60)
+        with patch('backend.services.llm_cache.time.time', return_value=1000.0):
+            cache.set("k", {"v": 1})
+        with patch('backend.services.llm_cache.time.time', return_value=1061.0):
+            assert cache.get("k") is None
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        """Test that entries are served from SQLite after the memory tier is gone"""
+        path = str(tmp_path / "cache.db")
+        cache = EvaluationCache(max_size=10, ttl=60, persistent_path=path)
+        cache.set("k", {"v": 1})
+
+        restarted = EvaluationCache(max_size=10, ttl=60, persistent_path=path)
+        assert restarted.get("k") == {"v": 1}
+        assert restarted.get_stats()["persistent_hits"] == 1
+        # Promoted into memory
+        assert restarted.get("k") == {"v": 1}
+        assert restarted.get_stats()["hits"] == 1
+
+    def test_expired_rows_are_pruned_at_most_once_per_interval(self, tmp_path):
+        """Test that persistent writes only delete expired rows once per prune interval"""
+        cache = EvaluationCache(max_size=10, ttl=10, persistent_path=str(tmp_path / "cache.db"))
+        count = lambda: cache._db.execute("SELECT COUNT(*) FROM evaluation_cache").fetchone()[0]
+        with patch('backend.services.llm_cache.time.time', return_value=1000.0):
+            cache.set("old", {"v": 1})
+        with patch('backend.services.llm_cache.time.time', return_value=1020.0):
+            cache.set("a", {"v": 2})
+            # "old" has expired but the last prune was less than an interval ago
+            assert count() == 2
+            assert cache.get("old") is None
+        with patch('backend.services.llm_cache.time.time', return_value=1070.0):
+            cache.set("b", {"v": 3})
+            assert count() == 1
+
+    def test_persistent_tier_indexes_expiry(self, tmp_path):
+        """Test that the prune query can use an index on expires_at"""
+        cache = EvaluationCache(max_size=10, ttl=60, persistent_path=str(tmp_path / "cache.db"))
+        plan = cache._db.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM evaluation_cache WHERE expires_at <= ?", (0,)
+        ).fetchall()
+        assert any("idx_evaluation_cache_expires" in row[-1] for row in plan)
@@ -0,0 +1,97 @@
+"""
+Unit tests for the LLM retry engine
+"""
+
+import asyncio
+import pytest
+import anthropic
+from unittest.mock import patch, Mock
+
+from backend.services.llm_retry import (
+    RetryPolicy, RetryStats, LLMDeadlineExceededError, call_with_retry, call_with_retry_async,
+    classify_error, ERROR_RATE_LIMIT, ERROR_OVERLOADED, ERROR_TIMEOUT, ERROR_SERVER, ERROR_FATAL
+)
+
+def make_status_error(status_code, headers=None):
+    """Build an Anthropic status error for the given HTTP status"""
+    response = Mock(status_code=status_code, headers=headers or {})
+    error_classes = {
+        429: anthropic.RateLimitError,
+        400: anthropic.BadRequestError,
+    }
+    error_class = error_classes.get(status_code, anthropic.InternalServerError)
+    return error_class(f"HTTP {status_code}", response=response, body=None)
+
+def fast_policy(**overrides):
+    """Retry policy with negligible delays for tests"""
+    settings = dict(max_retries=3, retry_delay=0.001, rate_limit_delay=0.001, max_backoff=0.001,
+                    max_rate_limit_retries=2, max_timeout_retries=1, deadline=5)
+    settings.update(overrides)
+    return RetryPolicy(**settings)
+
+class TestClassifyError:
+    """Test cases for error classification"""
+
+    def test_classification(self):
+        assert classify_error(make_status_error(429)) == ERROR_RATE_LIMIT
+        assert classify_error(make_status_error(529)) == ERROR_OVERLOADED
+        assert classify_error(make_status_error(503)) == ERROR_SERVER
+        assert classify_error(make_status_error(400)) == ERROR_FATAL
+        assert classify_error(asyncio.TimeoutError()) == ERROR_TIMEOUT
+        assert classify_error(ValueError("bad")) == ERROR_FATAL
+
+class TestCallWithRetry:
+    """Test cases for the retry loop"""
+
+    def test_retries_transient_errors(self):
+        """Test that overloaded errors are retried and recorded"""
+        func = Mock(side_effect=[make_status_error(529), make_status_error(503), "ok"])
+        stats = RetryStats()
+        assert call_with_retry(func, fast_policy(), stats) == "ok"
+        assert stats.attempts == 3
+        assert stats.retries == 2
+        assert stats.errors == [ERROR_OVERLOADED, ERROR_SERVER]
+
+    def test_fatal_errors_are_not_retried(self):
+        """Test that client errors propagate immediately"""
+        func = Mock(side_effect=make_status_error(400))
+        with pytest.raises(anthropic.BadRequestError):
+            call_with_retry(func, fast_policy())
+        assert func.call_count == 1
+
+    def test_per_class_budget(self):
+        """Test that timeouts stop after max_timeout_retries"""
+        func = Mock(side_effect=anthropic.APITimeoutError(request=Mock()))
+        with pytest.raises(anthropic.APITimeoutError):
+            call_with_retry(func, fast_policy(max_timeout_retries=1))
+        assert func.call_count == 2
+
+    def test_deadline_stops_long_backoff(self):
+        """Test that a Retry-After beyond the deadline fails fast"""
+        func = Mock(side_effect=make_status_error(429, headers={"retry-after": "60"}))
+        with patch('backend.services.llm_retry.time.sleep') as mock_sleep:
+            with pytest.raises(LLMDeadlineExceededError):
+                call_with_retry(func, fast_policy(deadline=15))
+        mock_sleep.assert_not_called()
+        assert func.call_count == 1
+
+    def test_attempt_timeout_bounded_by_deadline(self):
+        """Test that each attempt gets at most the remaining deadline"""
+        func = Mock(return_value="ok")
+        call_with_retry(func, fast_policy(deadline=2, request_timeout=30))
+        timeout = func.call_args[0][0]
+        assert 0 < timeout <= 2
+
+    def test_async_retry(self):
+        """Test the async retry loop"""
+        calls = []
+
+        async def func(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                raise make_status_error(529)
+            return "ok"
+
+        stats = RetryStats()
+        assert asyncio.run(call_with_retry_async(func, fast_policy(), stats)) == "ok"
+        assert stats.to_dict()["retries"] == 1
@@ -0,0 +1,576 @@
+"""
+Unit tests for the enhanced LLM service
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import pytest
+from unittest.mock import patch, Mock, AsyncMock
+
+import backend.services.llm_service as llm_service_module
+from backend.services.llm_service import EnhancedLLMService, get_llm_service, reset_llm_service
+from backend.services.circuit_breaker import get_circuit_breaker, reset_circuit_breakers, CircuitOpenError
+from backend.services.llm_providers import OpenAIProvider, ProviderResponse
+from backend.services.llm_cache import get_evaluation_cache
+from backend.services.model_router import ModelRouter
+
+REPO_CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config')
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Copy the repository configuration into a temporary directory"""
+    for name in ('prompt.yaml', 'llm.yaml', 'response_template.yaml', 'auth.yaml', 'deployment.yaml'):
+        shutil.copy(os.path.join(REPO_CONFIG_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+@pytest.fixture(autouse=True)
+def mock_mode():
+    """Run without an API key and with a fresh global instance that checks its config on every call"""
+    with patch.dict(os.environ, {'CLAUDE_API_KEY': '', 'FALLBACK_API_KEY': ''}), \
+            patch.object(llm_service_module, 'CONFIG_CHECK_INTERVAL', 0):
+        reset_llm_service()
+        reset_circuit_breakers()
+        get_evaluation_cache().clear()
+        yield
+        reset_llm_service()
+        reset_circuit_breakers()
+
+class TestGetLLMService:
+    """Test cases for the shared LLM service accessor"""
+
+    def test_returns_same_instance(self, config_dir):
+        """Test that repeated calls reuse the same instance"""
+        first = get_llm_service(config_dir)
+        second = get_llm_service(config_dir)
+        assert first is second
+        assert isinstance(first, EnhancedLLMService)
+
+    def test_rebuilds_on_config_change(self, config_dir):
+        """Test that a modified config file swaps in a new instance"""
+        first = get_llm_service(config_dir)
+
+        llm_path = os.path.join(config_dir, 'llm.yaml')
+        with open(llm_path, 'a') as f:
+            f.write("\n# touched\n")
+        stat = os.stat(llm_path)
+        os.utime(llm_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        second = get_llm_service(config_dir)
+        assert second is not first
+        assert get_llm_service(config_dir) is second
+
+    def test_config_checks_are_throttled(self, config_dir):
+        """Test that the config files are checked at most once per interval"""
+        first = get_llm_service(config_dir)
+        os.utime(os.path.join(config_dir, 'llm.yaml'), ns=(0, 0))
+
+        with patch.object(llm_service_module, 'CONFIG_CHECK_INTERVAL', 60), \
+                patch.object(llm_service_module, '_get_config_signature') as signature:
+            assert get_llm_service() is first
+            assert get_llm_service(config_dir) is first
+            signature.assert_not_called()
+
+        # Once the interval has passed the change is picked up
+        assert get_llm_service(config_dir) is not first
+
+    def test_keeps_previous_instance_when_reload_fails(self, config_dir):
+        """Test that a broken config does not replace a working instance"""
+        first = get_llm_service(config_dir)
+
+        prompt_path = os.path.join(config_dir, 'prompt.yaml')
+        with open(prompt_path, 'w') as f:
+            f.write("languages: {}\n")
+
+        with patch.object(llm_service_module, 'EnhancedLLMService', wraps=EnhancedLLMService) as mock_class:
+            assert get_llm_service(config_dir) is first
+            assert get_llm_service(config_dir) is first
+            # The failed signature is remembered, so the rebuild is attempted only once
+            assert mock_class.call_count == 1
+
+    def test_reuses_client_across_reloads(self, config_dir):
+        """Test that the provider client is handed over to the new instance"""
+        first = get_llm_service(config_dir)
+        sentinel_client = object()
+        sentinel_async_client = object()
+        first.client = sentinel_client
+        first.async_client = sentinel_async_client
+
+        os.utime(os.path.join(config_dir, 'prompt.yaml'), ns=(0, 0))
+        second = get_llm_service(config_dir)
+        assert second is not first
+        assert second.client is sentinel_client
+        assert second.async_client is sentinel_async_client
+
+    def test_changed_api_key_builds_new_clients(self, config_dir):
+        """Test that clients are only handed over while the API key and endpoint are unchanged"""
+        first = get_llm_service(config_dir)
+        first.client = object()
+        first.async_client = object()
+
+        with patch.dict(os.environ, {'CLAUDE_API_KEY': 'sk-test-key'}):
+            os.utime(os.path.join(config_dir, 'prompt.yaml'), ns=(0, 0))
+            second = get_llm_service(config_dir)
+
+        assert second.client is not first.client and second.async_client is not first.async_client
+        assert isinstance(second.client, llm_service_module.Anthropic)
+        assert second.client_settings != first.client_settings
+
+    def test_failed_reload_leaves_shared_components_alone(self, config_dir):
+        """Test that shared limits are only reconfigured once a rebuilt instance is swapped in"""
+        first = get_llm_service(config_dir)
+
+        with patch.object(llm_service_module, 'get_admission_controller') as controller, \
+                patch.object(llm_service_module, 'get_usage_ledger') as ledger, \
+                patch.object(EnhancedLLMService, '_initialize_fallback_provider', side_effect=RuntimeError("boom")):
+            os.utime(os.path.join(config_dir, 'llm.yaml'), ns=(0, 0))
+            assert get_llm_service(config_dir) is first
+
+        controller.return_value.configure.assert_not_called()
+        ledger.return_value.configure.assert_not_called()
+
+SAMPLE_TEXT = "This memo proposes that we invest in a second production line to expand capacity over the next five years."
+
+class TestAsyncEvaluation:
+    """Test cases for the non-blocking evaluation path"""
+
+    def test_async_mock_evaluation(self, config_dir):
+        """Test that the async path returns the same structure as the sync path"""
+        service = EnhancedLLMService(config_dir)
+        result = asyncio.run(service.evaluate_text_with_llm_async(SAMPLE_TEXT))
+        sync_result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        assert result['overall_score'] == sync_result['overall_score']
+        assert result['rubric_scores'] == sync_result['rubric_scores']
+        assert result['metadata']['language_detection']['detected_language'] == 'en'
+
+    def test_async_uses_async_client(self, config_dir):
+        """Test that the async path awaits the async client instead of the sync one"""
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        response = Mock()
+        response.content = [Mock(text=mock_text)]
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.create = AsyncMock(return_value=response)
+
+        result = asyncio.run(service.evaluate_text_with_llm_async(SAMPLE_TEXT))
+
+        service.async_client.messages.create.assert_awaited_once()
+        service.client.messages.create.assert_not_called()
+        assert result['overall_score'] == json.loads(mock_text)['overall_score']
+
+class _FakeStream:
+    """Minimal stand-in for the SDK's message stream context manager"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def get_final_message(self):
+        return Mock(usage=Mock(input_tokens=12, output_tokens=34, cache_read_input_tokens=1500,
+                               cache_creation_input_tokens=0))
+
+class TestStreamingEvaluation:
+    """Test cases for streamed evaluation events"""
+
+    async def _collect(self, service, text):
+        return [event async for event in service.evaluate_text_with_llm_stream(text)]
+
+    def test_mock_mode_streams_fields_then_complete(self, config_dir):
+        """Test the event sequence without a provider"""
+        service = EnhancedLLMService(config_dir)
+        events = asyncio.run(self._collect(service, SAMPLE_TEXT))
+
+        names = [name for name, _ in events]
+        assert names[0] == "language"
+        assert names[-1] == "complete"
+        assert names[1:-1] == ["overall_score", "strengths", "opportunities", "rubric_scores", "segment_feedback"]
+        assert events[-1][1]["overall_score"] == events[1][1]
+
+    def test_streams_provider_chunks(self, config_dir):
+        """Test that fields are emitted from a streamed provider response"""
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        chunks = [mock_text[i:i + 7] for i in range(0, len(mock_text), 7)]
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.stream = Mock(return_value=_FakeStream(chunks))
+
+        events = asyncio.run(self._collect(service, SAMPLE_TEXT))
+
+        service.async_client.messages.stream.assert_called_once()
+        complete = events[-1][1]
+        assert complete["metadata"]["llm_provider"] == "claude"
+        assert complete["metadata"]["raw_response"] == mock_text
+        assert dict(events[1:-1])["rubric_scores"] == json.loads(mock_text)["rubric_scores"]
+        assert complete["metadata"]["token_usage"]["cache_read_input_tokens"] == 1500
+
+    def test_stream_failure_before_output_falls_back_to_request(self, config_dir):
+        """Test that a stream that fails to start is retried as a regular request"""
+        import anthropic
+
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        response = Mock()
+        response.content = [Mock(text=mock_text)]
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.stream = Mock(side_effect=anthropic.APIConnectionError(request=Mock()))
+        service.async_client.messages.create = AsyncMock(return_value=response)
+
+        events = asyncio.run(self._collect(service, SAMPLE_TEXT))
+
+        service.async_client.messages.create.assert_awaited_once()
+        assert events[-1][0] == "complete"
+        assert events[-1][1]["metadata"]["llm_call"]["attempts"] == 2
+
+LONG_TEXT = "\n\n".join(
+    f"Section {index}. This memo proposes that we invest in a second production line to expand capacity. " * 6
+    for index in range(30)
+)
+
+class TestPromptCaching:
+    """Test cases for the cacheable prompt layout"""
+
+    def test_static_blocks_are_cache_breakpoints_and_memo_is_last(self, config_dir):
+        """Test that system and instructions are marked for caching and the memo is sent last"""
+        service = EnhancedLLMService(config_dir)
+        params = service.build_request_params(service.prepare_evaluation(SAMPLE_TEXT))
+
+        system, = params["system"]
+        instructions, memo = params["messages"][0]["content"]
+        assert system["cache_control"] == {"type": "ephemeral"}
+        assert instructions["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in memo
+        assert memo["text"] == SAMPLE_TEXT
+        assert SAMPLE_TEXT not in system["text"] + instructions["text"]
+
+    def test_static_blocks_are_identical_across_texts(self, config_dir):
+        """Test that only the memo block differs between evaluations in the same language"""
+        service = EnhancedLLMService(config_dir)
+        first = service.build_request_params(service.prepare_evaluation(SAMPLE_TEXT))
+        second = service.build_request_params(service.prepare_evaluation(SAMPLE_TEXT + " It also covers hiring."))
+
+        assert first["system"] == second["system"]
+        assert first["messages"][0]["content"][0] == second["messages"][0]["content"][0]
+
+    def test_token_usage_reports_cache_reads(self, config_dir):
+        """Test that cached and fresh input tokens are reported in the metadata"""
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        response = Mock()
+        response.content = [Mock(text=mock_text)]
+        response.usage = Mock(input_tokens=40, output_tokens=300, cache_read_input_tokens=1500,
+                              cache_creation_input_tokens=0)
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.create = AsyncMock(return_value=response)
+
+        result = asyncio.run(service.evaluate_text_with_llm_async(SAMPLE_TEXT))
+
+        assert result['metadata']['token_usage'] == {
+            "input_tokens": 40, "cache_read_input_tokens": 1500, "cache_creation_input_tokens": 0, "output_tokens": 300
+        }
+
+class TestPromptArtifacts:
+    """Test cases for the precompiled per-language prompts"""
+
+    def test_prompts_are_built_without_rendering_the_template(self, config_dir):
+        """Test that per-request prompt building only joins precompiled strings"""
+        service = EnhancedLLMService(config_dir)
+
+        with patch.object(service.jinja_env, 'get_template', side_effect=AssertionError("template rendered")):
+            blocks = service._generate_prompt(SAMPLE_TEXT, service.prompt_config.default_language)
+            chunk_blocks = service._generate_prompt(SAMPLE_TEXT, service.prompt_config.default_language, (2, 3))
+
+        assert blocks["memo"] == SAMPLE_TEXT
+        assert "part 2 of 3" in chunk_blocks["memo"]
+        assert chunk_blocks["memo"].endswith("\n\n" + SAMPLE_TEXT)
+        assert chunk_blocks["instructions"] == blocks["instructions"]
+
+    def test_prompt_change_recompiles_artifacts(self, config_dir):
+        """Test that editing prompt.yaml yields an instance with new artifacts"""
+        first = get_llm_service(config_dir)
+
+        prompt_path = os.path.join(config_dir, 'prompt.yaml')
+        with open(prompt_path) as f:
+            content = f.read()
+        with open(prompt_path, 'w') as f:
+            f.write(content.replace("Evaluate the business memo", "Carefully evaluate the business memo"))
+        stat = os.stat(prompt_path)
+        os.utime(prompt_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        second = get_llm_service(config_dir)
+        language = second.prompt_config.default_language
+        assert "Carefully evaluate" in second.prompt_artifacts[language].instructions
+        assert "Carefully evaluate" not in first.prompt_artifacts[language].instructions
+        assert second.template_version != first.template_version
+
+class TestChunkedEvaluation:
+    """Test cases for long texts evaluated in parallel chunks"""
+
+    def test_long_text_is_evaluated_in_chunks(self, config_dir):
+        """Test that a text over the chunking threshold gets one provider call per chunk"""
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        response = Mock()
+        response.content = [Mock(text=mock_text)]
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.create = AsyncMock(return_value=response)
+
+        result = asyncio.run(service.evaluate_text_with_llm_async(LONG_TEXT))
+
+        chunk_count = result['metadata']['chunk_count']
+        assert chunk_count > 1
+        assert service.async_client.messages.create.await_count == chunk_count
+        prompts = [call.kwargs['messages'][0]['content'][-1]['text']
+                   for call in service.async_client.messages.create.await_args_list]
+        assert all(f"of {chunk_count} of a longer memo" in prompt for prompt in prompts)
+        assert result['rubric_scores']['structure']['score'] == json.loads(mock_text)['rubric_scores']['structure']['score']
+
+    def test_short_text_is_not_chunked(self, config_dir):
+        """Test that texts within the threshold keep the single-prompt path"""
+        service = EnhancedLLMService(config_dir)
+        prepared = service.prepare_evaluation(SAMPLE_TEXT)
+
+        assert prepared.parts == []
+        assert "longer memo" not in prepared.prompt
+
+    def test_sync_and_streaming_paths_merge_chunks(self, config_dir):
+        """Test that the blocking and streaming paths return the merged evaluation"""
+        service = EnhancedLLMService(config_dir)
+        result = service.evaluate_text_with_llm(LONG_TEXT)
+
+        async def collect():
+            return [event async for event in service.evaluate_text_with_llm_stream(LONG_TEXT)]
+
+        events = asyncio.run(collect())
+
+        assert result['metadata']['chunk_count'] > 1
+        assert events[0][0] == "language"
+        assert events[-1][0] == "complete"
+        assert events[-1][1]['rubric_scores'] == result['rubric_scores']
+
+class TestResponseCaching:
+    """Test cases for evaluation result caching in the service"""
+
+    def test_repeat_submission_skips_provider_call(self, config_dir):
+        """Test that an identical resubmission is served from the cache"""
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        response = Mock()
+        response.content = [Mock(text=mock_text)]
+        service.client = Mock()
+        service.client.messages.create.return_value = response
+
+        first = service.evaluate_text_with_llm(SAMPLE_TEXT)
+        second = service.evaluate_text_with_llm(SAMPLE_TEXT + "  ")
+
+        assert service.client.messages.create.call_count == 1
+        assert first['metadata']['cache_hit'] is False
+        assert second['metadata']['cache_hit'] is True
+        assert second['rubric_scores'] == first['rubric_scores']
+
+class TestProviderFallback:
+    """Test cases for circuit breaking and fallback provider routing"""
+
+    def _service_with_fallback(self, config_dir):
+        service = EnhancedLLMService(config_dir)
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        service.client = Mock()
+        service.fallback_provider = OpenAIProvider(api_key="test", model="gpt-3.5-turbo")
+        service.fallback_provider._complete = Mock(
+            return_value=ProviderResponse(mock_text, "gpt-3.5-turbo", {"input_tokens": 10, "output_tokens": 5})
+        )
+        return service
+
+    def _open_primary_circuit(self):
+        breaker = get_circuit_breaker("claude")
+        breaker.configure(window_size=1, minimum_calls=1, open_duration=60)
+        breaker.record_failure(0.1)
+
+    def test_open_circuit_routes_to_fallback_immediately(self, config_dir):
+        """Test that an open primary circuit skips the primary without waiting"""
+        service = self._service_with_fallback(config_dir)
+        self._open_primary_circuit()
+
+        result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        service.client.messages.create.assert_not_called()
+        service.fallback_provider._complete.assert_called_once()
+        assert result['metadata']['llm_provider'] == 'openai'
+        assert result['metadata']['llm_model'] == 'gpt-3.5-turbo'
+        assert result['metadata']['fallback_reason'] == 'circuit_open'
+        assert result['metadata']['processing_time'] < 1
+
+    def test_authentication_error_fails_over(self, config_dir):
+        """Test that a configured fallback condition moves the call to the fallback"""
+        import anthropic
+
+        service = self._service_with_fallback(config_dir)
+        service.client.messages.create.side_effect = anthropic.AuthenticationError(
+            "invalid key", response=Mock(status_code=401, headers={}), body=None
+        )
+
+        result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        assert service.client.messages.create.call_count == 1
+        assert result['metadata']['fallback_reason'] == 'authentication_error'
+        # A rejected key is the request's fault, not a sign of an unhealthy provider
+        assert get_circuit_breaker("claude").get_stats()["failure_rate"] == 0.0
+
+    def test_async_open_circuit_routes_to_fallback(self, config_dir):
+        """Test that the async path also fails over when the primary circuit is open"""
+        service = self._service_with_fallback(config_dir)
+        service.async_client = Mock()
+        service.async_client.messages.create = AsyncMock()
+        self._open_primary_circuit()
+
+        result = asyncio.run(service.evaluate_text_with_llm_async(SAMPLE_TEXT))
+
+        service.async_client.messages.create.assert_not_awaited()
+        assert result['metadata']['llm_provider'] == 'openai'
+
+    def test_open_circuit_without_fallback_fails_fast(self, config_dir):
+        """Test that without a fallback an open circuit is reported immediately"""
+        service = EnhancedLLMService(config_dir)
+        service.client = Mock()
+        self._open_primary_circuit()
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            service.evaluate_text_with_llm(SAMPLE_TEXT)
+        service.client.messages.create.assert_not_called()
+        assert exc_info.value.retry_after >= 1
+
+class TestResponseRepair:
+    """Test cases for invalid response handling"""
+
+    def _message(self, text):
+        return Mock(content=[Mock(text=text)], usage=Mock(input_tokens=10, output_tokens=20,
+                                                           cache_read_input_tokens=0, cache_creation_input_tokens=0))
+
+    def _service(self, config_dir):
+        """Service on a single model, so invalid replies are corrected rather than escalated"""
+        service = EnhancedLLMService(config_dir)
+        service.model_router = ModelRouter.from_config({}, "claude-3-haiku-20240307")
+        return service
+
+    def test_fenced_response_is_repaired_without_another_call(self, config_dir):
+        """Test that a code-fenced reply with float scores is fixed locally"""
+        service = EnhancedLLMService(config_dir)
+        payload = json.loads(service._generate_mock_response(service.prompt_config.default_language))
+        payload['rubric_scores']['structure']['score'] = 3.6
+        service.client = Mock()
+        service.client.messages.create.return_value = self._message("```json\n" + json.dumps(payload) + "\n```")
+
+        result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        assert service.client.messages.create.call_count == 1
+        assert result['rubric_scores']['structure']['score'] == 4
+
+    def test_invalid_response_requests_correction(self, config_dir):
+        """Test that a reply missing a criterion is sent back once with the validation errors"""
+        service = self._service(config_dir)
+        valid = service._generate_mock_response(service.prompt_config.default_language)
+        invalid = json.loads(valid)
+        del invalid['rubric_scores']['strategic_alignment']
+        service.client = Mock()
+        service.client.messages.create.side_effect = [self._message(json.dumps(invalid)), self._message(valid)]
+
+        result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        follow_up = service.client.messages.create.call_args_list[1].kwargs['messages']
+        assert [message['role'] for message in follow_up] == ['user', 'assistant', 'user']
+        assert 'rubric_scores.strategic_alignment' in follow_up[-1]['content']
+        assert result['metadata']['raw_response'] == valid
+        assert result['metadata']['token_usage']['output_tokens'] == 40
+
+    def test_correction_disabled(self, config_dir):
+        """Test that without retry_on_failure an invalid reply fails the evaluation"""
+        service = self._service(config_dir)
+        service.llm_config.response_handling['retry_on_failure'] = False
+        service.client = Mock()
+        service.client.messages.create.return_value = self._message('{"overall_score": 4.0}')
+
+        with pytest.raises(ValueError):
+            service.evaluate_text_with_llm(SAMPLE_TEXT)
+        assert service.client.messages.create.call_count == 1
+
+class TestModelRouting:
+    """Test cases for routing memos between model tiers"""
+
+    def _message(self, text, output_tokens=200):
+        return Mock(content=[Mock(text=text)], usage=Mock(input_tokens=1000, output_tokens=output_tokens,
+                                                           cache_read_input_tokens=0, cache_creation_input_tokens=0))
+
+    def test_default_config_starts_every_memo_on_cheapest_model(self, config_dir):
+        """Test that long memos also start on the first tier with the shipped configuration"""
+        service = EnhancedLLMService(config_dir)
+
+        route = service.model_router.route(SAMPLE_TEXT * 50)
+
+        assert service.model_router.enabled
+        assert (route.model, route.reason) == ("claude-3-haiku-20240307", "default")
+
+    def test_short_and_long_memos_use_different_models(self, config_dir):
+        """Test that the starting model depends on memo length and is recorded"""
+        service = EnhancedLLMService(config_dir)
+        service.model_router = ModelRouter.from_config({
+            "enabled": True,
+            "tiers": [{"model": "claude-3-haiku-20240307", "max_text_length": 4000},
+                      {"model": "claude-3-5-sonnet-20241022"}]
+        }, "claude-3-haiku-20240307")
+        mock_text = service._generate_mock_response(service.prompt_config.default_language)
+        service.client = Mock()
+        service.client.messages.create.return_value = self._message(mock_text)
+
+        short = service.evaluate_text_with_llm(SAMPLE_TEXT)
+        long = service.evaluate_text_with_llm(SAMPLE_TEXT * 50)
+
+        models = [call.kwargs['model'] for call in service.client.messages.create.call_args_list]
+        assert models == ["claude-3-haiku-20240307", "claude-3-5-sonnet-20241022"]
+        assert short['metadata']['routing']['reason'] == 'short_text'
+        assert long['metadata']['llm_model'] == "claude-3-5-sonnet-20241022"
+
+    def test_inconsistent_scores_escalate(self, config_dir):
+        """Test that an overall score far from the weighted rubric is re-requested from the stronger model"""
+        service = EnhancedLLMService(config_dir)
+        valid = service._generate_mock_response(service.prompt_config.default_language)
+        inconsistent = dict(json.loads(valid), overall_score=1.5)
+        service.client = Mock()
+        service.client.messages.create.side_effect = [self._message(json.dumps(inconsistent)), self._message(valid)]
+
+        result = service.evaluate_text_with_llm(SAMPLE_TEXT)
+
+        routing = result['metadata']['routing']
+        assert result['overall_score'] == json.loads(valid)['overall_score']
+        assert routing['model'] == "claude-3-5-sonnet-20241022"
+        assert routing['escalations'][0]['reason'] == 'score_inconsistency'
+        # Both calls are priced at their own model's rates
+        assert result['metadata']['cost_usd'] == pytest.approx((1000 * 0.25 + 200 * 1.25 + 1000 * 3 + 200 * 15) / 1e6)
+
+    def test_parse_failure_escalates_async(self, config_dir):
+        """Test that an unparseable reply from the cheap model goes to the stronger model"""
+        service = EnhancedLLMService(config_dir)
+        valid = service._generate_mock_response(service.prompt_config.default_language)
+        service.client = Mock()
+        service.async_client = Mock()
+        service.async_client.messages.create = AsyncMock(side_effect=[self._message("Sorry, no JSON"), self._message(valid)])
+
+        result = asyncio.run(service.evaluate_text_with_llm_async(SAMPLE_TEXT))
+
+        assert service.async_client.messages.create.await_args_list[1].kwargs['model'] == "claude-3-5-sonnet-20241022"
+        assert result['metadata']['routing']['escalations'][0]['reason'] == 'parse_failure'
@@ -0,0 +1,66 @@
+"""
+Unit tests for tiered model routing
+"""
+
+from backend.services.model_router import ModelRouter, REASON_SHORT_TEXT, REASON_LONG_TEXT, REASON_DEFAULT
+
+CONFIG = {
+    "enabled": True,
+    "tiers": [{"model": "fast", "max_text_length": 100}, {"model": "standard", "max_text_length": 1000}, {"model": "strong"}],
+    "score_tolerance": 0.5
+}
+
+WEIGHTS = {"structure": 25, "arguments_and_evidence": 30, "strategic_alignment": 25, "implementation_and_risks": 20}
+
+def _evaluation(overall_score, score=4):
+    return {"overall_score": overall_score, "rubric_scores": {key: {"score": score} for key in WEIGHTS}}
+
+class TestRoute:
+    """Test cases for choosing the starting tier"""
+
+    def test_text_length_selects_tier(self):
+        """Test that memos start on the first tier they fit"""
+        router = ModelRouter.from_config(CONFIG, "default")
+
+        assert (router.route("x" * 50).model, router.route("x" * 50).reason) == ("fast", REASON_SHORT_TEXT)
+        assert router.route("x" * 500).model == "standard"
+        assert (router.route("x" * 5000).model, router.route("x" * 5000).reason) == ("strong", REASON_LONG_TEXT)
+
+    def test_tier_without_length_limit_takes_every_memo(self):
+        """Test that a first tier without max_text_length starts all memos on it"""
+        router = ModelRouter.from_config({"enabled": True, "tiers": [{"model": "fast"}, {"model": "strong"}]}, "default")
+        route = router.route("x" * 50000)
+
+        assert router.enabled
+        assert (route.model, route.reason) == ("fast", REASON_DEFAULT)
+        assert router.escalate(route, "parse_failure") and route.model == "strong"
+
+    def test_disabled_routing_uses_default_model(self):
+        """Test that without routing every memo uses the provider model"""
+        router = ModelRouter.from_config(dict(CONFIG, enabled=False), "default")
+        route = router.route("x" * 50)
+
+        assert not router.enabled
+        assert (route.model, route.reason) == ("default", REASON_DEFAULT)
+        assert router.escalate(route, "parse_failure") is False
+
+class TestEscalation:
+    """Test cases for moving up tiers"""
+
+    def test_escalates_one_tier_at_a_time_until_strongest(self):
+        """Test that escalations are recorded and stop at the last tier"""
+        router = ModelRouter.from_config(CONFIG, "default")
+        route = router.route("short")
+
+        assert router.escalate(route, "parse_failure")
+        assert router.escalate(route, "score_inconsistency")
+        assert not router.escalate(route, "score_inconsistency")
+        assert route.to_dict()["initial_model"] == "fast"
+        assert [step["to"] for step in route.to_dict()["escalations"]] == ["standard", "strong"]
+
+    def test_score_inconsistency_uses_rubric_weights(self):
+        """Test that only overall scores far from the weighted rubric are flagged"""
+        router = ModelRouter.from_config(CONFIG, "default")
+
+        assert router.score_inconsistency(_evaluation(4.2), WEIGHTS) is None
+        assert "weighted rubric 4.00" in router.score_inconsistency(_evaluation(2.0), WEIGHTS)
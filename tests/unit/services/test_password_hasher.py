@@ -0,0 +1,91 @@
+"""
+Unit tests for the bounded bcrypt worker pool
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from backend.services import password_hasher as hasher_module
+from backend.services.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+class TestPasswordHasher:
+    """Test cases for hashing, admission and statistics"""
+
+    def test_hash_and_verify_round_trip(self):
+        """Test that hashes verify against the right password only"""
+        hasher = PasswordHasher(workers=2, queue_size=4, rounds=4)
+        hashed = hasher.hash("correct horse")
+
+        assert hashed.startswith("$2b$04$")
+        assert hasher.verify("correct horse", hashed)
+        assert not hasher.verify("wrong", hashed)
+        assert hasher.get_stats()["completed"] == 3
+
+    def test_saturated_pool_rejects_with_retry_after(self):
+        """Test that calls beyond workers plus queue size are rejected immediately"""
+        hasher = PasswordHasher(workers=1, queue_size=1, rounds=4)
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def slow_checkpw(password, hashed):
+            started.release()
+            release.wait(5)
+            return True
+
+        with patch.object(hasher_module.bcrypt, 'checkpw', side_effect=slow_checkpw):
+            threads = [threading.Thread(target=hasher.verify, args=("pw", "hash")) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            assert started.acquire(timeout=5)
+            deadline = time.monotonic() + 5
+            while hasher.get_stats()["queued"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            with pytest.raises(PasswordHasherBusyError) as exc_info:
+                hasher.verify("pw", "hash")
+
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert exc_info.value.retry_after >= 1
+        stats = hasher.get_stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 2
+
+    def test_configure_resizes_pool(self):
+        """Test that a new worker count replaces the pool and 0 means one per CPU"""
+        hasher = PasswordHasher(workers=1, queue_size=0, rounds=4)
+        hasher.configure(workers=3, queue_size=5, rounds=4)
+        assert (hasher.get_stats()["workers"], hasher.queue_size) == (3, 5)
+        assert hasher.verify("pw", hasher.hash("pw"))
+
+        with patch.object(hasher_module.os, 'cpu_count', return_value=6):
+            hasher.configure(workers=0, queue_size=5)
+        assert hasher.workers == 6
+
+    def test_async_calls_are_admitted_on_the_loop(self):
+        """Test that awaited calls hold no extra thread and the limit rejects on the loop"""
+        hasher = PasswordHasher(workers=1, queue_size=1, rounds=4)
+        release = threading.Event()
+
+        def slow_checkpw(password, hashed):
+            release.wait(5)
+            return True
+
+        async def run():
+            waiting = [asyncio.ensure_future(hasher.verify_async("pw", "hash")) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PasswordHasherBusyError):
+                await hasher.verify_async("pw", "hash")
+            release.set()
+            return await asyncio.gather(*waiting)
+
+        with patch.object(hasher_module.bcrypt, 'checkpw', side_effect=slow_checkpw):
+            results = asyncio.run(run())
+
+        assert results == [True, True]
+        stats = hasher.get_stats()
+        assert (stats["rejected"], stats["completed"], stats["queued"]) == (1, 2, 0)
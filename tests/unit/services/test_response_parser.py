@@ -0,0 +1,92 @@
+"""
+Unit tests for rubric-driven response validation and repair
+"""
+
+import os
+import json
+import yaml
+import pytest
+
+from backend.models.config_models import PromptConfig, Language
+from backend.services.response_parser import (
+    ResponseParseError, build_response_model, parse_evaluation_response, repair_json_text
+)
+
+REPO_CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config')
+
+@pytest.fixture(scope="module")
+def rubric():
+    with open(os.path.join(REPO_CONFIG_DIR, 'prompt.yaml'), 'r') as f:
+        return PromptConfig(**yaml.safe_load(f)).languages[Language.EN].rubric
+
+@pytest.fixture(scope="module")
+def model(rubric):
+    return build_response_model(rubric)
+
+def _evaluation(rubric, score=4):
+    return {
+        "overall_score": 4.2,
+        "strengths": ["Clear ask"],
+        "opportunities": ["Add a timeline"],
+        "rubric_scores": {key: {"score": score, "justification": "ok"} for key in rubric.criteria},
+        "segment_feedback": [{"segment": "Opening", "comment": "Strong", "questions": [], "suggestions": []}]
+    }
+
+class TestResponseModel:
+    """Test cases for the generated response model"""
+
+    def test_valid_response(self, rubric, model):
+        """Test that a well-formed response validates with criteria in rubric order"""
+        parsed = parse_evaluation_response(json.dumps(_evaluation(rubric)), model)
+
+        assert list(parsed["rubric_scores"]) == list(rubric.criteria)
+        assert parsed["segment_feedback"][0]["comment"] == "Strong"
+
+    def test_criteria_follow_the_rubric(self, rubric):
+        """Test that a renamed criterion is required instead of a hard-coded one"""
+        criteria = dict(rubric.criteria)
+        criteria["clarity"] = criteria.pop("structure")
+        model = build_response_model(rubric.model_copy(update={"criteria": criteria}))
+        evaluation = _evaluation(rubric)
+        evaluation["rubric_scores"]["clarity"] = evaluation["rubric_scores"].pop("structure")
+
+        assert "clarity" in parse_evaluation_response(json.dumps(evaluation), model)["rubric_scores"]
+
+    def test_float_and_string_scores_are_rounded(self, rubric, model):
+        """Test that near-integer scores are coerced instead of rejected"""
+        evaluation = _evaluation(rubric)
+        evaluation["rubric_scores"]["structure"]["score"] = 3.5
+        evaluation["rubric_scores"]["strategic_alignment"]["score"] = "2"
+
+        parsed = parse_evaluation_response(json.dumps(evaluation), model)
+
+        assert parsed["rubric_scores"]["structure"]["score"] == 4
+        assert parsed["rubric_scores"]["strategic_alignment"]["score"] == 2
+
+    def test_out_of_range_score_is_rejected(self, rubric, model):
+        """Test that scores outside the rubric scale fail with their location"""
+        with pytest.raises(ResponseParseError) as exc_info:
+            parse_evaluation_response(json.dumps(_evaluation(rubric, score=7)), model)
+
+        assert any(error.startswith("rubric_scores.structure.score") for error in exc_info.value.errors)
+
+class TestRepair:
+    """Test cases for local repair of malformed output"""
+
+    def test_fences_prose_and_trailing_commas(self, rubric, model):
+        """Test that common formatting defects are repaired without another call"""
+        body = json.dumps(_evaluation(rubric), indent=2)[:-1] + ",\n}"
+        response = "Here is the evaluation:\n```json\n" + body + "\n```"
+
+        assert parse_evaluation_response(response, model)["overall_score"] == 4.2
+
+    def test_repair_leaves_valid_json_unchanged(self, rubric):
+        """Test that repair does not alter a clean JSON object"""
+        text = json.dumps(_evaluation(rubric))
+
+        assert repair_json_text(text) == text
+
+    def test_unrecoverable_response(self, model):
+        """Test that text without a JSON object raises a parse error"""
+        with pytest.raises(ResponseParseError):
+            parse_evaluation_response("I cannot evaluate this memo.", model)
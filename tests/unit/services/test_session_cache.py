@@ -0,0 +1,113 @@
+"""
+Unit tests for the session validation cache
+"""
+
+import sys
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from backend.services import auth_service as auth_module
+from backend.services import session_cache as cache_module
+from backend.services.session_cache import SessionCache
+
+def _session_data(user_id=1, expires_in=3600):
+    return {"session_id": f"token-{user_id}", "user_id": user_id, "username": f"user{user_id}",
+            "expires_at": datetime.utcnow() + timedelta(seconds=expires_in), "permissions": []}
+
+class TestSessionCache:
+    """Test cases for LRU, TTL and invalidation behaviour"""
+
+    def test_hit_returns_copy_and_counts(self):
+        """Test that hits return an independent copy and update the counters"""
+        cache = SessionCache(max_size=10, ttl=30)
+        cache.set("token-1", _session_data())
+
+        cached = cache.get("token-1")
+        cached["permissions"].append("mutated")
+
+        assert cache.get("token-1")["permissions"] == []
+        assert cache.get("missing") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+
+    def test_entry_never_outlives_session(self):
+        """Test that the entry expiry is capped at the session's expires_at"""
+        cache = SessionCache(max_size=10, ttl=30)
+        cache.set("token-1", _session_data(expires_in=-1))
+
+        assert cache.get("token-1") is None
+
+    def test_bounded_size_evicts_least_recently_used(self):
+        """Test that the cache keeps at most max_size entries"""
+        cache = SessionCache(max_size=2, ttl=30)
+        cache.set("token-1", _session_data(1))
+        cache.set("token-2", _session_data(2))
+        cache.get("token-1")
+        cache.set("token-3", _session_data(3))
+
+        assert cache.get("token-2") is None
+        assert cache.get("token-1") is not None and cache.get("token-3") is not None
+
+    def test_invalidate_user_drops_all_sessions(self):
+        """Test that invalidating a user removes every token of that user"""
+        cache = SessionCache(max_size=10, ttl=30)
+        cache.set("a", _session_data(1))
+        cache.set("b", _session_data(1))
+        cache.set("c", _session_data(2))
+
+        cache.invalidate_user(1)
+        cache.invalidate("c")
+
+        assert cache.get_stats()["entries"] == 0
+        assert cache.get_stats()["invalidations"] == 3
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a TTL of 0 stores nothing"""
+        cache = SessionCache(max_size=10, ttl=0)
+        cache.set("token-1", _session_data())
+
+        assert cache.get("token-1") is None
+
+class TestAuthServiceCaching:
+    """Test cases for session caching in AuthService"""
+
+    @pytest.fixture
+    def entities(self):
+        """Replace the entity models with mocks backed by one active session"""
+        session = Mock(session_id="token-1", user_id=1, is_admin=False, is_active=True,
+                       created_at=datetime.utcnow(), expires_at=datetime.utcnow() + timedelta(hours=1))
+        user = Mock(id=1, username="alice", is_active=True)
+        models = Mock()
+        models.Session.get_by_session_id.return_value = session
+        models.Session.get_by_user_id.return_value = [session]
+        models.User.get_by_id.return_value = user
+        models.User.get_by_username.return_value = user
+        with patch.dict(sys.modules, {'models.entities': models}), \
+                patch.object(cache_module, 'session_cache', SessionCache()):
+            yield models
+
+    def test_repeat_validation_skips_database(self, entities):
+        """Test that a second validation is served from the cache"""
+        service = auth_module.AuthService()
+
+        first = service.validate_session("token-1")
+        second = service.validate_session("token-1")
+
+        assert first == second and first[0] is True
+        assert entities.Session.get_by_session_id.call_count == 1
+        assert entities.User.get_by_id.call_count == 1
+
+    def test_logout_and_delete_user_invalidate(self, entities):
+        """Test that logout and user deletion force the next validation back to the database"""
+        service = auth_module.AuthService()
+        service.validate_session("token-1")
+
+        service.logout("token-1")
+        entities.Session.get_by_session_id.return_value.is_active = False
+        assert service.validate_session("token-1") == (False, None, "Session is inactive")
+
+        entities.Session.get_by_session_id.return_value.is_active = True
+        service.validate_session("token-1")
+        service.delete_user("alice")
+        assert cache_module.get_session_cache().get_stats()["entries"] == 0
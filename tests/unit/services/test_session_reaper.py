@@ -0,0 +1,139 @@
+"""
+Unit tests for the expired session reaper
+"""
+
+import os
+import sys
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from backend.init_db import init_database
+from backend.models import database as database_module
+from backend.models.database import DatabaseManager
+from backend.services import session_reaper as reaper_module
+from backend.services.session_reaper import SessionReaper, Session
+
+Submission = sys.modules[Session.__module__].Submission
+
+EVALUATION_INSERT = """
+    INSERT INTO evaluations (submission_id, overall_score, strengths, opportunities, rubric_scores,
+                             segment_feedback, llm_model)
+    VALUES (?, 4, '[]', '[]', '{}', '[]', 'claude-3-haiku-20240307')
+"""
+
+@pytest.fixture
+def temp_db(temp_db):
+    """Scratch database, also used by the reaper for compaction"""
+    with patch.object(reaper_module, 'db_manager', temp_db):
+        yield temp_db
+
+def _add_sessions(manager, count, expires_in, is_active=True, prefix="s"):
+    expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+    manager.execute_insert_many(
+        "INSERT INTO sessions (session_id, user_id, expires_at, is_active) VALUES (?, 1, ?, ?)",
+        [(f"{prefix}{i}", expires_at, is_active) for i in range(count)]
+    )
+
+def _reaper(**settings):
+    reaper = SessionReaper()
+    reaper.configure(**{"enabled": True, "interval": 300, "batch_size": 500, "batch_pause": 0,
+                        "max_batches": 100, "vacuum_pages": 1000, **settings})
+    return reaper
+
+def _remaining(manager):
+    return sorted(row['session_id'] for row in manager.execute_query("SELECT session_id FROM sessions"))
+
+class TestSessionReaper:
+    """Test cases for batched deletion and compaction"""
+
+    def test_deletes_expired_and_inactive_sessions(self, temp_db):
+        """Test that expired and inactive sessions go, including those with submissions, while live ones stay"""
+        _add_sessions(temp_db, 2, 3600, prefix="live")
+        _add_sessions(temp_db, 3, -60, prefix="expired")
+        _add_sessions(temp_db, 2, 3600, is_active=False, prefix="inactive")
+        _add_sessions(temp_db, 1, -60, prefix="owner")
+        submission = Submission.create("Memo", "owner0")
+
+        result = asyncio.run(_reaper().reap())
+
+        assert result["sessions_deleted"] == 6
+        assert _remaining(temp_db) == ["live0", "live1"]
+        assert Submission.get_by_id(submission.id).user_id == 1
+
+    def test_batches_are_bounded_per_run(self, temp_db):
+        """Test that a run stops after max_batches and the next run continues"""
+        _add_sessions(temp_db, 7, -60)
+        reaper = _reaper(batch_size=2, max_batches=3)
+
+        first = asyncio.run(reaper.reap())
+        second = asyncio.run(reaper.reap())
+
+        assert (first["sessions_deleted"], first["batches"]) == (6, 3)
+        assert (second["sessions_deleted"], second["batches"]) == (1, 1)
+        assert reaper.get_stats()["sessions_deleted"] == 7 and reaper.get_stats()["runs"] == 2
+
+    def test_compaction_releases_free_pages(self, temp_db):
+        """Test that pages freed by deleted sessions are returned with incremental auto_vacuum"""
+        _add_sessions(temp_db, 3000, -60, prefix="expired-session-with-a-long-token-")
+
+        result = asyncio.run(_reaper().reap())
+
+        assert temp_db.execute_query("PRAGMA auto_vacuum")[0][0] == 2
+        assert result["pages_released"] > 0
+        assert temp_db.execute_query("PRAGMA freelist_count")[0][0] == 0
+
+    def test_submissions_survive_with_foreign_keys_enforced(self, tmp_path):
+        """Test that reaping sessions keeps their submissions and evaluations even with foreign_keys=ON"""
+        db_path = str(tmp_path / "enforced.db")
+        pragmas = database_module.CONNECTION_PRAGMAS + ("PRAGMA foreign_keys = ON",)
+        with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{db_path}", 'ADMIN_PASSWORD': ''}), \
+                patch.object(database_module, 'CONNECTION_PRAGMAS', pragmas):
+            assert init_database()
+            manager = DatabaseManager(db_path)
+            entities = sys.modules[Session.__module__]
+            with patch.object(entities, 'db_manager', manager), patch.object(reaper_module, 'db_manager', manager):
+                manager.execute_insert("INSERT INTO users (username, password_hash) VALUES ('alice', 'x')")
+                _add_sessions(manager, 1, -60, prefix="expired")
+                submission = Submission.create("Memo", "expired0")
+                manager.execute_insert(EVALUATION_INSERT, (submission.id,))
+
+                result = asyncio.run(_reaper().reap())
+                enforced = manager.execute_query("PRAGMA foreign_keys")[0][0]
+                counts = [manager.execute_query(f"SELECT COUNT(*) FROM {table}")[0][0]
+                          for table in ("sessions", "submissions", "evaluations")]
+                manager.close()
+
+        assert enforced == 1
+        assert result["sessions_deleted"] == 1
+        assert counts == [0, 1, 1]
+
+    def test_existing_submissions_are_migrated(self, tmp_path):
+        """Test that re-running init_database backfills user_id and drops the cascading sessions foreign key"""
+        db_path = str(tmp_path / "legacy.db")
+        with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{db_path}", 'ADMIN_PASSWORD': ''}):
+            assert init_database()
+            manager = DatabaseManager(db_path)
+            manager.execute_update("DROP TABLE submissions")
+            manager.execute_update("CREATE TABLE submissions (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                                   "text_content TEXT NOT NULL, session_id TEXT NOT NULL, created_at DATETIME, "
+                                   "FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE)")
+            _add_sessions(manager, 1, 3600, prefix="legacy")
+            manager.execute_update("UPDATE sessions SET user_id = 7")
+            submission_id = manager.execute_insert(
+                "INSERT INTO submissions (text_content, session_id) VALUES ('Memo', 'legacy0')"
+            )
+            manager.execute_insert(EVALUATION_INSERT, (submission_id,))
+            manager.close()
+
+            assert init_database()
+
+        manager = DatabaseManager(db_path)
+        rows = manager.execute_query("SELECT id, user_id FROM submissions")
+        foreign_keys = manager.execute_query("PRAGMA foreign_key_list(submissions)")
+        evaluations = manager.execute_query("SELECT submission_id FROM evaluations")
+        manager.close()
+        assert [(row['id'], row['user_id']) for row in rows] == [(submission_id, 7)]
+        assert [foreign_key['table'] for foreign_key in foreign_keys] == ['users']
+        assert [row['submission_id'] for row in evaluations] == [submission_id]
@@ -0,0 +1,125 @@
+"""
+Unit tests for signed session tokens and the revocation list
+"""
+
+import os
+import sys
+import time
+import bcrypt
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from backend.models import entities
+from backend.services import session_tokens as tokens_module
+from backend.services.auth_service import AuthService
+from backend.services.session_tokens import TokenSigner, RevocationList
+
+SECRET = b"x" * 32
+
+@pytest.fixture
+def temp_db(temp_db):
+    """Scratch database reachable through lazy `models.entities` imports, with a fresh revocation list"""
+    with patch.dict(sys.modules, {'models.entities': entities}), \
+            patch.object(tokens_module, 'revocation_list', RevocationList(sync_interval=0)):
+        yield temp_db
+
+def _claims(jti="a", user_id=1, iat=None):
+    return {"jti": jti, "sub": user_id, "iat": iat or time.time(), "exp": time.time() + 3600}
+
+class TestTokenSigner:
+    """Test cases for issuing and verifying tokens"""
+
+    def test_round_trip(self):
+        """Test that issued tokens verify and carry the user's claims"""
+        signer = TokenSigner(SECRET)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        token = signer.issue(7, "alice", True, expires_at)
+
+        claims = signer.verify(token)
+        assert TokenSigner.is_signed(token)
+        assert (claims["sub"], claims["usr"], claims["adm"]) == (7, "alice", True)
+        assert datetime.utcfromtimestamp(claims["exp"]) == pytest.approx(expires_at, abs=timedelta(seconds=1))
+
+    def test_tampered_and_foreign_tokens_fail(self):
+        """Test that altered claims, other keys and garbage are rejected"""
+        token = TokenSigner(SECRET).issue(7, "alice", False, datetime.utcnow() + timedelta(hours=1))
+        payload, _, signature = token.rpartition('.')
+
+        assert TokenSigner(SECRET).verify(payload + "A." + signature) is None
+        assert TokenSigner(b"y" * 32).verify(token) is None
+        assert TokenSigner(SECRET).verify("v1.bad.tökén") is None
+
+    def test_missing_key_disables_signing(self):
+        """Test that signing stays off without a long enough key"""
+        with patch.dict(os.environ, {'SESSION_SIGNING_KEY': 'short'}):
+            assert TokenSigner.from_config({"enabled": True}) is None
+        with patch.dict(os.environ, {'SESSION_SIGNING_KEY': 'k' * 32}):
+            assert TokenSigner.from_config({"enabled": True}) is not None
+            assert TokenSigner.from_config({"enabled": False}) is None
+
+class TestRevocationList:
+    """Test cases for the incrementally synced denylist"""
+
+    def test_revocations_reach_other_workers(self, temp_db):
+        """Test that a revocation recorded by one list is picked up by another's sync"""
+        worker_a, worker_b = RevocationList(sync_interval=0), RevocationList(sync_interval=0)
+        worker_b.sync()
+        worker_a.revoke_token(_claims("t1"))
+        worker_a.revoke_user(2, time.time() + 3600)
+
+        assert worker_a.is_revoked(_claims("t1"))
+        assert not worker_b.is_revoked(_claims("t1"))
+        worker_b.sync()
+        assert worker_b.is_revoked(_claims("t1"))
+        assert worker_b.is_revoked(_claims("t2", user_id=2, iat=time.time() - 10))
+        assert not worker_b.is_revoked(_claims("t3", user_id=2, iat=time.time() + 10))
+        assert worker_b.get_stats()["last_id"] == 2
+
+    def test_failed_sync_keeps_last_known_list(self, temp_db):
+        """Test that a database error during sync leaves the list in place"""
+        revocations = RevocationList(sync_interval=0)
+        revocations.revoke_token(_claims("t1"))
+
+        with patch.object(entities.db_manager, 'execute_query', side_effect=Exception("database is locked")):
+            revocations.sync()
+
+        assert revocations.is_revoked(_claims("t1"))
+        assert revocations.get_stats()["sync_failures"] == 1
+
+class TestSignedSessions:
+    """Test cases for AuthService with signed tokens enabled"""
+
+    @pytest.fixture
+    def service(self, temp_db):
+        entities.User.create("alice", bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode('utf-8'))
+        config_service = Mock(get_auth_config=Mock(return_value={"session_management": {"session_timeout": 600}}))
+        service = AuthService(config_service=config_service)
+        service.token_signer = TokenSigner(SECRET)
+        return service
+
+    def test_validation_does_not_read_database(self, service):
+        """Test that signed tokens validate while the database is unavailable"""
+        success, token, _ = service.authenticate("alice", "secret")
+        assert success and TokenSigner.is_signed(token)
+        assert entities.Session.get_by_session_id(token) is not None
+
+        with patch.object(entities.db_manager, 'execute_query', side_effect=Exception("database is locked")):
+            valid, session_data, _ = service.validate_session(token)
+
+        assert valid
+        assert (session_data["username"], session_data["is_admin"]) == ("alice", False)
+        assert session_data["expires_at"] - session_data["created_at"] == pytest.approx(timedelta(seconds=600),
+                                                                                      abs=timedelta(seconds=1))
+
+    def test_logout_and_delete_user_revoke(self, service):
+        """Test that logout revokes one token and user deletion revokes all of them"""
+        _, first, _ = service.authenticate("alice", "secret")
+        _, second, _ = service.authenticate("alice", "secret")
+
+        assert service.logout(first)
+        assert service.validate_session(first) == (False, None, "Session is inactive")
+        assert service.validate_session(second)[0]
+
+        assert service.delete_user("alice")
+        assert service.validate_session(second) == (False, None, "Session is inactive")
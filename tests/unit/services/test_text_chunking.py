@@ -0,0 +1,99 @@
+"""
+Unit tests for long-memo chunking and evaluation merging
+"""
+
+from backend.services.text_chunking import split_into_chunks, merge_chunk_evaluations
+
+WEIGHTS = {"structure": 25, "arguments_and_evidence": 30, "strategic_alignment": 25, "implementation_and_risks": 20}
+
+def _paragraphs(count, length=300):
+    return [f"Paragraph {index}. " + "word " * ((length - 14) // 5) for index in range(count)]
+
+def _evaluation(score, segment, strength="Clear structure"):
+    return {
+        "overall_score": float(score),
+        "strengths": [strength],
+        "opportunities": ["Add a timeline"],
+        "rubric_scores": {key: {"score": score, "justification": f"score {score}"} for key in WEIGHTS},
+        "segment_feedback": [{"segment": segment, "comment": "ok", "questions": [], "suggestions": []}]
+    }
+
+class TestSplitIntoChunks:
+    """Test cases for paragraph-based chunking"""
+
+    def test_short_text_is_one_chunk(self):
+        """Test that text within the chunk size is returned whole"""
+        text = "\n\n".join(_paragraphs(3))
+        chunks = split_into_chunks(text, chunk_size=2000, overlap_size=200)
+
+        assert len(chunks) == 1
+        assert chunks[0].text == text
+
+    def test_chunks_end_on_paragraph_boundaries(self):
+        """Test that chunks respect the size and start and end on whole paragraphs"""
+        paragraphs = _paragraphs(20)
+        text = "\n\n".join(paragraphs)
+        chunks = split_into_chunks(text, chunk_size=1000, overlap_size=0)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 1000 for chunk in chunks)
+        for chunk in chunks:
+            assert chunk.text.startswith("Paragraph ")
+            assert chunk.text.split("\n\n")[-1] in paragraphs
+        assert chunks[0].start == 0 and chunks[-1].end == len(text)
+
+    def test_consecutive_chunks_overlap(self):
+        """Test that the trailing paragraph of a chunk is repeated at the start of the next"""
+        text = "\n\n".join(_paragraphs(20))
+        chunks = split_into_chunks(text, chunk_size=1000, overlap_size=350)
+
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current.start < previous.end
+            assert previous.end - current.start <= 350
+
+    def test_oversized_paragraph_is_split_on_sentences(self):
+        """Test that a paragraph longer than the chunk size is still split"""
+        text = " ".join(f"Sentence number {index} explains one more detail of the plan." for index in range(100))
+        chunks = split_into_chunks(text, chunk_size=1000, overlap_size=100)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 1000 for chunk in chunks)
+        assert all(chunk.text.startswith("Sentence") for chunk in chunks)
+
+    def test_max_chunks_grows_chunk_size(self):
+        """Test that very long texts are split into about max_chunks chunks"""
+        text = "\n\n".join(_paragraphs(100))
+        chunks = split_into_chunks(text, chunk_size=1000, overlap_size=100, max_chunks=4)
+
+        assert len(chunks) <= 5
+
+class TestMergeChunkEvaluations:
+    """Test cases for merging per-chunk evaluations"""
+
+    def test_rubric_scores_weighted_by_chunk_length(self):
+        """Test that longer chunks carry more weight in rubric scores"""
+        merged = merge_chunk_evaluations(
+            [_evaluation(5, "first"), _evaluation(2, "second")], [3000, 1000], WEIGHTS
+        )
+
+        assert merged["rubric_scores"]["structure"]["score"] == 4
+        assert merged["rubric_scores"]["structure"]["justification"] == "score 5"
+
+    def test_overall_score_uses_criterion_weights(self):
+        """Test that the overall score is the weighted average of merged rubric scores"""
+        first = _evaluation(4, "first")
+        first["rubric_scores"]["arguments_and_evidence"]["score"] = 2
+        merged = merge_chunk_evaluations([first], [1000], WEIGHTS)
+
+        assert merged["overall_score"] == round((4 * 25 + 2 * 30 + 4 * 25 + 4 * 20) / 100, 1)
+
+    def test_lists_are_merged_without_duplicates(self):
+        """Test that repeated feedback from overlapping chunks is dropped"""
+        merged = merge_chunk_evaluations(
+            [_evaluation(4, "Shared paragraph"), _evaluation(4, "shared  paragraph", strength="Good data")],
+            [1000, 1000], WEIGHTS
+        )
+
+        assert merged["strengths"] == ["Clear structure", "Good data"]
+        assert merged["opportunities"] == ["Add a timeline"]
+        assert len(merged["segment_feedback"]) == 1
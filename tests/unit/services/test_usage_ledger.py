@@ -0,0 +1,114 @@
+"""
+Unit tests for token accounting and the cost ledger
+"""
+
+import pytest
+from datetime import datetime
+
+from backend.services.usage_ledger import UsageLedger, UsageRollup, CostLimitExceededError
+from backend.services.evaluation_jobs import Evaluation, Submission, evaluation_record, describe_llm_error
+
+PRICING = {"claude-3-haiku-20240307": {"input": 0.25, "output": 1.25, "cache_read": 0.03, "cache_write": 0.30}}
+
+def _ledger(**limits):
+    ledger = UsageLedger()
+    ledger.configure(PRICING, track_cost_metrics=True, enforce_limits=True, limit_per_request=limits.get('request'),
+                     limit_per_day=limits.get('day'), limit_per_month=limits.get('month'))
+    return ledger
+
+def _result(input_tokens=1000, output_tokens=500, cost_usd=0.01):
+    return {
+        "overall_score": 4.0,
+        "strengths": ["Clear"],
+        "opportunities": ["Shorter"],
+        "rubric_scores": {},
+        "segment_feedback": [],
+        "metadata": {
+            "llm_provider": "claude",
+            "llm_model": "claude-3-haiku-20240307",
+            "processing_time": 1.0,
+            "token_usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cache_read_input_tokens": 200,
+                "cache_creation_input_tokens": 0
+            },
+            "cost_usd": cost_usd
+        }
+    }
+
+def _store(user_id, **kwargs):
+    submission = Submission.create("Memo text", "session-1")
+    return Evaluation.create(**evaluation_record(submission.id, _result(**kwargs), user_id))
+
+class TestCostOf:
+    """Test cases for pricing token usage"""
+
+    def test_prices_each_token_kind(self):
+        """Test that input, output and cache tokens use their own prices"""
+        usage = {"input_tokens": 1_000_000, "output_tokens": 1_000_000,
+                 "cache_read_input_tokens": 1_000_000, "cache_creation_input_tokens": 1_000_000}
+
+        assert _ledger().cost_of("claude-3-haiku-20240307", usage) == pytest.approx(0.25 + 1.25 + 0.03 + 0.30)
+
+    def test_unpriced_model_costs_nothing(self):
+        """Test that models without pricing are recorded at zero cost"""
+        assert _ledger().cost_of("unknown-model", {"input_tokens": 1000}) == 0.0
+
+class TestRollups:
+    """Test cases for the incremental usage rollups"""
+
+    def test_evaluations_increment_user_and_overall_rollups(self, temp_db):
+        """Test that each stored evaluation adds to the day and month rollups"""
+        _store(1, cost_usd=0.01)
+        _store(1, cost_usd=0.02)
+        evaluation = _store(2, cost_usd=0.05)
+        day, month = UsageRollup.period_starts(evaluation.created_at)
+
+        overall = UsageRollup.get(*day)
+        assert overall.evaluations == 3
+        assert overall.input_tokens == 3000 and overall.cache_read_tokens == 600
+        assert overall.cost_usd == pytest.approx(0.08)
+        assert UsageRollup.get(*day, user_id=1).cost_usd == pytest.approx(0.03)
+        assert UsageRollup.get(*month, user_id=2).evaluations == 1
+        assert Evaluation.get_by_id(evaluation.id).output_tokens == 500
+
+    def test_bulk_created_evaluations_are_counted(self, temp_db):
+        """Test that `create_many` updates the rollups like single inserts"""
+        submissions = Submission.create_many(["First memo", "Second memo"], "session-1")
+        Evaluation.create_many([evaluation_record(submission.id, _result(), 3) for submission in submissions])
+        day, _ = UsageRollup.period_starts(datetime.utcnow())
+
+        assert UsageRollup.get(*day, user_id=3).evaluations == 2
+        assert [rollup.user_id for rollup in UsageRollup.list(UsageRollup.PERIOD_DAY)] == [0, 3]
+
+class TestLimits:
+    """Test cases for enforcing the spending limits"""
+
+    def test_daily_limit_blocks_further_evaluations(self, temp_db):
+        """Test that reaching the daily limit raises with the time until the next day"""
+        _store(1, cost_usd=0.6)
+        ledger = _ledger(day=0.5, month=100)
+
+        with pytest.raises(CostLimitExceededError) as exc_info:
+            ledger.check_limits()
+
+        assert exc_info.value.period == UsageRollup.PERIOD_DAY
+        assert 0 < exc_info.value.retry_after <= 86400
+
+    def test_under_limit_and_disabled_enforcement_pass(self, temp_db):
+        """Test that spending below the limits, or with enforcement off, is allowed"""
+        _store(1, cost_usd=0.6)
+
+        _ledger(day=1.0, month=100).check_limits()
+        ledger = _ledger(day=0.5)
+        ledger.enforce_limits = False
+        ledger.check_limits()
+
+    def test_limit_error_maps_to_429(self):
+        """Test that the API reports the limit with a Retry-After header"""
+        status, headers, error = describe_llm_error(CostLimitExceededError("day", 10.0, 10.5, 3600))
+
+        assert status == 429
+        assert headers == {"Retry-After": "3600"}
+        assert error["code"] == "COST_LIMIT_EXCEEDED"
@@ -0,0 +1,125 @@
+"""
+Unit tests for the mock LLM server used in load and latency testing
+"""
+
+import os
+import sys
+import json
+import pytest
+import urllib.error
+import urllib.request
+
+# Add the performance tools to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'performance'))
+
+from mock_llm_server import MockLLMSettings, MockLLMState, start_in_thread
+
+MEMOS = [
+    "This memo proposes moving our quarterly planning to a rolling forecast. "
+    "The current process takes six weeks and is outdated by the time it is approved.",
+    "We recommend consolidating our three vendor contracts into one agreement. "
+    "This reduces overhead and gives us leverage in the next renewal cycle."
+]
+
+@pytest.fixture
+def server():
+    """Start a fast mock server on a free port"""
+    servers = []
+
+    def start(**settings):
+        mock_server = start_in_thread(MockLLMSettings(latency_mean=0.05, seed=1, **settings))
+        servers.append(mock_server)
+        return mock_server
+
+    yield start
+    for mock_server in servers:
+        mock_server.shutdown()
+        mock_server.server_close()
+
+def _post(server, body):
+    request = urllib.request.Request(
+        f"{server.base_url}/v1/messages", data=json.dumps(body).encode('utf-8'),
+        headers={"Content-Type": "application/json", "x-api-key": "test-key"}
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+def _request(memo, stream=False):
+    return {
+        "model": "claude-3-haiku-20240307",
+        "max_tokens": 4000,
+        "stream": stream,
+        "system": [{"type": "text", "text": "x" * 400, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": [{"type": "text", "text": memo}]}]
+    }
+
+class TestMockLLMState:
+    """Test cases for latency, fault and usage modelling"""
+
+    def test_latency_respects_bounds(self):
+        """Test that drawn latencies stay within the configured bounds"""
+        state = MockLLMState(MockLLMSettings(latency="lognormal", latency_mean=8, latency_stddev=4,
+                                            latency_min=1, latency_max=15, seed=7))
+        latencies = [state.draw()[1] for _ in range(200)]
+
+        assert all(1 <= latency <= 15 for latency in latencies)
+        assert 5 < sum(latencies) / len(latencies) < 11
+
+    def test_same_seed_reproduces_faults(self):
+        """Test that runs with the same seed inject the same faults"""
+        settings = dict(rate_limit_rate=0.2, overloaded_rate=0.1, seed=3)
+        states = [MockLLMState(MockLLMSettings(**settings)) for _ in range(2)]
+
+        draws = [[state.draw()[0] for _ in range(50)] for state in states]
+        assert draws[0] == draws[1]
+        assert set(draws[0]) == {"rate_limit", "overloaded", None}
+
+    def test_cached_prefix_is_read_on_repeat(self):
+        """Test that a repeated cache_control prefix is reported as a cache read"""
+        state = MockLLMState(MockLLMSettings())
+        body = {"model": "m", "system": [{"type": "text", "text": "x" * 400, "cache_control": {"type": "ephemeral"}}],
+                "messages": [{"role": "user", "content": [{"type": "text", "text": "memo " * 20}]}]}
+
+        first, second = state.usage_for(body), state.usage_for(body)
+
+        assert first["cache_creation_input_tokens"] == 100 and first["cache_read_input_tokens"] == 0
+        assert second["cache_read_input_tokens"] == 100 and second["input_tokens"] == 25
+
+class TestMessagesEndpoint:
+    """Test cases for the Messages API responses"""
+
+    def test_message_contains_valid_evaluation(self, server):
+        """Test that responses carry an evaluation with every rubric criterion and usage"""
+        mock_server = server()
+
+        with _post(mock_server, _request(MEMOS[0])) as response:
+            message = json.loads(response.read())
+
+        evaluation = json.loads(message["content"][0]["text"])
+        assert set(evaluation["rubric_scores"]) == set(mock_server.state.criteria)
+        assert message["usage"]["cache_creation_input_tokens"] == 100
+        assert message["usage"]["output_tokens"] > 0
+
+    def test_stream_sends_message_events(self, server):
+        """Test that streamed text reassembles into the same evaluation"""
+        mock_server = server()
+
+        with _post(mock_server, _request(MEMOS[1], stream=True)) as response:
+            lines = response.read().decode('utf-8').splitlines()
+
+        events = [line[len("event: "):] for line in lines if line.startswith("event: ")]
+        data = [json.loads(line[len("data: "):]) for line in lines if line.startswith("data: ")]
+        text = "".join(item["delta"]["text"] for item in data if item["type"] == "content_block_delta")
+        assert events[0] == "message_start" and events[-1] == "message_stop"
+        assert json.loads(text) == json.loads(mock_server.state.evaluation_for(_request(MEMOS[1])))
+
+    def test_rate_limit_injection(self, server):
+        """Test that injected rate limits use the provider's error format and Retry-After"""
+        mock_server = server(rate_limit_rate=1.0, retry_after=3)
+
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            _post(mock_server, _request(MEMOS[0]))
+
+        assert exc_info.value.code == 429
+        assert exc_info.value.headers["retry-after"] == "3"
+        assert json.loads(exc_info.value.read())["error"]["type"] == "rate_limit_error"
+        assert mock_server.state.stats["rate_limited"] == 1